@@ -9,7 +9,9 @@ from apps.acceleration_program.models import (
     Assignment,
     ApplicantResponse,
     StuffFinalResponseDescription,
-    StuffMembersResponse
+    StuffMembersResponse,
+    ApplicantResponseScore,
+    NotificationOutbox,
 )
 
 admin.site.register(AccelerationProgram)
@@ -21,3 +23,5 @@ admin.site.register(Assignment)
 admin.site.register(ApplicantResponse)
 admin.site.register(StuffFinalResponseDescription)
 admin.site.register(StuffMembersResponse)
+admin.site.register(ApplicantResponseScore)
+admin.site.register(NotificationOutbox)
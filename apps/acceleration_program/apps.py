@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AccelerationProgramConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.acceleration_program"
+
+    def ready(self):
+        from apps.acceleration_program import signals  # noqa
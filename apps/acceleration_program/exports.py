@@ -0,0 +1,90 @@
+import csv
+import json
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, QuerySet
+
+from apps.acceleration_program.models import Applicants, ApplicantResponse, StuffMembersResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Export(NamedTuple):
+    fields: Sequence[str]
+    get_queryset: Callable[[int], "QuerySet"]
+
+
+EXPORTS: Dict[str, Export] = {
+    "applicants": Export(
+        fields=(
+            "id",
+            "applicant_id",
+            "applicant__email",
+            "program_to_join__direction__title",
+            "request_status",
+            "join_request_date",
+        ),
+        get_queryset=lambda program_id: Applicants.objects.filter(program_to_join__program_id=program_id),
+    ),
+    "applicant_responses": Export(
+        fields=(
+            "id",
+            "applicant_id",
+            "applicant__email",
+            "stage_id",
+            "stage__name",
+            "direction__title",
+            "status",
+            "applicant_response_description",
+        ),
+        # DIRECTION CONDITION KEEPS ONE ROW PER RESPONSE WHEN STAGE IS SHARED BY SEVERAL DIRECTIONS OF THE PROGRAM
+        get_queryset=lambda program_id: ApplicantResponse.objects.filter(
+            stage__joinprogram__program_id=program_id, stage__joinprogram__direction_id=F("direction_id")
+        ),
+    ),
+    "stuff_member_responses": Export(
+        fields=(
+            "id",
+            "applicant_response_id",
+            "applicant_response__applicant__email",
+            "applicant_response__stage__name",
+            "author_id",
+            "author__email",
+            "point",
+        ),
+        get_queryset=lambda program_id: StuffMembersResponse.objects.filter(
+            applicant_response__stage__joinprogram__program_id=program_id,
+            applicant_response__stage__joinprogram__direction_id=F("applicant_response__direction_id"),
+        ),
+    ),
+}
+
+
+class _EchoBuffer:
+    """File-like object which returns written value instead of buffering it, so csv.writer can feed a generator"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_export_rows(resource: str, program_id: int) -> Iterator[tuple]:
+    """
+    Yields rows of the export in primary key order, rows are fetched through server-side cursor
+    in chunks of EXPORT_CHUNK_SIZE, so memory usage doesn't depend on the size of the export
+    """
+
+    export = EXPORTS[resource]
+    return export.get_queryset(program_id).order_by("id").values_list(*export.fields).iterator(EXPORT_CHUNK_SIZE)
+
+
+def stream_csv(fields: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(fields: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n"
@@ -0,0 +1,253 @@
+import itertools
+import json
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Type
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.acceleration_program.models import (
+    AccelerationProgram,
+    Applicants,
+    ApplicantResponse,
+    ApplicantResponseScore,
+    Assignment,
+    AssignmentType,
+    JoinProgram,
+    Stage,
+    StuffMembersResponse,
+)
+from apps.accounts.models import CustomUserModel
+from apps.directions.models import Direction
+from core.cache import invalidate_cache_namespaces
+
+
+def chunked(objects: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(objects)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates synthetic programs, directions, stages, applicants, responses and stuff evaluations for load "
+        "testing and writes manifest with credentials and ids which scripts/load_test.py uses for its scenarios"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--programs", type=int, default=5)
+        parser.add_argument("--directions", type=int, default=4, help="Directions of every program")
+        parser.add_argument("--stages", type=int, default=3, help="Stages of every program")
+        parser.add_argument("--applicants", type=int, default=10000)
+        parser.add_argument("--evaluators", type=int, default=50, help="Stuff-Direction users who grade responses")
+        parser.add_argument("--evaluations", type=int, default=3, help="Stuff evaluations of every response")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows per bulk_create")
+        parser.add_argument("--password", default="load-test-password", help="Password of every generated user")
+        parser.add_argument("--prefix", default="load", help="Prefix of generated emails and names")
+        parser.add_argument("--manifest", default="load_test_manifest.json")
+        parser.add_argument("--manifest-size", type=int, default=2000, help="Entries of every manifest scenario")
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.prefix = f"{options['prefix']}-{timezone.now():%Y%m%d%H%M%S}"
+        self.password = make_password(options["password"])  # HASHED ONCE, ARGON2 FOR EVERY USER WOULD TAKE HOURS
+
+        with transaction.atomic():
+            join_programs = self.create_programs()
+            applicants = self.create_users("applicant", options["applicants"], CustomUserModel.UserTypes.STANDARD)
+            evaluators = self.create_users(
+                "evaluator", options["evaluators"], CustomUserModel.UserTypes.STUFF_DIRECTION
+            )
+            self.register_applicants(applicants, join_programs)
+            self.create_responses(applicants, join_programs)
+            self.create_evaluations(evaluators)
+            self.update_summaries()
+
+        invalidate_cache_namespaces("programs", "stages", "directions")
+        self.write_manifest(applicants, evaluators, join_programs)
+
+    def log(self, message: str) -> None:
+        self.stdout.write(f"[{timezone.now():%H:%M:%S}] {message}")
+
+    def bulk_create(self, model: Type[models.Model], objects: Iterable) -> None:
+        created = 0
+        for chunk in chunked(objects, self.options["chunk_size"]):
+            model.objects.bulk_create(chunk)
+            created += len(chunk)
+        self.log(f"{model.__name__}: {created}")
+
+    def create_programs(self) -> List["JoinProgram"]:
+        """Every program gets its own directions and stages, join program of each direction registers all stages"""
+        today = timezone.localdate()
+        prefix, options = self.prefix, self.options
+        assignment = Assignment.objects.create(
+            type=AssignmentType.objects.create(type=f"{prefix} type"), description=f"{prefix} assignment"
+        )
+        join_programs = []
+
+        for program_number in range(options["programs"]):
+            program = AccelerationProgram.objects.create(
+                name=f"{prefix} program {program_number}",
+                requirements="Synthetic program for load testing",
+                program_start_date=today + timedelta(days=30),
+                program_end_date=today + timedelta(days=120),
+                registration_start_date=today - timedelta(days=10),
+                registration_end_date=today + timedelta(days=20),
+            )
+            directions = Direction.objects.bulk_create(
+                Direction(title=f"{prefix} direction {program_number}-{number}", number_of_stages=options["stages"])
+                for number in range(options["directions"])
+            )
+            stages = Stage.objects.bulk_create(
+                Stage(assignment=assignment, name=f"{prefix} stage {program_number}-{number}")
+                for number in range(options["stages"])
+            )
+            program.directions.set(directions)
+            program_join_programs = JoinProgram.objects.bulk_create(
+                JoinProgram(program=program, direction=direction) for direction in directions
+            )
+            JoinProgram.stages_data.through.objects.bulk_create(
+                JoinProgram.stages_data.through(joinprogram_id=join_program.pk, stage_id=stage.pk)
+                for join_program in program_join_programs
+                for stage in stages
+            )
+            for join_program in program_join_programs:
+                join_program.stage_ids = [stage.pk for stage in stages]
+            join_programs.extend(program_join_programs)
+
+        self.log(f"AccelerationProgram: {options['programs']}, JoinProgram: {len(join_programs)}")
+        return join_programs
+
+    def create_users(self, role: str, count: int, user_type: str) -> List[int]:
+        prefix = f"{self.prefix}-{role}-"
+        self.bulk_create(
+            CustomUserModel,
+            (
+                CustomUserModel(email=f"{prefix}{number}@example.com", password=self.password, user_type=user_type)
+                for number in range(count)
+            ),
+        )
+        users = CustomUserModel.objects.filter(email__startswith=prefix).order_by("id")
+        return list(users.values_list("id", flat=True))
+
+    def register_applicants(self, applicants: List[int], join_programs: List["JoinProgram"]) -> None:
+        """Applicants are spread over join programs round robin, every tenth request is still pending"""
+        self.bulk_create(
+            Applicants,
+            (
+                Applicants(
+                    applicant_id=applicant_id,
+                    program_to_join_id=join_programs[index % len(join_programs)].pk,
+                    request_status=(
+                        Applicants.RequestStatuses.PENDING if index % 10 == 9 else Applicants.RequestStatuses.ACCEPTED
+                    ),
+                )
+                for index, applicant_id in enumerate(applicants)
+            ),
+        )
+
+    def create_responses(self, applicants: List[int], join_programs: List["JoinProgram"]) -> None:
+        """Accepted applicants answer every stage except the last one, which is left for submission scenario"""
+        self.bulk_create(
+            ApplicantResponse,
+            (
+                ApplicantResponse(
+                    applicant_id=applicant_id,
+                    stage_id=stage_id,
+                    direction_id=join_programs[index % len(join_programs)].direction_id,
+                    applicant_response_description="Synthetic response",
+                )
+                for index, applicant_id in enumerate(applicants)
+                if index % 10 != 9
+                for stage_id in join_programs[index % len(join_programs)].stage_ids[:-1]
+            ),
+        )
+
+    def create_evaluations(self, evaluators: List[int]) -> None:
+        """Every response is evaluated by the next evaluators round robin, the rest are left for grading scenario"""
+        responses = ApplicantResponse.objects.filter(applicant__email__startswith=self.prefix).order_by("id")
+        evaluations = min(self.options["evaluations"], len(evaluators))
+
+        self.bulk_create(
+            StuffMembersResponse,
+            (
+                StuffMembersResponse(
+                    applicant_response_id=response_id,
+                    author_id=evaluators[(index + offset) % len(evaluators)],
+                    point=(response_id * 7 + offset * 3) % 10 + 1,
+                )
+                for index, response_id in enumerate(responses.values_list("id", flat=True).iterator(chunk_size=2000))
+                for offset in range(evaluations)
+            ),
+        )
+
+    def update_summaries(self) -> None:
+        """Rows were created by bulk_create, so counters and scores which are kept by save and signals are built here"""
+        JoinProgram.objects.filter(program__name__startswith=self.prefix).update(
+            joined_applicants=Coalesce(
+                Subquery(
+                    Applicants.objects.filter(program_to_join=OuterRef("pk"))
+                    .order_by()
+                    .values("program_to_join")
+                    .annotate(count=Count("id"))
+                    .values("count")
+                ),
+                0,
+            )
+        )
+        summaries = (
+            StuffMembersResponse.objects.filter(author__email__startswith=self.prefix)
+            .values("applicant_response_id")
+            .annotate(
+                points_count=models.Count("id"),
+                points_sum=models.Sum("point"),
+                point_avg=models.Avg("point"),
+                point_min=models.Min("point"),
+                point_max=models.Max("point"),
+            )
+            .order_by()
+        )
+        self.bulk_create(ApplicantResponseScore, (ApplicantResponseScore(**row) for row in summaries.iterator()))
+
+    def write_manifest(self, applicants: List[int], evaluators: List[int], join_programs: List["JoinProgram"]) -> None:
+        size = self.options["manifest_size"]
+        emails = dict(CustomUserModel.objects.filter(email__startswith=self.prefix).values_list("id", "email"))
+        evaluations = min(self.options["evaluations"], len(evaluators))
+
+        submissions = [
+            {
+                "email": emails[applicant_id],
+                "stage": join_programs[index % len(join_programs)].stage_ids[-1],
+                "direction": join_programs[index % len(join_programs)].direction_id,
+            }
+            for index, applicant_id in enumerate(applicants)
+            if index % 10 != 9
+        ][:size]
+
+        # EVALUATOR RIGHT AFTER THE ONES WHO ALREADY GRADED THE RESPONSE HASN'T GRADED IT YET
+        gradings = []
+        if len(evaluators) > evaluations:
+            responses = ApplicantResponse.objects.filter(applicant__email__startswith=self.prefix).order_by("id")
+            gradings = [
+                {
+                    "email": emails[evaluators[(index + evaluations) % len(evaluators)]],
+                    "applicant_response": response_id,
+                }
+                for index, response_id in enumerate(responses.values_list("id", flat=True)[:size])
+            ]
+
+        manifest = {
+            "password": self.options["password"],
+            "registration_email_prefix": f"{self.prefix}-registration-",
+            "join_programs": [join_program.pk for join_program in join_programs],
+            "submissions": submissions,
+            "gradings": gradings,
+        }
+        with open(self.options["manifest"], "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+        self.log(f"Manifest: {self.options['manifest']}")
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("acceleration_program", "0008_stuffmembersresponse"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="applicants",
+            index=models.Index(fields=["join_request_date", "id"], name="applicant_date_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="applicants",
+            index=models.Index(
+                fields=["request_status", "join_request_date", "id"],
+                name="applicant_status_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="applicants",
+            index=models.Index(
+                fields=["program_to_join", "join_request_date", "id"],
+                name="applicant_join_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("acceleration_program", "0009_applicants_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="joinprogram",
+            name="is_active",
+            field=models.BooleanField(default=True),
+        ),
+    ]
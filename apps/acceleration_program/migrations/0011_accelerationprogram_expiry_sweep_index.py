@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("acceleration_program", "0010_joinprogram_is_active"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="accelerationprogram",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["registration_end_date"],
+                name="program_active_reg_end_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18 12:41
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def remove_program_expiry_periodic_tasks(apps, schema_editor):
+    """Per-program one-off expiry tasks are replaced by deactivate_expired_acceleration_programs periodic task"""
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTasks = apps.get_model("django_celery_beat", "PeriodicTasks")
+    ClockedSchedule = apps.get_model("django_celery_beat", "ClockedSchedule")
+
+    deleted, _ = PeriodicTask.objects.filter(task="apps.acceleration_program.tasks.check_acceleration_program").delete()
+    ClockedSchedule.objects.filter(periodictask__isnull=True).delete()
+
+    if deleted:  # HISTORICAL MODELS DON'T SEND SIGNALS, SO BEAT MUST BE NOTIFIED EXPLICITLY
+        PeriodicTasks.objects.update_or_create(ident=1, defaults={"last_update": timezone.now()})
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+        ("acceleration_program", "0011_accelerationprogram_expiry_sweep_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_program_expiry_periodic_tasks, migrations.RunPython.noop),
+    ]
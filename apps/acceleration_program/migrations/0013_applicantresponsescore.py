@@ -0,0 +1,55 @@
+# Generated by Django 4.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_applicant_response_scores(apps, schema_editor):
+    ApplicantResponseScore = apps.get_model("acceleration_program", "ApplicantResponseScore")
+    StuffMembersResponse = apps.get_model("acceleration_program", "StuffMembersResponse")
+
+    summaries = StuffMembersResponse.objects.values("applicant_response_id").annotate(
+        points_count=models.Count("id"),
+        points_sum=models.Sum("point"),
+        point_avg=models.Avg("point"),
+        point_min=models.Min("point"),
+        point_max=models.Max("point"),
+    )
+    ApplicantResponseScore.objects.bulk_create(
+        (ApplicantResponseScore(**summary) for summary in summaries.order_by()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("acceleration_program", "0012_remove_program_expiry_periodic_tasks"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicantResponseScore",
+            fields=[
+                (
+                    "applicant_response",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="score",
+                        serialize=False,
+                        to="acceleration_program.applicantresponse",
+                    ),
+                ),
+                ("points_count", models.IntegerField(default=0)),
+                ("points_sum", models.FloatField(default=0)),
+                ("point_avg", models.FloatField(null=True)),
+                ("point_min", models.FloatField(null=True)),
+                ("point_max", models.FloatField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="applicantresponsescore",
+            index=models.Index(fields=["point_avg"], name="score_point_avg_idx"),
+        ),
+        migrations.RunPython(create_applicant_response_scores, migrations.RunPython.noop),
+    ]
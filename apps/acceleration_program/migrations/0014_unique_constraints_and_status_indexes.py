@@ -0,0 +1,78 @@
+# Generated by Django 4.2 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("acceleration_program", "0013_applicantresponsescore"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="applicantresponse",
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name="applicants",
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name="joinprogram",
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name="stufffinalresponsedescription",
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name="stuffmembersresponse",
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name="applicantresponse",
+            index=models.Index(
+                condition=models.Q(("status", "Rejected")),
+                fields=["applicant"],
+                name="response_rejected_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="applicants",
+            index=models.Index(fields=["applicant", "request_status"], name="applicant_user_status_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="accelerationprogram",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True)),
+                fields=("name",),
+                name="program_active_name_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="applicantresponse",
+            constraint=models.UniqueConstraint(fields=("applicant", "stage"), name="applicant_response_unique"),
+        ),
+        migrations.AddConstraint(
+            model_name="applicants",
+            constraint=models.UniqueConstraint(fields=("program_to_join", "applicant"), name="applicant_unique"),
+        ),
+        migrations.AddConstraint(
+            model_name="joinprogram",
+            constraint=models.UniqueConstraint(fields=("direction", "program"), name="join_program_unique"),
+        ),
+        migrations.AddConstraint(
+            model_name="stufffinalresponsedescription",
+            constraint=models.UniqueConstraint(
+                fields=("author", "applicant_response"),
+                name="stuff_final_response_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="stuffmembersresponse",
+            constraint=models.UniqueConstraint(
+                fields=("author", "applicant_response"),
+                name="stuff_members_response_unique",
+            ),
+        ),
+    ]
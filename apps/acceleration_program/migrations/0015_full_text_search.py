@@ -0,0 +1,101 @@
+# Generated by Django 4.2 on 2026-10-18 16:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+PROGRAM_SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="program_search_idx")
+RESPONSE_SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="response_search_idx")
+
+# (TABLE, COLUMNS WHICH ARE INDEXED, search_vector EXPRESSION OF ROW), CONFIGURATION IS models.SEARCH_CONFIG
+SEARCH_TRIGGERS = [
+    (
+        "acceleration_program_accelerationprogram",
+        ["name", "requirements"],
+        "setweight(to_tsvector('english', coalesce({row}name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce({row}requirements, '')), 'B')",
+    ),
+    (
+        "acceleration_program_applicantresponse",
+        ["applicant_response_description"],
+        "to_tsvector('english', coalesce({row}applicant_response_description, ''))",
+    ),
+]
+
+
+def create_search_triggers(apps, schema_editor):
+    """
+    Triggers recalculate search_vector only when indexed columns are written, so status updates don't pay for it.
+    Rows created by bulk_create and queryset updates are covered as well, unlike with signals
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return  # FULL-TEXT SEARCH IS POSTGRESQL ONLY, OTHER DATABASES KEEP search_vector EMPTY
+
+    for table, columns, vector in SEARCH_TRIGGERS:
+        schema_editor.execute(
+            f"""
+            CREATE FUNCTION {table}_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector.format(row="NEW.")};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {table}_search_vector BEFORE INSERT OR UPDATE OF {', '.join(columns)} ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_search_vector()"
+        )
+        schema_editor.execute(f"UPDATE {table} SET search_vector = {vector.format(row='')}")
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table, _, _ in SEARCH_TRIGGERS:
+        schema_editor.execute(f"DROP TRIGGER {table}_search_vector ON {table}")
+        schema_editor.execute(f"DROP FUNCTION {table}_search_vector()")
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return  # GIN INDEXES DON'T EXIST IN OTHER DATABASES
+
+    schema_editor.add_index(apps.get_model("acceleration_program", "AccelerationProgram"), PROGRAM_SEARCH_INDEX)
+    schema_editor.add_index(apps.get_model("acceleration_program", "ApplicantResponse"), RESPONSE_SEARCH_INDEX)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.remove_index(apps.get_model("acceleration_program", "AccelerationProgram"), PROGRAM_SEARCH_INDEX)
+    schema_editor.remove_index(apps.get_model("acceleration_program", "ApplicantResponse"), RESPONSE_SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("acceleration_program", "0014_unique_constraints_and_status_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="accelerationprogram",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="applicantresponse",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="accelerationprogram", index=PROGRAM_SEARCH_INDEX),
+                migrations.AddIndex(model_name="applicantresponse", index=RESPONSE_SEARCH_INDEX),
+            ],
+            database_operations=[migrations.RunPython(create_search_indexes, drop_search_indexes)],
+        ),
+    ]
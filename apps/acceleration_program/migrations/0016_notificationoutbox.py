@@ -0,0 +1,77 @@
+# Generated by Django 4.2 on 2026-10-18 16:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("acceleration_program", "0015_full_text_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event",
+                    models.CharField(
+                        choices=[
+                            ("request_status", "Request Status"),
+                            ("response_status", "Response Status"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                ("status", models.CharField(max_length=150)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("digest_key", models.CharField(blank=True, max_length=64, null=True)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="notificationoutbox",
+            index=models.Index(
+                condition=models.Q(("digest_key__isnull", True)),
+                fields=["id"],
+                name="outbox_unclaimed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notificationoutbox",
+            index=models.Index(
+                condition=models.Q(("sent_at__isnull", True)),
+                fields=["digest_key"],
+                name="outbox_unsent_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notificationoutbox",
+            index=models.Index(
+                condition=models.Q(("sent_at__isnull", False)),
+                fields=["sent_at"],
+                name="outbox_sent_at_idx",
+            ),
+        ),
+    ]
@@ -1,10 +1,17 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.utils.translation import gettext_lazy as _
 
 from apps.accounts.models import CustomUserModel
 from apps.directions.models import Direction
 
+# TEXT SEARCH CONFIGURATION OF search_vector COLUMNS, IT MUST MATCH THE TRIGGERS OF MIGRATION 0015
+SEARCH_CONFIG = "english"
+
 
 class AccelerationProgram(models.Model):
     directions = models.ManyToManyField(Direction)
@@ -18,6 +25,22 @@ class AccelerationProgram(models.Model):
     registration_start_date = models.DateField()
     registration_end_date = models.DateField()
     is_active = models.BooleanField(default=True)
+    search_vector = SearchVectorField(null=True, editable=False)  # NAME AND REQUIREMENTS, MAINTAINED BY TRIGGER
+
+    class Meta:
+        constraints = [
+            # ONLY ONE ACTIVE PROGRAM PER NAME, THE INDEX ALSO SERVES NAME LOOKUP OF AccelerationProgramSerializer
+            models.UniqueConstraint(
+                fields=["name"], condition=models.Q(is_active=True), name="program_active_name_unique"
+            ),
+        ]
+        indexes = [
+            # PARTIAL INDEX FOR EXPIRY SWEEP, IT STAYS AS SMALL AS THE NUMBER OF ACTIVE PROGRAMS
+            models.Index(
+                fields=["registration_end_date"], condition=models.Q(is_active=True), name="program_active_reg_end_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="program_search_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} - active={self.is_active}"
@@ -54,13 +77,19 @@ class JoinProgram(models.Model):
     stages_data = models.ManyToManyField(to=Stage)
 
     joined_applicants = models.IntegerField(default=0)
+    is_active = models.BooleanField(default=True)  # DEACTIVATED WHEN DIRECTION IS DROPPED FROM THE PROGRAM
 
     class Meta:
-        unique_together = ["direction", "program"]
+        constraints = [models.UniqueConstraint(fields=["direction", "program"], name="join_program_unique")]
 
     def __str__(self):
         return f"direction={self.direction} - program={self.program}"
 
+    @classmethod
+    def change_joined_applicants(cls, join_program_id: int, delta: int) -> None:
+        """Atomically shifts joined_applicants counter in database without loading (and locking longer) the row"""
+        cls.objects.filter(pk=join_program_id).update(joined_applicants=F("joined_applicants") + delta)
+
 
 class Applicants(models.Model):
     class RequestStatuses(models.TextChoices):
@@ -75,16 +104,57 @@ class Applicants(models.Model):
     request_status = models.CharField(max_length=150, default=RequestStatuses.PENDING, choices=RequestStatuses.choices)
 
     class Meta:
-        unique_together = ["program_to_join", "applicant"]
+        constraints = [models.UniqueConstraint(fields=["program_to_join", "applicant"], name="applicant_unique")]
+        indexes = [
+            # COMPOSITE INDEXES THAT BACK THE KEYSET PAGINATION ORDER (join_request_date, id) FOR EVERY FILTER
+            models.Index(fields=["join_request_date", "id"], name="applicant_date_id_idx"),
+            models.Index(fields=["request_status", "join_request_date", "id"], name="applicant_status_date_idx"),
+            models.Index(fields=["program_to_join", "join_request_date", "id"], name="applicant_join_date_idx"),
+            # REQUEST STATUS OF THE USER WHICH IS CHECKED ON EVERY APPLICANT RESPONSE
+            models.Index(fields=["applicant", "request_status"], name="applicant_user_status_idx"),
+        ]
 
     def __str__(self):
         return f"{self.applicant} - {self.program_to_join}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # REMEMBERING LOADED PROGRAM SO THAT SAVE CAN MOVE THE COUNTER WHEN APPLICANT CHANGES PROGRAM
+        instance._loaded_program_to_join_id = instance.__dict__.get("program_to_join_id")
+        instance._loaded_request_status = instance.__dict__.get("request_status")
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.id:
-            self.program_to_join.joined_applicants += 1
-            self.program_to_join.save()
-        super().save(*args, **kwargs)
+        """
+        Keeps JoinProgram.joined_applicants in sync with F() expressions instead of read-modify-write,
+        so concurrent registrations can't lose increments. Deletion is handled by post_delete signal.
+        Changed request status is written to NotificationOutbox in the same transaction
+        """
+
+        adding = self._state.adding
+        loaded_program_to_join_id = getattr(self, "_loaded_program_to_join_id", None)
+        loaded_request_status = getattr(self, "_loaded_request_status", None)
+
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+            if adding:
+                JoinProgram.change_joined_applicants(self.program_to_join_id, 1)
+            elif loaded_program_to_join_id and loaded_program_to_join_id != self.program_to_join_id:
+                JoinProgram.change_joined_applicants(loaded_program_to_join_id, -1)
+                JoinProgram.change_joined_applicants(self.program_to_join_id, 1)
+
+            if loaded_request_status and loaded_request_status != self.request_status:
+                NotificationOutbox.objects.create(
+                    recipient_id=self.applicant_id,
+                    event=NotificationOutbox.Events.REQUEST_STATUS,
+                    object_id=self.pk,
+                    status=self.request_status,
+                )
+
+        self._loaded_program_to_join_id = self.program_to_join_id
+        self._loaded_request_status = self.request_status
 
 
 class ApplicantResponse(models.Model):
@@ -99,13 +169,43 @@ class ApplicantResponse(models.Model):
 
     applicant_response_description = models.TextField(null=True, blank=True)
     status = models.CharField(max_length=150, default=Statuses.PENDING, choices=Statuses.choices)
+    search_vector = SearchVectorField(null=True, editable=False)  # DESCRIPTION, MAINTAINED BY TRIGGER
 
     class Meta:
-        unique_together = ["applicant", "stage"]
+        constraints = [models.UniqueConstraint(fields=["applicant", "stage"], name="applicant_response_unique")]
+        indexes = [
+            # REJECTED RESPONSES ARE THE ONLY ONES LOOKED UP BY STATUS, SO THE INDEX KEEPS JUST THEM
+            models.Index(fields=["applicant"], condition=models.Q(status="Rejected"), name="response_rejected_idx"),
+            GinIndex(fields=["search_vector"], name="response_search_idx"),
+        ]
 
     def __str__(self):
         return f"{self.applicant} - {self.stage} - {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get("status")  # SAVE NOTIFIES APPLICANT WHEN STATUS CHANGES
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Changed status is written to NotificationOutbox in the same transaction"""
+
+        loaded_status = getattr(self, "_loaded_status", None)
+
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+            if loaded_status and loaded_status != self.status:
+                NotificationOutbox.objects.create(
+                    recipient_id=self.applicant_id,
+                    event=NotificationOutbox.Events.RESPONSE_STATUS,
+                    object_id=self.pk,
+                    status=self.status,
+                )
+
+        self._loaded_status = self.status
+
 
 class StuffFinalResponseDescription(models.Model):
     class Statuses(models.TextChoices):
@@ -119,7 +219,9 @@ class StuffFinalResponseDescription(models.Model):
     status = models.CharField(max_length=150, choices=Statuses.choices)
 
     class Meta:
-        unique_together = ["author", "applicant_response"]
+        constraints = [
+            models.UniqueConstraint(fields=["author", "applicant_response"], name="stuff_final_response_unique")
+        ]
 
     def __str__(self):
         return f"author={self.author} - {self.applicant_response}"
@@ -139,7 +241,107 @@ class StuffMembersResponse(models.Model):
     point = models.FloatField()
 
     class Meta:
-        unique_together = ["author", "applicant_response"]
+        constraints = [
+            models.UniqueConstraint(fields=["author", "applicant_response"], name="stuff_members_response_unique")
+        ]
 
     def __str__(self):
         return f"author={self.author} - {self.applicant_response}"
+
+    def save(self, *args, **kwargs):
+        """Point and its ApplicantResponseScore update (post_save signal) are committed together"""
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class ApplicantResponseScore(models.Model):
+    """Summary of StuffMembersResponse points per applicant response, which is maintained by signals"""
+
+    applicant_response = models.OneToOneField(
+        to=ApplicantResponse, on_delete=models.CASCADE, primary_key=True, related_name="score"
+    )
+    points_count = models.IntegerField(default=0)
+    points_sum = models.FloatField(default=0)
+    point_avg = models.FloatField(null=True)
+    point_min = models.FloatField(null=True)
+    point_max = models.FloatField(null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["point_avg"], name="score_point_avg_idx")]
+
+    def __str__(self):
+        return f"{self.applicant_response} - avg={self.point_avg}"
+
+    @classmethod
+    def add_point(cls, applicant_response_id: int, point: float) -> None:
+        """Incrementally adds new point to the summary with one UPDATE, so concurrent evaluations aren't lost"""
+
+        cls.objects.bulk_create([cls(applicant_response_id=applicant_response_id)], ignore_conflicts=True)
+        cls.objects.filter(applicant_response_id=applicant_response_id).update(
+            points_count=F("points_count") + 1,
+            points_sum=F("points_sum") + point,
+            point_avg=(F("points_sum") + point) / (F("points_count") + 1),
+            point_min=Least(Coalesce("point_min", Value(point)), Value(point)),
+            point_max=Greatest(Coalesce("point_max", Value(point)), Value(point)),
+        )
+
+    @classmethod
+    def refresh(cls, applicant_response_id: int) -> None:
+        """
+        Recalculates the summary from all points of the applicant response, it is used when point changes or goes.
+        Summary is only updated (never created), so cascade deletion of applicant response can't resurrect it.
+        Summary row is locked before points are aggregated, so add_point of concurrent evaluation waits for
+        the recalculated summary instead of being overwritten by the summary which doesn't have its point
+        """
+
+        with transaction.atomic():
+            if not cls.objects.select_for_update().filter(applicant_response_id=applicant_response_id).exists():
+                return
+
+            summary = StuffMembersResponse.objects.filter(applicant_response_id=applicant_response_id).aggregate(
+                points_count=models.Count("id"),
+                points_sum=Coalesce(models.Sum("point"), Value(0.0)),
+                point_avg=models.Avg("point"),
+                point_min=models.Min("point"),
+                point_max=models.Max("point"),
+            )
+            cls.objects.filter(applicant_response_id=applicant_response_id).update(**summary)
+
+
+class NotificationOutbox(models.Model):
+    """
+    Status changes which applicants are notified about. Events are written in the same transaction as the change,
+    so none of them is lost or sent for rolled back change, and drain_notification_outbox task sends them later
+    as one digest per applicant. digest_key is set when event is claimed by digest, it is the key (and Message-ID)
+    of the digest, so retried digest has the same events and the same key. Delivery is at least once: digest which
+    was sent, but whose sent_at wasn't committed, is sent again.
+    Digest which fails OUTBOX_MAX_ATTEMPTS times gets dead_at, it isn't retried and is kept for investigation
+    """
+
+    class Events(models.TextChoices):
+        REQUEST_STATUS = "request_status"  # Applicants.request_status, object_id IS Applicants ID
+        RESPONSE_STATUS = "response_status"  # ApplicantResponse.status, object_id IS ApplicantResponse ID
+
+    recipient = models.ForeignKey(to=CustomUserModel, on_delete=models.CASCADE, related_name="+")
+    event = models.CharField(max_length=50, choices=Events.choices)
+    object_id = models.BigIntegerField()
+    status = models.CharField(max_length=150)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    digest_key = models.CharField(max_length=64, null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    dead_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # PARTIAL INDEXES OF THE QUEUE, THEY STAY AS SMALL AS THE NUMBER OF EVENTS WHICH AREN'T SENT YET
+            models.Index(fields=["id"], condition=models.Q(digest_key__isnull=True), name="outbox_unclaimed_idx"),
+            models.Index(fields=["digest_key"], condition=models.Q(sent_at__isnull=True), name="outbox_unsent_idx"),
+            # SENT EVENTS ARE PURGED BY AGE
+            models.Index(fields=["sent_at"], condition=models.Q(sent_at__isnull=False), name="outbox_sent_at_idx"),
+            models.Index(fields=["dead_at"], condition=models.Q(dead_at__isnull=False), name="outbox_dead_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient_id} - {self.event}={self.status} - sent_at={self.sent_at} - dead_at={self.dead_at}"
@@ -0,0 +1,153 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.mail.utils import DNS_NAME
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.acceleration_program.models import Applicants, ApplicantResponse, NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 1000
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETENTION = timedelta(days=7)
+OUTBOX_DEAD_LETTER_RETENTION = timedelta(days=30)
+
+DIGEST_SUBJECT = "Acceleration program: status updates"
+
+
+def claim_outbox_events(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Assigns the oldest unclaimed events to digests, one digest per recipient, and returns number of claimed events.
+    Rows locked by concurrent drain are skipped, so workers never claim the same event twice
+    """
+
+    with transaction.atomic():
+        events = list(
+            NotificationOutbox.objects.filter(digest_key__isnull=True)
+            .select_for_update(skip_locked=True)
+            .only("id", "recipient_id")
+            .order_by("id")[:batch_size]
+        )
+
+        events_by_recipient: Dict[int, List["NotificationOutbox"]] = defaultdict(list)
+        for event in events:
+            events_by_recipient[event.recipient_id].append(event)
+
+        # EVENT IDS ARE CLAIMED ONLY ONCE, SO RECIPIENT WITH THE FIRST AND THE LAST EVENT IDS IS UNIQUE KEY
+        for recipient_id, recipient_events in events_by_recipient.items():
+            digest_key = f"outbox-{recipient_id}-{recipient_events[0].id}-{recipient_events[-1].id}"
+            for event in recipient_events:
+                event.digest_key = digest_key
+
+        NotificationOutbox.objects.bulk_update(events, ["digest_key"])
+    return len(events)
+
+
+def get_pending_digest_keys(after: str = "", limit: int = OUTBOX_BATCH_SIZE) -> List[str]:
+    """Keys of digests which aren't sent yet in key order, so drain goes through them once without OFFSET"""
+    return list(
+        NotificationOutbox.objects.filter(sent_at__isnull=True, dead_at__isnull=True, digest_key__gt=after)
+        .values_list("digest_key", flat=True)
+        .distinct()
+        .order_by("digest_key")[:limit]
+    )
+
+
+def send_digest(digest_key: str) -> bool:
+    """
+    Sends digest of claimed events and marks them as sent, returns False when digest wasn't sent by this call.
+    Failed digest counts the attempt and is retried by next drains with the same events and Message-ID,
+    after OUTBOX_MAX_ATTEMPTS failures it becomes dead letter
+    """
+
+    try:
+        with transaction.atomic():
+            events = list(
+                NotificationOutbox.objects.filter(digest_key=digest_key, sent_at__isnull=True, dead_at__isnull=True)
+                .select_for_update(skip_locked=True)
+                .select_related("recipient")
+                .order_by("id")
+            )
+            if not events:
+                return False  # ALREADY SENT OR BEING SENT BY ANOTHER WORKER
+
+            message = build_digest_message(digest_key, events)
+            if message is not None:
+                message.send()
+            NotificationOutbox.objects.filter(digest_key=digest_key).update(sent_at=timezone.now())
+    except Exception:  # FAILURE OF ONE DIGEST MUSTN'T STOP THE OTHERS
+        logger.exception("Notification digest %s failed", digest_key)
+        NotificationOutbox.objects.filter(digest_key=digest_key).update(attempts=F("attempts") + 1)
+        dead = NotificationOutbox.objects.filter(
+            digest_key=digest_key, attempts__gte=OUTBOX_MAX_ATTEMPTS, dead_at__isnull=True
+        ).update(dead_at=timezone.now())
+        if dead:
+            logger.error(
+                "Notification digest %s gave up after %s attempts, %s events are dead letters",
+                digest_key,
+                OUTBOX_MAX_ATTEMPTS,
+                dead,
+            )
+        return False
+
+    return True
+
+
+def build_digest_message(digest_key: str, events: List["NotificationOutbox"]) -> Optional["EmailMessage"]:
+    """
+    Coalesces events of one recipient: every applicant request and response is reported once with its latest status.
+    Returns None when all objects of the events were deleted since
+    """
+
+    latest: Dict[Tuple[str, int], str] = {(event.event, event.object_id): event.status for event in events}
+    ids_by_event: Dict[str, List[int]] = defaultdict(list)
+    for event, object_id in latest:
+        ids_by_event[event].append(object_id)
+
+    applicants = Applicants.objects.select_related("program_to_join__program", "program_to_join__direction").in_bulk(
+        ids_by_event[NotificationOutbox.Events.REQUEST_STATUS]
+    )
+    responses = ApplicantResponse.objects.select_related("stage").in_bulk(
+        ids_by_event[NotificationOutbox.Events.RESPONSE_STATUS]
+    )
+
+    lines = []
+    for (event, object_id), status in latest.items():
+        if event == NotificationOutbox.Events.REQUEST_STATUS and object_id in applicants:
+            join_program = applicants[object_id].program_to_join
+            lines.append(
+                f"Your request to join {join_program.program.name} ({join_program.direction.title}) is {status}"
+            )
+        elif event == NotificationOutbox.Events.RESPONSE_STATUS and object_id in responses:
+            lines.append(f"Your response to stage {responses[object_id].stage.name} is {status}")
+
+    if not lines:
+        return None
+
+    # SMTP DOESN'T DEDUPLICATE BY MESSAGE-ID, DIGEST RESENT AFTER FAILURE TO COMMIT sent_at IS DELIVERED TWICE,
+    # STABLE MESSAGE-ID ONLY LETS MAIL CLIENTS WHICH DO DEDUPLICATE OR THREAD BY IT SHOW IT AS ONE MESSAGE
+    return EmailMessage(
+        subject=DIGEST_SUBJECT,
+        body="\n".join(lines),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[events[0].recipient.email],
+        headers={"Message-ID": f"<{digest_key}@{DNS_NAME}>"},
+    )
+
+
+def purge_outbox_events(
+    retention: timedelta = OUTBOX_RETENTION, dead_letter_retention: timedelta = OUTBOX_DEAD_LETTER_RETENTION
+) -> int:
+    """Deletes sent events and dead letters after their retention, dead letters are kept longer for investigation"""
+    now = timezone.now()
+    deleted, _ = NotificationOutbox.objects.filter(
+        Q(sent_at__lt=now - retention) | Q(dead_at__lt=now - dead_letter_retention)
+    ).delete()
+    return deleted
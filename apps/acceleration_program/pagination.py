@@ -0,0 +1,27 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class ApplicantCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (join_request_date, id) so that every page costs the same
+    no matter how deep the client scrolls, instead of OFFSET scans over the whole table
+    """
+
+    ordering = ("join_request_date", "id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class SearchPagination(LimitOffsetPagination):
+    """Search results are ordered by rank, which keyset can't follow, so pages are small windows of top matches"""
+
+    default_limit = 20
+    max_limit = 100
+
+
+class RankingPagination(LimitOffsetPagination):
+    """Ranks are calculated by window function before LIMIT, so every page keeps ranks of the whole leaderboard"""
+
+    default_limit = 50
+    max_limit = 500
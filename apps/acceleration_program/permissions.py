@@ -19,6 +19,15 @@ class IsStuffDirectionOrAdminUser(BasePermission):
         return request.method in SAFE_METHODS or request.user.user_type in ["Stuff-Direction", "Admin"]
 
 
+class IsStuffMemberOrAdminUser(BasePermission):
+    """Allows access only to the stuff members or users with the admin statuses, including safe methods."""
+
+    message = "You do not have permission to perform this action because you are not stuff member"
+
+    def has_permission(self, request, view) -> bool:
+        return request.user.user_type in ["Stuff-Acceleration", "Stuff-Direction", "Admin"]
+
+
 class IsOwnerAdminStuffOrReadOnly(BasePermission):
     """
     Object-level permission to only allow updating for owner users or privileged users
@@ -29,7 +38,8 @@ class IsOwnerAdminStuffOrReadOnly(BasePermission):
         # so we'll always allow GET, HEAD or OPTIONS requests.
         if request.method in SAFE_METHODS:
             return True
-        return obj.applicant == request.user or request.user.user_type in ["Stuff-Acceleration", "Admin"]
+        # COMPARING IDS, SO NEITHER APPLICANT NOR USER IS LOADED FROM DATABASE
+        return obj.applicant_id == request.user.id or request.user.user_type in ["Stuff-Acceleration", "Admin"]
 
 
 class IsOwnerAdminOrReadOnly(BasePermission):
@@ -42,4 +52,4 @@ class IsOwnerAdminOrReadOnly(BasePermission):
         # so we'll always allow GET, HEAD or OPTIONS requests.
         if request.method in SAFE_METHODS:
             return True
-        return obj.author == request.user or request.user.is_superuser
+        return obj.author_id == request.user.id or request.user.is_superuser
@@ -1,8 +1,10 @@
-import json
-from datetime import date
-from typing import OrderedDict
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, OrderedDict, Tuple
 
-from django_celery_beat.models import ClockedSchedule, PeriodicTask
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from apps.acceleration_program.models import (
@@ -13,7 +15,12 @@ from apps.acceleration_program.models import (
     ApplicantResponse,
     StuffFinalResponseDescription,
     StuffMembersResponse,
+    ApplicantResponseScore,
+    NotificationOutbox,
 )
+from apps.accounts.models import CustomUserModel
+from apps.directions.models import Direction
+from apps.directions.serializers import DirectionsSerializer
 
 
 class AccelerationProgramSerializer(serializers.ModelSerializer):
@@ -33,9 +40,8 @@ class AccelerationProgramSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs: "OrderedDict") -> "OrderedDict":
         """
-        Method that validates AccelerationProgram instance based on name and status
-        and after validation it creates clocked schedule and periodic task based on
-        the acceleration program's registration_end_date
+        Method that validates AccelerationProgram instance based on name, status and dates.
+        On partial update fields which aren't sent are taken from the instance.
         ---------------------------------------------------------------------------
         E.g:
             {
@@ -43,22 +49,27 @@ class AccelerationProgramSerializer(serializers.ModelSerializer):
                 "registration_end_date": "2020-01-01"
                 ...
             }
-            If the data with the same body is in DATABASE, it will raise an exception with status 400_BAD_REQUEST
-            If everything is OK it will create ClockedSchedule and PeriodicTask based on registration_end_date
-            using __create_clocked_scheduled_periodic_task-method and when time will come it will set status of this
-            acceleration program to False so after that no-one can register on this program
-        """
-
-        name, status, program_start_date, program_end_date, registration_start_date, registration_end_date = (
-            attrs.get("name"),
-            attrs.get("is_active"),
-            attrs.get("program_start_date"),
-            attrs.get("program_end_date"),
-            attrs.get("registration_start_date"),
-            attrs.get("registration_end_date"),
+            If the data with the same body is in DATABASE, it will raise an exception with status 400_BAD_REQUEST.
+            When registration_end_date comes, tasks.deactivate_expired_acceleration_programs-task sets status
+            of this acceleration program to False so after that no-one can register on this program
+        """
+
+        name, program_start_date, program_end_date, registration_start_date, registration_end_date = (
+            attrs.get(field, getattr(self.instance, field, None))
+            for field in (
+                "name",
+                "program_start_date",
+                "program_end_date",
+                "registration_start_date",
+                "registration_end_date",
+            )
         )
 
-        if AccelerationProgram.objects.filter(name=name, is_active=True):
+        if (
+            AccelerationProgram.objects.filter(name=name, is_active=True)
+            .exclude(pk=getattr(self.instance, "pk", None))
+            .exists()
+        ):
             raise serializers.ValidationError({"detail": "Active acceleration program with this name already exists"})
 
         if program_start_date > program_end_date:
@@ -76,44 +87,119 @@ class AccelerationProgramSerializer(serializers.ModelSerializer):
                 {"detail": "Registration start date must be less than registration end date"}
             )
 
-        self._create_clocked_scheduled_periodic_task(name=name, registration_end_date=registration_end_date)
-
         return attrs
 
+    def create(self, validated_data: "OrderedDict") -> "AccelerationProgram":
+        with self._unique_active_name():
+            return super().create(validated_data)
+
+    def update(self, instance: "AccelerationProgram", validated_data: "OrderedDict") -> "AccelerationProgram":
+        with self._unique_active_name():
+            return super().update(instance, validated_data)
+
+    @staticmethod
+    @contextmanager
+    def _unique_active_name() -> Iterator[None]:
+        """Program with the same name activated concurrently after validate is reported the same way as in validate"""
+        try:
+            with transaction.atomic():  # SAVEPOINT, SO THAT OUTER TRANSACTION IS USABLE AFTER INTEGRITY ERROR
+                yield
+        except IntegrityError:
+            raise serializers.ValidationError({"detail": "Active acceleration program with this name already exists"})
+
     @staticmethod
     def create_joinprogram_template(instance: "AccelerationProgram") -> None:  # noqa
         """
-        After calling this method templates of JoinProgram should be created based on chosen direction
+        After calling this method templates of JoinProgram should be created based on chosen direction.
+        JoinProgram rows are diffed against program directions so it takes constant number of queries:
+        missing rows are inserted, rows of dropped directions are deactivated (keeping their applicants)
+        and rows of directions that were chosen again are reactivated
         """
 
-        for direction in instance.directions.all():
-            JoinProgram.objects.update_or_create(program_id=instance.id, direction=direction)
+        direction_ids = set(instance.directions.values_list("id", flat=True))
+        join_programs = dict(JoinProgram.objects.filter(program=instance).values_list("direction_id", "is_active"))
 
-    @staticmethod
-    def _create_clocked_scheduled_periodic_task(*, name: str, registration_end_date: date) -> None:
-        clocked_schedule, _ = ClockedSchedule.objects.update_or_create(
-            clocked_time=registration_end_date,
+        JoinProgram.objects.bulk_create(
+            [
+                JoinProgram(program=instance, direction_id=direction_id)
+                for direction_id in direction_ids - join_programs.keys()
+            ],
+            ignore_conflicts=True,
         )
 
-        PeriodicTask.objects.update_or_create(
-            clocked=clocked_schedule,
-            name=f"Periodic task for program -> {name}",
-            task="apps.acceleration_program.tasks.check_acceleration_program",
-            args=json.dumps([name]),
-            one_off=True,
-        )
+        reactivated = {direction_id for direction_id, is_active in join_programs.items() if not is_active}
+        reactivated &= direction_ids
+        if reactivated:
+            JoinProgram.objects.filter(program=instance, direction_id__in=reactivated).update(is_active=True)
+
+        dropped = {direction_id for direction_id, is_active in join_programs.items() if is_active}
+        dropped -= direction_ids
+        if dropped:
+            JoinProgram.objects.filter(program=instance, direction_id__in=dropped).update(is_active=False)
 
 
 class JoinProgramSerializer(serializers.ModelSerializer):
     class Meta:
         model = JoinProgram
         fields = "__all__"
+        read_only_fields = ["joined_applicants"]  # MAINTAINED ATOMICALLY BY Applicants, NEVER WRITTEN BY CLIENTS
+        # DRF DERIVES UNIQUENESS VALIDATORS ONLY FROM unique_together, SO UniqueConstraint ONES ARE DECLARED HERE
+        validators = [
+            serializers.UniqueTogetherValidator(queryset=model.objects.all(), fields=("direction", "program"))
+        ]
+
+
+class StageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Stage
+        fields = "__all__"
+
+
+class JoinProgramProgramSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AccelerationProgram
+        fields = [
+            "id",
+            "name",
+            "program_start_date",
+            "program_end_date",
+            "registration_start_date",
+            "registration_end_date",
+            "is_active",
+        ]
+
+
+class JoinProgramApplicantCountsSerializer(serializers.Serializer):  # noqa
+    """Counts which JoinProgramModelViewSet annotates per request status"""
+
+    pending = serializers.IntegerField(source="pending_applicants")
+    accepted = serializers.IntegerField(source="accepted_applicants")
+    rejected = serializers.IntegerField(source="rejected_applicants")
+
+
+class JoinProgramExpandedSerializer(serializers.ModelSerializer):
+    """
+    Read-only representation of JoinProgram with inlined program, direction and stages.
+    Instead of ids of all applicants it has their counts per request status, so size of the response is bounded
+    """
+
+    program = JoinProgramProgramSerializer(read_only=True)
+    direction = DirectionsSerializer(read_only=True)
+    stages = StageSerializer(source="stages_data", many=True, read_only=True)
+    applicant_counts = JoinProgramApplicantCountsSerializer(source="*", read_only=True)
+
+    class Meta:
+        model = JoinProgram
+        fields = ["id", "program", "direction", "stages", "joined_applicants", "applicant_counts", "is_active"]
 
 
 class RegisteredApplicantsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Applicants
         fields = "__all__"
+        validators = [
+            serializers.UniqueTogetherValidator(queryset=model.objects.all(), fields=("program_to_join", "applicant"))
+        ]
 
 
 class ApplicantsRegistrationSerializer(serializers.ModelSerializer):
@@ -122,6 +208,10 @@ class ApplicantsRegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Applicants
         fields = ["id", "applicant", "program_to_join"]
+        extra_kwargs = {"program_to_join": {"queryset": JoinProgram.objects.filter(is_active=True)}}
+        validators = [
+            serializers.UniqueTogetherValidator(queryset=model.objects.all(), fields=("program_to_join", "applicant"))
+        ]
 
     def create(self, validated_data):
         applicant = Applicants(
@@ -131,10 +221,117 @@ class ApplicantsRegistrationSerializer(serializers.ModelSerializer):
         return applicant
 
 
-class StageSerializer(serializers.ModelSerializer):
+class ApplicantsImportListSerializer(serializers.ListSerializer):
+    BATCH_SIZE = 1000
+
+    def validate(self, attrs: List["OrderedDict"]) -> List["OrderedDict"]:
+        """
+        Validates whole import batch with constant number of queries instead of per-row lookups
+        RESPONSE WITH STATUS 400_BAD_REQUEST in cases when:
+        1) Applicant or program_to_join doesn't exist
+        2) The same applicant is sent twice for the same program_to_join
+        3) Applicant is already registered on program_to_join
+        """
+
+        pairs = [(item["applicant_id"], item["program_to_join_id"]) for item in attrs]
+        applicant_ids, program_to_join_ids = {pair[0] for pair in pairs}, {pair[1] for pair in pairs}
+
+        missing_applicants = applicant_ids - set(
+            CustomUserModel.objects.filter(id__in=applicant_ids).values_list("id", flat=True)
+        )
+        if missing_applicants:
+            raise serializers.ValidationError({"detail": f"Applicants don't exist: {sorted(missing_applicants)}"})
+
+        missing_programs = program_to_join_ids - set(
+            JoinProgram.objects.filter(id__in=program_to_join_ids, is_active=True).values_list("id", flat=True)
+        )
+        if missing_programs:
+            raise serializers.ValidationError(
+                {"detail": f"Active join programs don't exist: {sorted(missing_programs)}"}
+            )
+
+        if len(set(pairs)) != len(pairs):
+            raise serializers.ValidationError({"detail": "The same applicant is sent twice for one join program."})
+
+        self.check_not_registered(pairs)
+        return attrs
+
+    def create(self, validated_data: List["OrderedDict"]) -> List["Applicants"]:
+        """
+        Inserts all applicants with bulk_create and shifts joined_applicants once per join program.
+        Applicant registered concurrently after validation violates applicant_unique, it is reported as in validate
+        """
+
+        try:
+            with transaction.atomic():  # SAVEPOINT, SO THAT OUTER TRANSACTION IS USABLE AFTER INTEGRITY ERROR
+                applicants = Applicants.objects.bulk_create(
+                    [Applicants(**item) for item in validated_data], batch_size=self.BATCH_SIZE
+                )
+                for program_to_join_id, joined in Counter(
+                    item["program_to_join_id"] for item in validated_data
+                ).items():
+                    JoinProgram.change_joined_applicants(program_to_join_id, joined)
+        except IntegrityError:
+            self.check_not_registered([(item["applicant_id"], item["program_to_join_id"]) for item in validated_data])
+            raise serializers.ValidationError({"detail": "Applicants were changed concurrently, retry the import."})
+
+        return applicants
+
+    @staticmethod
+    def check_not_registered(pairs: List[Tuple[int, int]]) -> None:
+        """RESPONSE WITH STATUS 400_BAD_REQUEST when any (applicant, program_to_join) pair is already registered"""
+        registered = set(
+            Applicants.objects.filter(
+                applicant_id__in={pair[0] for pair in pairs}, program_to_join_id__in={pair[1] for pair in pairs}
+            ).values_list("applicant_id", "program_to_join_id")
+        ).intersection(pairs)
+        if registered:
+            raise serializers.ValidationError(
+                {"detail": f"Applicants are already registered (applicant, program_to_join): {sorted(registered)}"}
+            )
+
+
+class ApplicantsImportSerializer(serializers.ModelSerializer):
+    """Serializer that is used by stuff members to import already known applicants in bulk"""
+
+    applicant = serializers.IntegerField(source="applicant_id")
+    program_to_join = serializers.IntegerField(source="program_to_join_id")
+
     class Meta:
-        model = Stage
-        fields = "__all__"
+        model = Applicants
+        fields = ["id", "applicant", "program_to_join", "request_status"]
+        list_serializer_class = ApplicantsImportListSerializer
+        validators = []  # UNIQUENESS IS CHECKED FOR THE WHOLE BATCH IN ApplicantsImportListSerializer
+
+
+class ApplicantsBulkStatusSerializer(serializers.Serializer):  # noqa
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=10000)
+    request_status = serializers.ChoiceField(choices=Applicants.RequestStatuses.choices)
+
+    def save(self, **kwargs) -> int:
+        """
+        Applies request_status to every requested applicant with one UPDATE and returns number of changed rows.
+        Applicants whose status really changes are locked first and notified through NotificationOutbox
+        """
+
+        request_status = self.validated_data["request_status"]
+        applicants = Applicants.objects.filter(id__in=self.validated_data["ids"])
+
+        with transaction.atomic():
+            changed = list(
+                applicants.exclude(request_status=request_status).select_for_update().values_list("id", "applicant_id")
+            )
+            updated = applicants.update(request_status=request_status)
+            NotificationOutbox.objects.bulk_create(
+                NotificationOutbox(
+                    recipient_id=applicant_id,
+                    event=NotificationOutbox.Events.REQUEST_STATUS,
+                    object_id=applicant_pk,
+                    status=request_status,
+                )
+                for applicant_pk, applicant_id in changed
+            )
+            return updated
 
 
 class ApplicantResponseSerializer(serializers.ModelSerializer):
@@ -143,6 +340,7 @@ class ApplicantResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = ApplicantResponse
         fields = ["id", "applicant", "stage", "direction", "applicant_response_description"]
+        validators = [serializers.UniqueTogetherValidator(queryset=model.objects.all(), fields=("applicant", "stage"))]
 
     def validate(self, attrs: "OrderedDict") -> "OrderedDict":
         """
@@ -160,17 +358,17 @@ class ApplicantResponseSerializer(serializers.ModelSerializer):
         stage: Stage = attrs.get("stage")
         direction = attrs.get("direction")
 
-        applicant = Applicants.objects.filter(applicant_id=user_id)
+        eligibility = self._get_eligibility(user_id=user_id, stage=stage, direction=direction)
 
-        if not applicant:
+        if not eligibility["is_registered"]:
             raise serializers.ValidationError({"detail": "You are not registered as applicant."})
 
-        if not stage.joinprogram_set.first():
+        if not eligibility["is_stage_registered"]:
             raise serializers.ValidationError(
                 {"detail": "You can't send response. Maybe stage exists but for program it isn't registered yet."}
             )
 
-        if applicant.filter(request_status="Pending"):
+        if eligibility["is_pending"]:
             raise serializers.ValidationError(
                 {
                     "detail": "Your request to join as an applicant is pending. "
@@ -178,27 +376,51 @@ class ApplicantResponseSerializer(serializers.ModelSerializer):
                 }
             )
 
-        elif applicant.filter(request_status="Rejected"):
+        elif eligibility["is_rejected"]:
             raise serializers.ValidationError(
                 {"detail": "Your request to join as an applicant is rejected so you can't send response."}
             )
 
-        if not applicant.filter(program_to_join__direction=direction):
+        if not eligibility["is_direction_appropriate"]:
             raise serializers.ValidationError(
                 {"detail": "Your response direction isn't appropriate for this stage, please fix it."}
             )
 
-        if Stage.objects.filter(
-            joinprogram__program__is_active=True,
-            applicantresponse__applicant=user_id,
-            applicantresponse__status="Rejected",
-        ):
+        if eligibility["is_rejected_before"]:
             raise serializers.ValidationError(
                 {"detail": "You are rejected in previous stage, therefore you can't send response."}
             )
 
         return attrs
 
+    @staticmethod
+    def _get_eligibility(*, user_id: int, stage: "Stage", direction: "Direction") -> Dict[str, bool]:
+        """
+        Collects every verdict that validate-method needs in a single round trip,
+        each verdict is an EXISTS subquery evaluated against the requested stage row
+        """
+
+        applicant = Applicants.objects.filter(applicant_id=user_id)
+
+        return (
+            Stage.objects.filter(pk=stage.pk)
+            .values(
+                is_registered=Exists(applicant),
+                is_stage_registered=Exists(JoinProgram.objects.filter(stages_data=OuterRef("pk"))),
+                is_pending=Exists(applicant.filter(request_status=Applicants.RequestStatuses.PENDING)),
+                is_rejected=Exists(applicant.filter(request_status=Applicants.RequestStatuses.REJECTED)),
+                is_direction_appropriate=Exists(applicant.filter(program_to_join__direction=direction)),
+                is_rejected_before=Exists(
+                    ApplicantResponse.objects.filter(
+                        applicant_id=user_id,
+                        status=ApplicantResponse.Statuses.REJECTED,
+                        stage__joinprogram__program__is_active=True,
+                    )
+                ),
+            )
+            .get()
+        )
+
 
 class StuffFinalResponseDescriptionSerializer(serializers.ModelSerializer):
     author = serializers.PrimaryKeyRelatedField(read_only=True, default=serializers.CurrentUserDefault())
@@ -216,20 +438,61 @@ class StuffFinalResponseDescriptionSerializer(serializers.ModelSerializer):
         ]
 
     def validate(self, attrs: "OrderedDict") -> "OrderedDict":
-        """In this method applicant_response status will change based on stuff evaluation"""
+        """
+        Only validates status and that update keeps applicant_response, its status is changed by create and update
+        together with evaluation, so moved evaluation would leave status of the previous applicant_response behind
+        """
+
+        applicant_response = attrs.get("applicant_response")
+        if self.instance is not None and applicant_response not in (None, self.instance.applicant_response):
+            raise serializers.ValidationError(
+                {"applicant_response": ["Evaluation can't be moved to another applicant response."]}
+            )
 
-        applicant_response: "ApplicantResponse" = attrs["applicant_response"]
         status = attrs["status"]  # STATUS THAT DETERMINES IF APPLICANT RESPONSE IS ACCEPTED OR REJECTED
 
         if status == "None":
             raise serializers.ValidationError(
                 {"detail": "Status must be accepted or rejected, please use one of them."}
             )
-        applicant_response.status = status
-        applicant_response.save()
 
         return attrs
 
+    def create(self, validated_data: "OrderedDict") -> "StuffFinalResponseDescription":
+        with self._evaluation(validated_data["applicant_response"], validated_data["status"]):
+            return super().create(validated_data)
+
+    def update(
+        self, instance: "StuffFinalResponseDescription", validated_data: "OrderedDict"
+    ) -> "StuffFinalResponseDescription":
+        with self._evaluation(instance.applicant_response, validated_data.get("status", instance.status)):
+            return super().update(instance, validated_data)
+
+    @contextmanager
+    def _evaluation(self, applicant_response: "ApplicantResponse", status: str) -> Iterator[None]:
+        """
+        Evaluation and status of applicant_response are written in one transaction, so failed evaluation doesn't
+        change the status. Applicant response is locked before the evaluation is inserted, concurrent graders wait
+        for each other and the status compared with is current, so its change is always notified (see save).
+        Status is written only when it changes and only its column is updated
+        """
+        try:
+            with transaction.atomic():
+                # NO KEY UPDATE LOCK DOESN'T CONFLICT WITH FOREIGN KEY CHECKS OF INSERTED EVALUATIONS
+                locked = (
+                    ApplicantResponse.objects.select_for_update(no_key=True)
+                    .only("id", "applicant_id", "status")
+                    .get(pk=applicant_response.pk)
+                )
+                yield
+
+                if locked.status != status:
+                    locked.status = status
+                    locked.save(update_fields=["status"])
+                applicant_response.status = status
+        except IntegrityError:
+            raise serializers.ValidationError({"detail": self.Meta.validators[0].message})
+
 
 class StuffMembersResponseSerializer(serializers.ModelSerializer):
     author = serializers.PrimaryKeyRelatedField(read_only=True, default=serializers.CurrentUserDefault())
@@ -237,3 +500,93 @@ class StuffMembersResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = StuffMembersResponse
         fields = ["id", "author", "point", "applicant_response"]
+        validators = [
+            serializers.UniqueTogetherValidator(queryset=model.objects.all(), fields=("author", "applicant_response"))
+        ]
+
+
+class ApplicantResponseRankingSerializer(serializers.ModelSerializer):
+    applicant = serializers.IntegerField(source="applicant_response.applicant_id", read_only=True)
+    stage = serializers.IntegerField(source="applicant_response.stage_id", read_only=True)
+    direction = serializers.IntegerField(source="applicant_response.direction_id", read_only=True)
+    rank = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ApplicantResponseScore
+        fields = [
+            "applicant_response",
+            "applicant",
+            "stage",
+            "direction",
+            "points_count",
+            "point_avg",
+            "point_min",
+            "point_max",
+            "rank",
+        ]
+
+
+class PipelineFinalDecisionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StuffFinalResponseDescription
+        fields = ["id", "author", "status", "description"]
+
+
+class PipelineResponseSerializer(serializers.ModelSerializer):
+    final_decisions = PipelineFinalDecisionSerializer(many=True, read_only=True)
+    # SCORE DOESN'T EXIST UNTIL THE FIRST STUFF MEMBER POINT, THEN FIELDS ARE NULL
+    points_count = serializers.IntegerField(source="score.points_count", read_only=True, allow_null=True)
+    point_avg = serializers.FloatField(source="score.point_avg", read_only=True, allow_null=True)
+
+    class Meta:
+        model = ApplicantResponse
+        fields = ["id", "status", "final_decisions", "points_count", "point_avg"]
+
+
+class PipelineStageSerializer(serializers.Serializer):  # noqa
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    response = PipelineResponseSerializer(allow_null=True)
+
+
+class ApplicantPipelineSerializer(serializers.ModelSerializer):
+    """
+    Applicant with every stage of the join program, stage has response of the applicant or null.
+    Stages of the join program are passed in context, responses are prefetched to applicant.pipeline_responses
+    """
+
+    email = serializers.EmailField(source="applicant.email", read_only=True)
+    stages = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Applicants
+        fields = ["id", "applicant", "email", "request_status", "join_request_date", "stages"]
+
+    @extend_schema_field(PipelineStageSerializer(many=True))
+    def get_stages(self, instance: "Applicants") -> List[dict]:
+        responses = {response.stage_id: response for response in instance.applicant.pipeline_responses}
+        return PipelineStageSerializer(
+            [
+                {"id": stage.id, "name": stage.name, "response": responses.get(stage.id)}
+                for stage in self.context["stages"]
+            ],
+            many=True,
+        ).data
+
+
+class ProgramSearchResultSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = AccelerationProgram
+        fields = ["id", "name", "is_active", "registration_start_date", "registration_end_date", "rank", "headline"]
+
+
+class ApplicantResponseSearchResultSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = ApplicantResponse
+        fields = ["id", "applicant", "stage", "direction", "status", "rank", "headline"]
@@ -0,0 +1,69 @@
+from functools import partial
+from typing import Type
+
+from django.db import transaction
+from django.db.models import Model, QuerySet
+from django.db.models.signals import post_delete, post_save, m2m_changed
+from django.dispatch import receiver
+
+from apps.acceleration_program.models import (
+    AccelerationProgram,
+    Applicants,
+    ApplicantResponse,
+    ApplicantResponseScore,
+    JoinProgram,
+    Stage,
+    StuffMembersResponse,
+)
+from apps.directions.models import Direction
+from core.cache import invalidate_cache_namespaces
+
+
+def _is_deleted_with(origin, *models: Type[Model]) -> bool:
+    """
+    Returns True when deletion was started from instance or queryset of one of the models, so rows deleted by
+    cascade belong to parents which are deleted as well and summaries of these parents don't need updates
+    """
+    return isinstance(origin, models) or (isinstance(origin, QuerySet) and issubclass(origin.model, models))
+
+
+@receiver(post_delete, sender=Applicants)
+def decrement_joined_applicants(sender, instance: "Applicants", origin=None, **kwargs) -> None:
+    """Signal receiver that keeps joined_applicants correct on deletes, including cascades and queryset deletes"""
+    if _is_deleted_with(origin, JoinProgram, AccelerationProgram):
+        return  # ONE QUERY PER APPLICANT WOULD BE WASTED ON COUNTER OF DELETED JOIN PROGRAM
+    JoinProgram.change_joined_applicants(instance.program_to_join_id, -1)
+
+
+@receiver(post_save, sender=AccelerationProgram)
+@receiver(post_delete, sender=AccelerationProgram)
+@receiver(m2m_changed, sender=AccelerationProgram.directions.through)
+@receiver(post_delete, sender=Direction)  # DELETED DIRECTION DISAPPEARS FROM PROGRAMS WITHOUT m2m_changed SIGNAL
+def invalidate_programs_cache(sender, **kwargs) -> None:
+    """Invalidates cached program responses after the transaction that changed them commits"""
+    if kwargs.get("action", "post").startswith("pre"):
+        return
+    transaction.on_commit(partial(invalidate_cache_namespaces, "programs"))
+
+
+@receiver(post_save, sender=Stage)
+@receiver(post_delete, sender=Stage)
+def invalidate_stages_cache(sender, **kwargs) -> None:
+    """Invalidates cached stage responses after the transaction that changed them commits"""
+    transaction.on_commit(partial(invalidate_cache_namespaces, "stages"))
+
+
+@receiver(post_save, sender=StuffMembersResponse)
+def update_applicant_response_score(sender, instance: "StuffMembersResponse", created: bool, **kwargs) -> None:
+    """New points are added to the summary incrementally, changed points require recalculation of the summary"""
+    if created:
+        ApplicantResponseScore.add_point(instance.applicant_response_id, instance.point)
+    else:
+        ApplicantResponseScore.refresh(instance.applicant_response_id)
+
+
+@receiver(post_delete, sender=StuffMembersResponse)
+def refresh_applicant_response_score(sender, instance: "StuffMembersResponse", origin=None, **kwargs) -> None:
+    if _is_deleted_with(origin, ApplicantResponse, Stage, Direction):
+        return  # SCORE IS DELETED TOGETHER WITH APPLICANT RESPONSE
+    ApplicantResponseScore.refresh(instance.applicant_response_id)
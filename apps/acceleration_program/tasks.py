@@ -1,17 +1,59 @@
-from datetime import datetime
+import logging
+
+from django.utils import timezone
 
 from apps.acceleration_program.models import AccelerationProgram
+from apps.acceleration_program.notifications import (
+    OUTBOX_BATCH_SIZE,
+    claim_outbox_events,
+    get_pending_digest_keys,
+    purge_outbox_events,
+    send_digest,
+)
+from core.cache import invalidate_cache_namespaces
 from core.celery import app
 
+logger = logging.getLogger(__name__)
+
+
+@app.task
+def deactivate_expired_acceleration_programs() -> int:
+    """
+    Periodic task that disables every acceleration program whose registration end date has come,
+    using one UPDATE over partial index of active programs. Task is idempotent, so missed or duplicated
+    beats are harmless and its cost doesn't depend on the number of programs in the table
+    RESULT: AccelerationProgram.is_active=False, returns number of disabled programs
+    """
+
+    deactivated = AccelerationProgram.objects.filter(
+        is_active=True, registration_end_date__lte=timezone.localdate()
+    ).update(is_active=False)
+
+    if deactivated:
+        invalidate_cache_namespaces("programs")  # QUERYSET UPDATE DOESN'T SEND post_save SIGNAL
+
+    logger.info("Deactivated %s expired acceleration programs", deactivated)
+    return deactivated
+
 
 @app.task
-def check_acceleration_program(name: str) -> None:
+def drain_notification_outbox(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
     """
-    Task that checks if program done or not.
-    If acceleration program end date has come it must be disabled
-    RESULT: AccelerationProgram.is_active=False
+    Periodic task that drains NotificationOutbox in batches: claims new events into one digest per applicant,
+    then sends every pending digest, failed ones are retried by next runs until OUTBOX_MAX_ATTEMPTS (dead letters).
+    Concurrent runs skip rows locked by each other, and digests committed as sent are never sent again
+    RESULT: NotificationOutbox.sent_at is set, returns number of sent digests
     """
 
-    acceleration_program: "AccelerationProgram" = AccelerationProgram.objects.filter(name=name).first()
-    acceleration_program.is_active = False
-    acceleration_program.save()
+    while claim_outbox_events(batch_size) == batch_size:
+        pass
+
+    # EVERY DIGEST IS TRIED ONCE PER RUN, SO FAILING ONES ARE RETRIED BY THE NEXT RUNS INSTEAD OF IN A LOOP
+    sent, last_digest_key = 0, ""
+    while digest_keys := get_pending_digest_keys(after=last_digest_key, limit=batch_size):
+        sent += sum(send_digest(digest_key) for digest_key in digest_keys)
+        last_digest_key = digest_keys[-1]
+
+    purged = purge_outbox_events()
+    logger.info("Sent %s notification digests, purged %s sent and dead events", sent, purged)
+    return sent
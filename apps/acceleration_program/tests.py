@@ -1,13 +1,28 @@
-from datetime import date
+import csv
+import itertools
+import json
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
 from io import StringIO
-from unittest import mock
+from smtplib import SMTPException
+from unittest import mock, skipUnless
 
 from django.contrib.auth import get_user_model
-from django.db.models import ProtectedError
-from django.test import TestCase
+from django.contrib.postgres.search import SearchQuery
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import ProtectedError, QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django_celery_beat.models import ClockedSchedule, PeriodicTask
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APITestCase, APIClient
 from rest_framework_simplejwt.tokens import AccessToken
 
@@ -18,9 +33,24 @@ from apps.acceleration_program.models import (
     Stage,
     JoinProgram,
     Applicants,
+    ApplicantResponse,
+    ApplicantResponseScore,
+    StuffMembersResponse,
+    StuffFinalResponseDescription,
+    NotificationOutbox,
+    SEARCH_CONFIG,
 )
+from apps.acceleration_program.notifications import OUTBOX_MAX_ATTEMPTS
+from apps.acceleration_program.serializers import (
+    AccelerationProgramSerializer,
+    ApplicantResponseSerializer,
+    ApplicantsImportListSerializer,
+)
+from apps.acceleration_program.tasks import deactivate_expired_acceleration_programs, drain_notification_outbox
 from apps.accounts.models import CustomUserModel
+from apps.accounts.tokens import RoleAccessToken
 from apps.directions.models import Direction
+from core.testing import ProgramFixtureMixin, QueryBudgetTestMixin
 
 
 class ApplicantModelViewSetTestCase(APITestCase):
@@ -49,8 +79,45 @@ class ApplicantModelViewSetTestCase(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["program_to_join"], self.join_program.pk)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["program_to_join"], self.join_program.pk)
+
+    def test_list_applicants_cursor_pagination(self):
+        User = get_user_model()  # noqa
+        for index in range(3):
+            user = User.objects.create_user(email=f"applicant{index}@example.com", password="testpass")
+            Applicants.objects.create(program_to_join=self.join_program, applicant=user)
+
+        url = reverse("acceleration_program:applicant-list")
+        first_page = self.client.get(url, {"page_size": 2})
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(first_page.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first_page.data["results"]), 2)
+        self.assertEqual(len(second_page.data["results"]), 1)
+        self.assertIsNone(second_page.data["next"])
+        self.assertEqual(
+            len({applicant["id"] for applicant in first_page.data["results"] + second_page.data["results"]}), 3
+        )
+
+    def test_list_applicants_filters(self):
+        other_direction = Direction.objects.create(title="Other Direction", number_of_stages=1)
+        other_join_program = JoinProgram.objects.create(program=self.program, direction=other_direction)
+        Applicants.objects.create(program_to_join=self.join_program, applicant=self.user)
+        Applicants.objects.create(
+            program_to_join=other_join_program,
+            applicant=self.user,
+            request_status=Applicants.RequestStatuses.ACCEPTED,
+        )
+
+        url = reverse("acceleration_program:applicant-list")
+        by_direction = self.client.get(url, {"program": self.program.pk, "direction": other_direction.pk})
+        by_status = self.client.get(url, {"request_status": Applicants.RequestStatuses.PENDING})
+        invalid = self.client.get(url, {"program": "abc"})
+
+        self.assertEqual([a["program_to_join"] for a in by_direction.data["results"]], [other_join_program.pk])
+        self.assertEqual([a["program_to_join"] for a in by_status.data["results"]], [self.join_program.pk])
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_retrieve_applicant(self):
         applicant = Applicants.objects.create(program_to_join=self.join_program, applicant=self.user)
@@ -131,7 +198,7 @@ class AccelerationProgramTestCase(TestCase):
 
     def test_model_default_values(self):
         program = AccelerationProgram.objects.create(
-            name="Test Program",
+            name="Default Values Program",
             requirements="Test Requirements",
             program_start_date=date(2023, 1, 1),
             program_end_date=date(2023, 12, 31),
@@ -143,6 +210,46 @@ class AccelerationProgramTestCase(TestCase):
         self.assertEqual(program.created_at.date(), timezone.now().date())
         program.delete()
 
+    def test_active_name_is_unique(self):
+        program = dict(
+            requirements="Test Requirements",
+            program_start_date=date(2023, 1, 1),
+            program_end_date=date(2023, 12, 31),
+            registration_start_date=date(2022, 1, 1),
+            registration_end_date=date(2022, 12, 31),
+        )
+        AccelerationProgram.objects.create(name="Test Program", is_active=False, **program)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AccelerationProgram.objects.create(name="Test Program", is_active=True, **program)
+
+    def test_concurrently_activated_name_is_validation_error(self):
+        serializer = AccelerationProgramSerializer(
+            data={
+                "name": "Concurrent Program",
+                "requirements": "Test Requirements",
+                "directions": [self.direction.id],
+                "program_start_date": "2023-01-01",
+                "program_end_date": "2023-12-31",
+                "registration_start_date": "2022-01-01",
+                "registration_end_date": "2022-12-31",
+            }
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        # ANOTHER REQUEST CREATES THE SAME PROGRAM BETWEEN VALIDATION AND SAVE
+        AccelerationProgram.objects.create(
+            name="Concurrent Program",
+            requirements="Test Requirements",
+            program_start_date=date(2023, 1, 1),
+            program_end_date=date(2023, 12, 31),
+            registration_start_date=date(2022, 1, 1),
+            registration_end_date=date(2022, 12, 31),
+        )
+
+        with self.assertRaises(ValidationError):
+            serializer.save()
+        self.assertEqual(AccelerationProgram.objects.filter(name="Concurrent Program").count(), 1)
+
     def test_model_update(self):
         program = AccelerationProgram.objects.get(name="Test Program")
         program.name = "Updated Program"
@@ -289,3 +396,1383 @@ class JoinProgramTestCase(TestCase):
     def test_joined_applicants_default_value(self):
         join_program = JoinProgram.objects.create(program=self.program, direction=self.direction)
         self.assertEqual(join_program.joined_applicants, 0)
+
+
+class ApplicantResponseSerializerTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        self.set_up_program(is_active=True)
+        self.stage = self.create_stage()
+        self.join_program.stages_data.add(self.stage)
+        self.user = CustomUserModel.objects.create_user(email="applicant@example.com", password="testpass")
+        self.applicant = Applicants.objects.create(
+            program_to_join=self.join_program,
+            applicant=self.user,
+            request_status=Applicants.RequestStatuses.ACCEPTED,
+        )
+        self.serializer = ApplicantResponseSerializer(context={"request": mock.Mock(user=self.user)})
+
+    def test_validate_runs_single_query(self):
+        attrs = {"stage": self.stage, "direction": self.direction}
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.serializer.validate(attrs), attrs)
+
+    def test_validate_rejects_pending_applicant_in_single_query(self):
+        Applicants.objects.filter(pk=self.applicant.pk).update(request_status=Applicants.RequestStatuses.PENDING)
+
+        with self.assertNumQueries(1), self.assertRaises(ValidationError) as cm:
+            self.serializer.validate({"stage": self.stage, "direction": self.direction})
+        self.assertIn("pending", str(cm.exception.detail["detail"]))
+
+    def test_validate_rejects_previously_rejected_applicant(self):
+        previous_stage = Stage.objects.create(assignment=self.stage.assignment, name="Previous Stage")
+        self.join_program.stages_data.add(previous_stage)
+        ApplicantResponse.objects.create(
+            applicant=self.user,
+            stage=previous_stage,
+            direction=self.direction,
+            status=ApplicantResponse.Statuses.REJECTED,
+        )
+
+        with self.assertNumQueries(1), self.assertRaises(ValidationError) as cm:
+            self.serializer.validate({"stage": self.stage, "direction": self.direction})
+        self.assertIn("rejected in previous stage", str(cm.exception.detail["detail"]))
+
+    def test_validate_rejects_unregistered_stage(self):
+        stage = Stage.objects.create(assignment=self.stage.assignment, name="Unregistered Stage")
+
+        with self.assertRaises(ValidationError) as cm:
+            self.serializer.validate({"stage": stage, "direction": self.direction})
+        self.assertIn("isn't registered yet", str(cm.exception.detail["detail"]))
+
+
+class JoinedApplicantsCounterTestCase(ProgramFixtureMixin, TestCase):
+    def setUp(self):
+        self.set_up_program(is_active=True)
+        self.other_direction = Direction.objects.create(title="Other Direction", number_of_stages=3)  # noqa
+        self.other_join_program = JoinProgram.objects.create(program=self.program, direction=self.other_direction)
+        self.user = CustomUserModel.objects.create_user(email="applicant@example.com", password="testpass")
+
+    def assertJoinedApplicants(self, join_program, expected):  # noqa
+        join_program.refresh_from_db(fields=["joined_applicants"])
+        self.assertEqual(join_program.joined_applicants, expected)
+
+    def test_counter_follows_create_status_change_and_delete(self):
+        applicant = Applicants.objects.create(program_to_join=self.join_program, applicant=self.user)
+        self.assertJoinedApplicants(self.join_program, 1)
+
+        applicant.request_status = Applicants.RequestStatuses.ACCEPTED
+        applicant.save()
+        self.assertJoinedApplicants(self.join_program, 1)
+
+        applicant.delete()
+        self.assertJoinedApplicants(self.join_program, 0)
+
+    def test_counter_moves_with_program_to_join(self):
+        Applicants.objects.create(program_to_join=self.join_program, applicant=self.user)
+        applicant = Applicants.objects.get(applicant=self.user)
+
+        applicant.program_to_join = self.other_join_program
+        applicant.save()
+
+        self.assertJoinedApplicants(self.join_program, 0)
+        self.assertJoinedApplicants(self.other_join_program, 1)
+
+    def test_counter_follows_cascade_delete(self):
+        Applicants.objects.create(program_to_join=self.join_program, applicant=self.user)
+
+        self.user.delete()
+
+        self.assertJoinedApplicants(self.join_program, 0)
+
+
+@skipUnless(connection.vendor == "postgresql", "Row level concurrency is verified against PostgreSQL only")
+class JoinedApplicantsConcurrencyTestCase(ProgramFixtureMixin, TransactionTestCase):
+    THREADS = 16
+    APPLICANTS_PER_THREAD = 25
+
+    def setUp(self):
+        self.set_up_program()
+        self.users = CustomUserModel.objects.bulk_create(
+            CustomUserModel(email=f"applicant{index}@example.com")
+            for index in range(self.THREADS * self.APPLICANTS_PER_THREAD)
+        )
+
+    def test_concurrent_registrations_do_not_lose_increments(self):
+        barrier = threading.Barrier(self.THREADS)
+
+        def register(users):
+            try:
+                barrier.wait()
+                for user in users:
+                    Applicants.objects.create(program_to_join_id=self.join_program.pk, applicant=user)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=register, args=(self.users[index :: self.THREADS],))
+            for index in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.join_program.refresh_from_db()
+        self.assertEqual(self.join_program.joined_applicants, len(self.users))
+        self.assertEqual(Applicants.objects.count(), len(self.users))
+
+
+class ApplicantBulkActionsTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        self.set_up_program(is_active=True)
+        self.users = self.create_applicant_users(3)
+        self.stuff = CustomUserModel.objects.create_user(
+            email="stuff@example.com", password="testpass", user_type=CustomUserModel.UserTypes.STUFF_ACCELERATION
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.stuff)}")
+
+    def test_bulk_registration(self):
+        url = reverse("acceleration_program:applicant-bulk-registration")
+        data = [{"applicant": user.pk, "program_to_join": self.join_program.pk} for user in self.users]
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Applicants.objects.filter(program_to_join=self.join_program).count(), 3)
+        self.join_program.refresh_from_db()
+        self.assertEqual(self.join_program.joined_applicants, 3)
+
+    def test_bulk_registration_rejects_already_registered_applicant(self):
+        Applicants.objects.create(program_to_join=self.join_program, applicant=self.users[0])
+        url = reverse("acceleration_program:applicant-bulk-registration")
+        data = [{"applicant": user.pk, "program_to_join": self.join_program.pk} for user in self.users]
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Applicants.objects.count(), 1)
+        self.join_program.refresh_from_db()
+        self.assertEqual(self.join_program.joined_applicants, 1)
+
+    def test_bulk_registration_rejects_applicant_registered_after_validation(self):
+        url = reverse("acceleration_program:applicant-bulk-registration")
+        data = [{"applicant": user.pk, "program_to_join": self.join_program.pk} for user in self.users]
+        validate = ApplicantsImportListSerializer.validate
+
+        def validate_before_concurrent_registration(serializer, attrs):
+            attrs = validate(serializer, attrs)
+            Applicants.objects.create(program_to_join=self.join_program, applicant=self.users[0])
+            return attrs
+
+        with mock.patch.object(ApplicantsImportListSerializer, "validate", validate_before_concurrent_registration):
+            response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["detail"],
+            "Applicants are already registered (applicant, program_to_join): "
+            f"[({self.users[0].pk}, {self.join_program.pk})]",
+        )
+        self.assertEqual(Applicants.objects.count(), 1)
+        self.join_program.refresh_from_db()
+        self.assertEqual(self.join_program.joined_applicants, 1)
+
+    def test_bulk_status(self):
+        applicants = [
+            Applicants.objects.create(program_to_join=self.join_program, applicant=user) for user in self.users
+        ]
+        url = reverse("acceleration_program:applicant-bulk-status")
+        data = {"ids": [applicant.pk for applicant in applicants[:2]], "request_status": "Accepted"}
+
+        # AUTH USER + SAVEPOINT + CHANGED APPLICANTS + UPDATE + OUTBOX INSERT + RELEASE SAVEPOINT
+        with self.assertNumQueries(6):
+            response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"updated": 2})
+        self.assertEqual(
+            list(Applicants.objects.order_by("id").values_list("request_status", flat=True)),
+            ["Accepted", "Accepted", "Pending"],
+        )
+
+    def test_bulk_status_is_forbidden_for_standard_user(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.users[0])}")
+        url = reverse("acceleration_program:applicant-bulk-status")
+
+        response = self.client.post(url, {"ids": [1], "request_status": "Accepted"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class ReferenceDataCacheTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.direction = Direction.objects.create(title="Test Direction", number_of_stages=3)  # noqa
+        self.other_direction = Direction.objects.create(title="Other Direction", number_of_stages=3)  # noqa
+        self.program = self.create_program(is_active=True)
+        self.program.directions.add(self.direction)
+        self.stage = self.create_stage()
+        self.user = CustomUserModel.objects.create_user(email="testuser@example.com", password="testpass")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_program_cache_is_invalidated_by_directions_change(self):
+        url = reverse("acceleration_program:acceleration_program-detail", args=[self.program.pk])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.program.directions.add(self.other_direction)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data["directions"]), [self.direction.pk, self.other_direction.pk])
+
+    def test_stage_list_cache_is_invalidated_by_stage_creation(self):
+        url = reverse("acceleration_program:stage-list")
+        self.client.get(url)
+
+        with self.assertNumQueries(1):  # ONLY AUTHENTICATION QUERY
+            self.assertEqual(len(self.client.get(url).data), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Stage.objects.create(assignment=self.stage.assignment, name="Another Stage")
+
+        self.assertEqual(len(self.client.get(url).data), 2)
+
+
+class JoinProgramTemplateTestCase(ProgramFixtureMixin, TestCase):
+    def setUp(self):
+        self.directions = [
+            Direction.objects.create(title=f"Direction {index}", number_of_stages=3) for index in range(4)
+        ]
+        self.program = self.create_program(is_active=True)
+
+    def assertJoinPrograms(self, expected):  # noqa
+        self.assertEqual(
+            dict(JoinProgram.objects.filter(program=self.program).values_list("direction_id", "is_active")),
+            expected,
+        )
+
+    def test_templates_follow_program_directions_in_constant_queries(self):
+        first, second, third, fourth = self.directions
+        self.program.directions.set([first, second, third])
+        with self.assertNumQueries(3):  # DIRECTIONS + EXISTING TEMPLATES + INSERT
+            AccelerationProgramSerializer.create_joinprogram_template(instance=self.program)
+        self.assertJoinPrograms({first.pk: True, second.pk: True, third.pk: True})
+
+        self.program.directions.set([first, fourth])
+        with self.assertNumQueries(4):  # DIRECTIONS + EXISTING TEMPLATES + INSERT + DEACTIVATION
+            AccelerationProgramSerializer.create_joinprogram_template(instance=self.program)
+        self.assertJoinPrograms({first.pk: True, second.pk: False, third.pk: False, fourth.pk: True})
+
+        self.program.directions.set([first, second, fourth])
+        with self.assertNumQueries(3):  # DIRECTIONS + EXISTING TEMPLATES + REACTIVATION
+            AccelerationProgramSerializer.create_joinprogram_template(instance=self.program)
+        self.assertJoinPrograms({first.pk: True, second.pk: True, third.pk: False, fourth.pk: True})
+
+    def test_dropped_direction_keeps_its_applicants(self):
+        first, second = self.directions[:2]
+        self.program.directions.set([first, second])
+        AccelerationProgramSerializer.create_joinprogram_template(instance=self.program)
+        user = CustomUserModel.objects.create_user(email="applicant@example.com", password="testpass")
+        Applicants.objects.create(program_to_join=JoinProgram.objects.get(direction=second), applicant=user)
+
+        self.program.directions.set([first])
+        AccelerationProgramSerializer.create_joinprogram_template(instance=self.program)
+
+        self.assertTrue(Applicants.objects.filter(applicant=user, program_to_join__is_active=False).exists())
+
+
+class ProgramExpirySweepTestCase(APITestCase):
+    def setUp(self):
+        self.direction = Direction.objects.create(title="Test Direction", number_of_stages=3)  # noqa
+        today = timezone.localdate()
+        self.programs = {
+            registration_end_date: AccelerationProgram.objects.create(
+                name=f"Program {registration_end_date}",
+                requirements="Test Requirements",
+                program_start_date=today + timedelta(days=30),
+                program_end_date=today + timedelta(days=60),
+                registration_start_date=today - timedelta(days=30),
+                registration_end_date=registration_end_date,
+                is_active=True,
+            )
+            for registration_end_date in (today - timedelta(days=1), today, today + timedelta(days=1))
+        }
+        self.stuff = CustomUserModel.objects.create_user(
+            email="stuff@example.com", password="testpass", user_type=CustomUserModel.UserTypes.STUFF_ACCELERATION
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.stuff)}")
+
+    def test_sweep_deactivates_expired_programs_idempotently(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(deactivate_expired_acceleration_programs(), 2)
+        self.assertEqual(deactivate_expired_acceleration_programs(), 0)
+
+        self.assertEqual(
+            dict(AccelerationProgram.objects.values_list("registration_end_date", "is_active")),
+            {end_date: end_date > timezone.localdate() for end_date in self.programs},
+        )
+
+    def test_program_creation_doesnt_write_periodic_tasks(self):
+        url = reverse("acceleration_program:acceleration_program-list")
+        data = {
+            "name": "New Program",
+            "requirements": "Test Requirements",
+            "directions": [self.direction.pk],
+            "program_start_date": "2024-01-01",
+            "program_end_date": "2024-12-31",
+            "registration_start_date": "2023-01-01",
+            "registration_end_date": "2023-12-31",
+        }
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(PeriodicTask.objects.exists())
+        self.assertFalse(ClockedSchedule.objects.exists())
+
+    def test_partial_update_validates_against_instance_values(self):
+        program = self.programs[timezone.localdate()]
+        url = reverse("acceleration_program:acceleration_program-detail", args=[program.pk])
+
+        response = self.client.patch(url, {"registration_end_date": str(program.registration_start_date)})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["detail"], ["Registration start date must be less than registration end date"])
+
+
+class ProgramExportTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        self.set_up_program(is_active=True)
+        self.stage = self.create_stage()
+        self.join_program.stages_data.add(self.stage)
+        self.users = self.create_applicant_users(2)
+        for user in self.users:
+            Applicants.objects.create(program_to_join=self.join_program, applicant=user)
+            ApplicantResponse.objects.create(
+                applicant=user, stage=self.stage, direction=self.direction, applicant_response_description="a,b"
+            )
+        self.stuff = CustomUserModel.objects.create_user(
+            email="stuff@example.com", password="testpass", user_type=CustomUserModel.UserTypes.STUFF_DIRECTION
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.stuff)}")
+
+    def get_export_url(self, resource):
+        return reverse("acceleration_program:acceleration_program-export", args=[self.program.pk, resource])
+
+    def test_csv_export(self):
+        response = self.client.get(self.get_export_url("applicant_responses"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:3], ["id", "applicant_id", "applicant__email"])
+        self.assertEqual([row[2] for row in rows[1:]], [user.email for user in self.users])
+        self.assertEqual(rows[1][-1], "a,b")
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.get_export_url("applicants"), {"export_format": "ndjson"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["applicant__email"] for row in rows], [user.email for user in self.users])
+        self.assertEqual(rows[0]["program_to_join__direction__title"], "Test Direction")
+
+    async def test_export_is_streamed_through_asgi(self):
+        response = await self.async_client.get(
+            self.get_export_url("applicants"),
+            {"export_format": "ndjson"},
+            headers={"Authorization": f"Bearer {AccessToken.for_user(self.stuff)}"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)  # SYNC CONTENT WOULD BE READ INTO MEMORY IN FULL BY ASGI HANDLER
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([row["applicant__email"] for row in rows], [user.email for user in self.users])
+
+    def test_export_is_forbidden_for_standard_user(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.users[0])}")
+
+        response = self.client.get(self.get_export_url("applicants"))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ApplicantResponseRankingTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        self.set_up_program()
+        self.stage = self.create_stage()
+        self.evaluators = [
+            CustomUserModel.objects.create_user(
+                email=f"stuff{index}@example.com", password="testpass", user_type="Stuff-Direction"
+            )
+            for index in range(3)
+        ]
+        self.responses = [
+            ApplicantResponse.objects.create(applicant=user, stage=self.stage, direction=self.direction)
+            for user in self.create_applicant_users(3)
+        ]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.evaluators[0])}")
+
+    def evaluate(self, applicant_response, points):
+        return [
+            StuffMembersResponse.objects.create(author=author, applicant_response=applicant_response, point=point)
+            for author, point in zip(self.evaluators, points)
+        ]
+
+    def test_score_summary_follows_points(self):
+        first, second, _ = self.evaluate(self.responses[0], [4, 8, 9])
+        score = ApplicantResponseScore.objects.get(applicant_response=self.responses[0])
+        self.assertEqual((score.points_count, score.point_avg, score.point_min, score.point_max), (3, 7, 4, 9))
+
+        second.point = 2
+        second.save()
+        first.delete()
+        score.refresh_from_db()
+        self.assertEqual((score.points_count, score.point_avg, score.point_min, score.point_max), (2, 5.5, 2, 9))
+
+    def test_ranking(self):
+        self.evaluate(self.responses[0], [5, 5])
+        self.evaluate(self.responses[1], [9, 10])
+        self.evaluate(self.responses[2], [9.5, 9.5])
+        url = reverse("acceleration_program:ranking-list")
+
+        with self.assertNumQueries(3):  # AUTHENTICATION + COUNT + RANKING
+            response = self.client.get(url, {"stage": self.stage.pk, "direction": self.direction.pk})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(
+            [(row["applicant_response"], row["rank"], row["point_avg"]) for row in response.data["results"]],
+            [(self.responses[1].pk, 1, 9.5), (self.responses[2].pk, 1, 9.5), (self.responses[0].pk, 3, 5)],
+        )
+
+    def test_ranking_page_keeps_leaderboard_ranks(self):
+        self.evaluate(self.responses[0], [5, 5])
+        self.evaluate(self.responses[1], [9, 10])
+        self.evaluate(self.responses[2], [9.5, 9.5])
+
+        response = self.client.get(reverse("acceleration_program:ranking-list"), {"limit": 1, "offset": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(
+            [(row["applicant_response"], row["rank"]) for row in response.data["results"]], [(self.responses[0].pk, 3)]
+        )
+
+    def test_ranking_score_disappears_with_applicant_response(self):
+        self.evaluate(self.responses[0], [5, 6])
+
+        self.responses[0].delete()
+
+        self.assertFalse(ApplicantResponseScore.objects.exists())
+
+
+@skipUnless(connection.vendor == "postgresql", "Row level concurrency is verified against PostgreSQL only")
+class ApplicantResponseScoreConcurrencyTestCase(ProgramFixtureMixin, TransactionTestCase):
+    def test_point_added_during_refresh_isnt_lost(self):
+        self.set_up_program()
+        response = ApplicantResponse.objects.create(
+            applicant=self.create_applicant_users(1)[0], stage=self.create_stage(), direction=self.direction
+        )
+        evaluators = [
+            CustomUserModel.objects.create_user(email=f"stuff{index}@example.com", password="pass")
+            for index in range(2)
+        ]
+        StuffMembersResponse.objects.create(author=evaluators[0], applicant_response=response, point=4)
+        aggregated = threading.Event()
+        aggregate = QuerySet.aggregate
+
+        def slow_aggregate(queryset, *args, **kwargs):
+            result = aggregate(queryset, *args, **kwargs)
+            aggregated.set()
+            time.sleep(0.5)  # CONCURRENT EVALUATION IS ADDED BETWEEN AGGREGATE AND UPDATE OF REFRESH
+            return result
+
+        def refresh():
+            try:
+                ApplicantResponseScore.refresh(response.pk)
+            finally:
+                connection.close()
+
+        with mock.patch.object(QuerySet, "aggregate", slow_aggregate):
+            thread = threading.Thread(target=refresh)
+            thread.start()
+            aggregated.wait(timeout=10)
+            StuffMembersResponse.objects.create(author=evaluators[1], applicant_response=response, point=8)
+            thread.join()
+
+        score = ApplicantResponseScore.objects.get(applicant_response=response)
+        self.assertEqual((score.points_count, score.points_sum, score.point_avg), (2, 12, 6))
+
+
+class RequestMetricsTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        self.set_up_program()
+        self.user = CustomUserModel.objects.create_user(email="testuser@example.com", password="testpass")
+        Applicants.objects.create(program_to_join=self.join_program, applicant=self.user)
+        self.authorization = f"Bearer {AccessToken.for_user(self.user)}"
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+        self.url = reverse("acceleration_program:applicant-list")
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="[1-9]\d* queries", serializer;dur=[\d.]+$',
+        )
+
+    def test_metrics_are_exported_per_view(self):
+        self.client.get(self.url)
+
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = response.content.decode()
+        labels = 'method="GET",view="acceleration_program:applicant-list"'
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",status="200",view="acceleration_program:applicant-list"}',
+            metrics,
+        )
+        self.assertIn(f"http_request_db_queries_count{{{labels}}}", metrics)
+        self.assertIn(f"http_request_db_duration_seconds_sum{{{labels}}}", metrics)
+        self.assertIn(f"http_request_serializer_duration_seconds_sum{{{labels}}}", metrics)
+
+    @override_settings(METRICS_TOKEN="scraper-token")
+    def test_metrics_are_forbidden_outside_allowed_networks_without_token(self):
+        self.client.credentials()
+
+        forbidden = self.client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.5")
+        wrong_token = self.client.get(
+            reverse("metrics"), REMOTE_ADDR="203.0.113.5", HTTP_AUTHORIZATION="Bearer other-token"
+        )
+        allowed = self.client.get(
+            reverse("metrics"), REMOTE_ADDR="203.0.113.5", HTTP_AUTHORIZATION="Bearer scraper-token"
+        )
+
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(wrong_token.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(allowed.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_ALLOWED_NETWORKS=["10.0.0.0/8"])
+    def test_metrics_are_allowed_from_configured_network(self):
+        self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="10.1.2.3").status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.client.get(reverse("metrics"), REMOTE_ADDR="127.0.0.1").status_code, status.HTTP_403_FORBIDDEN
+        )
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=True)
+    async def test_queries_of_async_view_are_recorded(self):
+        cache.clear()
+        response = await self.async_client.get(
+            reverse("acceleration_program:acceleration_program-async-list"),
+            headers={"Authorization": self.authorization},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # USER OF AccessToken WITHOUT CLAIMS, PROGRAMS AND THEIR DIRECTIONS, ALL OF THEM RUN IN sync_to_async THREADS
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+    @override_settings(SLOW_REQUEST_THRESHOLD=0, SLOW_REQUEST_LOGGED_QUERIES=1)
+    def test_slow_request_is_logged_with_slowest_queries(self):
+        with self.assertLogs("core.middleware", level="WARNING") as logs:
+            self.client.get(self.url)
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("Slow request GET /api/acceleration_program/applicant/", logs.output[0])
+        self.assertEqual(logs.output[0].count(" ms: SELECT"), 1)
+
+
+class ViewSetQueryBudgetTestCase(ProgramFixtureMixin, QueryBudgetTestMixin, APITestCase):
+    """Every action of the viewsets must run the same number of queries regardless of amount of data"""
+
+    def setUp(self):
+        self.user_numbers = itertools.count()
+        self.set_up_program(is_active=True)
+        self.stage = self.create_stage()
+        self.join_program.stages_data.add(self.stage)
+        self.stuff_acceleration = self.create_user(CustomUserModel.UserTypes.STUFF_ACCELERATION)
+        self.stuff_direction = self.create_user(CustomUserModel.UserTypes.STUFF_DIRECTION)
+        self.applicant_responses = []  # RESPONSES WHICH ARE TARGETS OF SINGLE OBJECT ACTIONS, THEY COLLECT EVALUATIONS
+
+    def create_user(self, user_type=CustomUserModel.UserTypes.STANDARD):
+        return CustomUserModel.objects.create(email=f"user{next(self.user_numbers)}@example.com", user_type=user_type)
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleAccessToken.for_user(user)}")
+
+    def create_applicant(self):
+        applicant = self.create_user()
+        Applicants.objects.create(
+            program_to_join=self.join_program, applicant=applicant, request_status=Applicants.RequestStatuses.ACCEPTED
+        )
+        return applicant
+
+    def create_applicant_response(self):
+        return ApplicantResponse.objects.create(
+            applicant=self.create_applicant(), stage=self.stage, direction=self.direction
+        )
+
+    def seed_applicant_responses(self, count):
+        """Adds responses which are evaluated by new stuff member, who evaluates every target response as well"""
+        for _ in range(count):
+            evaluator = self.create_user(CustomUserModel.UserTypes.STUFF_DIRECTION)
+            for applicant_response in [self.create_applicant_response(), *self.applicant_responses]:
+                StuffMembersResponse.objects.create(author=evaluator, applicant_response=applicant_response, point=5)
+                StuffFinalResponseDescription.objects.create(
+                    author=evaluator,
+                    applicant_response=applicant_response,
+                    description="Test Description",
+                    status=StuffFinalResponseDescription.Statuses.ACCEPTED,
+                )
+
+    def seed_join_programs(self, count):
+        """Adds join programs with applicants and stages, each target join program gets new applicant as well"""
+        for _ in range(count):
+            join_program = JoinProgram.objects.create(
+                program=self.program, direction=Direction.objects.create(title="Direction", number_of_stages=3)
+            )
+            join_program.stages_data.add(self.stage)
+            for target in [join_program, *self.join_programs]:
+                Applicants.objects.create(program_to_join=target, applicant=self.create_user())
+
+    def seed_pipeline(self, count):
+        """Adds stages and applicants to the join program, new stuff member evaluates response of every stage"""
+        for _ in range(count):
+            self.join_program.stages_data.add(Stage.objects.create(assignment=self.stage.assignment, name="Stage"))
+            self.create_applicant()
+
+        evaluator = self.create_user(CustomUserModel.UserTypes.STUFF_DIRECTION)
+        applicant_ids = Applicants.objects.filter(program_to_join=self.join_program)
+        for applicant_id in applicant_ids.values_list("applicant_id", flat=True):
+            for stage in self.join_program.stages_data.all():
+                applicant_response, _ = ApplicantResponse.objects.get_or_create(
+                    applicant_id=applicant_id, stage=stage, defaults={"direction": self.direction}
+                )
+                StuffMembersResponse.objects.create(author=evaluator, applicant_response=applicant_response, point=5)
+                StuffFinalResponseDescription.objects.create(
+                    author=evaluator,
+                    applicant_response=applicant_response,
+                    description="Test Description",
+                    status=StuffFinalResponseDescription.Statuses.ACCEPTED,
+                )
+
+    def test_join_program_pipeline(self):
+        url = reverse("acceleration_program:join_program-pipeline", args=[self.join_program.pk])
+        self.authenticate(self.stuff_acceleration)
+
+        queries = self.assertConstantQueries(self.seed_pipeline, lambda: self.client.get(url, {"page_size": 500}))
+
+        # JOIN PROGRAM, STAGES, APPLICANTS WITH USERS, RESPONSES WITH SCORES AND FINAL DECISIONS
+        self.assertEqual(queries, 5)
+
+    def test_applicant_response_actions(self):
+        url = reverse("acceleration_program:applicant_response-list")
+        self.applicant_responses = [self.create_applicant_response() for _ in self.QUERY_BUDGET_SIZES]
+        targets = iter(self.applicant_responses)
+        applicants = iter([self.create_applicant() for _ in self.QUERY_BUDGET_SIZES])
+
+        def create():
+            self.authenticate(next(applicants))
+            return self.client.post(url, {"stage": self.stage.pk, "direction": self.direction.pk})
+
+        def partial_update():
+            target = next(targets)
+            self.authenticate(target.applicant)
+            return self.client.patch(
+                reverse("acceleration_program:applicant_response-detail", args=[target.pk]),
+                {"stage": self.stage.pk, "direction": self.direction.pk, "applicant_response_description": "New"},
+            )
+
+        self.authenticate(self.stuff_direction)
+        self.assertConstantQueries(self.seed_applicant_responses, lambda: self.client.get(url))
+        self.assertConstantQueries(
+            self.seed_applicant_responses,
+            lambda: self.client.get(
+                reverse("acceleration_program:applicant_response-detail", args=[self.applicant_responses[0].pk])
+            ),
+        )
+        self.assertConstantQueries(self.seed_applicant_responses, create)
+        self.assertConstantQueries(self.seed_applicant_responses, partial_update)
+
+        # DELETED TARGET IS REMOVED FROM TARGETS, SO IT DOESN'T GET NEW EVALUATIONS
+        self.assertConstantQueries(
+            self.seed_applicant_responses,
+            lambda: self.client.delete(
+                reverse("acceleration_program:applicant_response-detail", args=[self.applicant_responses.pop().pk])
+            ),
+        )
+
+    def test_join_program_actions(self):
+        url = reverse("acceleration_program:join_program-list")
+        self.join_programs = [
+            JoinProgram.objects.create(
+                program=self.program, direction=Direction.objects.create(title="Target", number_of_stages=3)
+            )
+            for _ in self.QUERY_BUDGET_SIZES
+        ]
+        for join_program in self.join_programs:
+            join_program.stages_data.add(self.stage)
+        directions = iter([Direction.objects.create(title="New", number_of_stages=3) for _ in self.QUERY_BUDGET_SIZES])
+        self.authenticate(self.stuff_acceleration)
+
+        def detail_url(join_program):
+            return reverse("acceleration_program:join_program-detail", args=[join_program.pk])
+
+        self.assertConstantQueries(self.seed_join_programs, lambda: self.client.get(url))
+        self.assertConstantQueries(self.seed_join_programs, lambda: self.client.get(detail_url(self.join_programs[0])))
+        self.assertConstantQueries(
+            self.seed_join_programs,
+            lambda: self.client.post(
+                url, {"program": self.program.pk, "direction": next(directions).pk, "stages_data": [self.stage.pk]}
+            ),
+        )
+        self.assertConstantQueries(
+            self.seed_join_programs,
+            lambda: self.client.patch(detail_url(self.join_programs[0]), {"stages_data": [self.stage.pk]}),
+        )
+
+        self.assertConstantQueries(
+            self.seed_join_programs, lambda: self.client.delete(detail_url(self.join_programs.pop()))
+        )
+
+    def test_expanded_join_program_actions(self):
+        url = reverse("acceleration_program:join_program-list")
+        detail_url = reverse("acceleration_program:join_program-detail", args=[self.join_program.pk])
+        self.join_programs = [self.join_program]
+        self.create_applicant()  # ACCEPTED, THE SEEDED ONES ARE PENDING
+        self.authenticate(self.stuff_acceleration)
+
+        queries = self.assertConstantQueries(self.seed_join_programs, lambda: self.client.get(url, {"expand": "true"}))
+        self.assertConstantQueries(self.seed_join_programs, lambda: self.client.get(detail_url, {"expand": "true"}))
+        # JOIN PROGRAMS JOINED WITH PROGRAM AND DIRECTION AND ANNOTATED WITH COUNTS, THEN STAGES
+        self.assertEqual(queries, 2)
+
+        response = self.client.get(detail_url, {"expand": "true"})
+        self.assertEqual(response.data["program"]["name"], "Test Program")
+        self.assertEqual(response.data["direction"]["title"], "Test Direction")
+        self.assertEqual([stage["name"] for stage in response.data["stages"]], ["Test Stage"])
+        # EVERY assertConstantQueries SEEDS 20 PENDING APPLICANTS
+        self.assertEqual(response.data["applicant_counts"], {"pending": 40, "accepted": 1, "rejected": 0})
+        self.assertEqual(response.data["joined_applicants"], 41)
+        self.assertNotIn("applicants", response.data)
+
+    def test_stuff_members_response_actions(self):
+        url = reverse("acceleration_program:stuff_member_response-list")
+        self.applicant_responses = [self.create_applicant_response() for _ in self.QUERY_BUDGET_SIZES]
+        evaluations = [
+            StuffMembersResponse.objects.create(author=self.stuff_direction, applicant_response=response, point=1)
+            for response in self.applicant_responses
+        ]
+        not_evaluated = iter([self.create_applicant_response() for _ in self.QUERY_BUDGET_SIZES])
+        targets = iter(evaluations)
+        self.authenticate(self.stuff_direction)
+
+        def detail_url(evaluation):
+            return reverse("acceleration_program:stuff_member_response-detail", args=[evaluation.pk])
+
+        self.assertConstantQueries(self.seed_applicant_responses, lambda: self.client.get(url))
+        self.assertConstantQueries(self.seed_applicant_responses, lambda: self.client.get(detail_url(evaluations[0])))
+        self.assertConstantQueries(
+            self.seed_applicant_responses,
+            lambda: self.client.post(url, {"applicant_response": next(not_evaluated).pk, "point": 3}),
+        )
+        self.assertConstantQueries(
+            self.seed_applicant_responses, lambda: self.client.patch(detail_url(next(targets)), {"point": 4})
+        )
+
+        targets = iter(evaluations)
+        self.assertConstantQueries(self.seed_applicant_responses, lambda: self.client.delete(detail_url(next(targets))))
+
+    def test_stuff_final_response_description_actions(self):
+        url = reverse("acceleration_program:stuff_final_response_with_description-list")
+        self.applicant_responses = [self.create_applicant_response() for _ in self.QUERY_BUDGET_SIZES]
+        descriptions = [
+            StuffFinalResponseDescription.objects.create(
+                author=self.stuff_direction,
+                applicant_response=response,
+                description="Test Description",
+                status=StuffFinalResponseDescription.Statuses.ACCEPTED,
+            )
+            for response in self.applicant_responses
+        ]
+        not_evaluated = iter([self.create_applicant_response() for _ in self.QUERY_BUDGET_SIZES])
+        targets = iter(descriptions)
+        self.authenticate(self.stuff_direction)
+
+        def detail_url(description):
+            return reverse("acceleration_program:stuff_final_response_with_description-detail", args=[description.pk])
+
+        def data(applicant_response):
+            return {"applicant_response": applicant_response.pk, "description": "Description", "status": "Rejected"}
+
+        self.assertConstantQueries(self.seed_applicant_responses, lambda: self.client.get(url))
+        self.assertConstantQueries(self.seed_applicant_responses, lambda: self.client.get(detail_url(descriptions[0])))
+        self.assertConstantQueries(
+            self.seed_applicant_responses, lambda: self.client.post(url, data(next(not_evaluated)))
+        )
+
+        def update():
+            target = next(targets)
+            return self.client.put(detail_url(target), data(target.applicant_response))
+
+        self.assertConstantQueries(self.seed_applicant_responses, update)
+
+        targets = iter(descriptions)
+        self.assertConstantQueries(self.seed_applicant_responses, lambda: self.client.delete(detail_url(next(targets))))
+
+
+class SeedLoadDataTestCase(TestCase):
+    def test_seeded_data_is_consistent(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as manifest_file:
+            call_command(
+                "seed_load_data",
+                programs=2,
+                directions=2,
+                stages=3,
+                applicants=40,
+                evaluators=5,
+                evaluations=2,
+                chunk_size=7,
+                manifest=manifest_file.name,
+                stdout=StringIO(),
+            )
+            manifest = json.load(manifest_file)
+
+        self.assertEqual(JoinProgram.objects.count(), 4)
+        self.assertEqual(sum(JoinProgram.objects.values_list("joined_applicants", flat=True)), 40)
+        self.assertEqual(ApplicantResponse.objects.count(), 36 * 2)  # ACCEPTED APPLICANTS ANSWER ALL BUT LAST STAGE
+        self.assertEqual(StuffMembersResponse.objects.count(), 36 * 2 * 2)
+        self.assertEqual(ApplicantResponseScore.objects.filter(points_count=2).count(), 36 * 2)
+        self.assertEqual(len(manifest["submissions"]), 36)
+        self.assertFalse(
+            StuffMembersResponse.objects.filter(
+                author__email=manifest["gradings"][0]["email"],
+                applicant_response_id=manifest["gradings"][0]["applicant_response"],
+            ).exists()
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "Query plans are verified against PostgreSQL only")
+class HotQueryIndexTestCase(TestCase):
+    """Hot filters must be answered by index scans once tables are large enough for planner to prefer them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_load_data", applicants=20000, manifest=tempfile.mktemp(suffix=".json"), stdout=StringIO())
+        today = timezone.localdate()
+        AccelerationProgram.objects.bulk_create(
+            AccelerationProgram(
+                name=f"Finished program {number}",
+                requirements="Finished program",
+                program_start_date=today - timedelta(days=300),
+                program_end_date=today - timedelta(days=200),
+                registration_start_date=today - timedelta(days=400),
+                registration_end_date=today - timedelta(days=310),
+                is_active=False,
+            )
+            for number in range(5000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        cls.applicant = Applicants.objects.order_by("id").last()
+
+    def assertIndexScan(self, queryset):  # noqa
+        plan = queryset.explain()
+        self.assertIn("Index", plan)
+        self.assertNotIn("Seq Scan", plan)
+
+    def test_program_name_lookup(self):
+        self.assertIndexScan(AccelerationProgram.objects.filter(name="Finished program 1", is_active=True))
+
+    def test_program_expiry_sweep(self):
+        self.assertIndexScan(
+            AccelerationProgram.objects.filter(is_active=True, registration_end_date__lte=timezone.localdate())
+        )
+
+    def test_applicant_request_status(self):
+        self.assertIndexScan(
+            Applicants.objects.filter(
+                applicant_id=self.applicant.applicant_id, request_status=Applicants.RequestStatuses.PENDING
+            )
+        )
+        self.assertIndexScan(
+            Applicants.objects.filter(request_status=Applicants.RequestStatuses.PENDING).order_by(
+                "join_request_date", "id"
+            )[:20]
+        )
+
+    def test_rejected_applicant_responses(self):
+        self.assertIndexScan(
+            ApplicantResponse.objects.filter(
+                applicant_id=self.applicant.applicant_id, status=ApplicantResponse.Statuses.REJECTED
+            )
+        )
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class AsyncReadEndpointsTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.directions = [
+            Direction.objects.create(title=f"Test Direction {number}", number_of_stages=3) for number in range(3)
+        ]
+        self.programs = []
+        for number in range(3):
+            program = self.create_program(f"Test Program {number}")
+            program.directions.set(self.directions[: number + 1])
+            self.programs.append(program)
+        self.stage = self.create_stage()
+        self.user = CustomUserModel.objects.create_user(email="testuser@example.com", password="testpass")
+        self.authorization = f"Bearer {RoleAccessToken.for_user(self.user)}"
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+
+    def test_responses_are_the_same_as_of_sync_endpoints(self):
+        endpoints = [
+            ("directions:directions", "directions:directions-async", []),
+            ("directions:direction", "directions:direction-async", [self.directions[1].pk]),
+            (
+                "acceleration_program:acceleration_program-list",
+                "acceleration_program:acceleration_program-async-list",
+                [],
+            ),
+            (
+                "acceleration_program:acceleration_program-detail",
+                "acceleration_program:acceleration_program-async-detail",
+                [self.programs[2].pk],
+            ),
+            ("acceleration_program:stage-list", "acceleration_program:stage-async-list", []),
+            ("acceleration_program:stage-detail", "acceleration_program:stage-async-detail", [self.stage.pk]),
+        ]
+
+        for sync_name, async_name, args in endpoints:
+            with self.subTest(async_name):
+                sync_response = self.client.get(reverse(sync_name, args=args))
+                async_response = self.client.get(reverse(async_name, args=args))
+
+                self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+                self.assertEqual(async_response.json(), sync_response.json())
+                self.assertEqual(async_response["ETag"], sync_response["ETag"])
+
+    def test_program_list_loads_directions_with_one_query(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("acceleration_program:acceleration_program-async-list"))
+
+        self.assertEqual([len(program["directions"]) for program in response.json()], [1, 2, 3])
+
+    async def test_cached_response_and_errors_through_asgi(self):
+        url = reverse("acceleration_program:acceleration_program-async-detail", args=[self.programs[0].pk])
+
+        response = await self.async_client.get(url, headers={"Authorization": self.authorization})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        not_modified = await self.async_client.get(
+            url, headers={"Authorization": self.authorization, "If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        unauthenticated = await self.async_client.get(url)
+        self.assertEqual(unauthenticated.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", unauthenticated["WWW-Authenticate"])
+
+        missing = await self.async_client.get(
+            reverse("acceleration_program:acceleration_program-async-detail", args=[0]),
+            headers={"Authorization": self.authorization},
+        )
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(missing.json(), {"detail": "Not found."})
+
+
+class JoinProgramPipelineTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        self.set_up_program()
+        self.stages = [self.create_stage(f"Stage {number}") for number in range(2)]
+        self.join_program.stages_data.set(self.stages)
+
+        self.applicant = CustomUserModel.objects.create_user(email="applicant@example.com", password="testpass")
+        self.other_applicant = CustomUserModel.objects.create_user(email="other@example.com", password="testpass")
+        for user in (self.applicant, self.other_applicant):
+            Applicants.objects.create(program_to_join=self.join_program, applicant=user)
+        self.stuff = CustomUserModel.objects.create_user(
+            email="stuff@example.com", password="testpass", user_type=CustomUserModel.UserTypes.STUFF_DIRECTION
+        )
+
+        self.response = ApplicantResponse.objects.create(
+            applicant=self.applicant,
+            stage=self.stages[0],
+            direction=self.direction,
+            status=ApplicantResponse.Statuses.REJECTED,
+        )
+        StuffMembersResponse.objects.create(author=self.stuff, applicant_response=self.response, point=4)
+        StuffMembersResponse.objects.create(
+            author=CustomUserModel.objects.create_user(email="stuff2@example.com", password="testpass"),
+            applicant_response=self.response,
+            point=8,
+        )
+        self.decision = StuffFinalResponseDescription.objects.create(
+            author=self.stuff,
+            applicant_response=self.response,
+            description="Not enough",
+            status=StuffFinalResponseDescription.Statuses.REJECTED,
+        )
+        self.url = reverse("acceleration_program:join_program-pipeline", args=[self.join_program.pk])
+
+    def get_pipeline(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleAccessToken.for_user(user)}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["results"]
+
+    def test_stuff_sees_progress_of_every_applicant(self):
+        pipeline = self.get_pipeline(self.stuff)
+
+        self.assertEqual([row["email"] for row in pipeline], ["applicant@example.com", "other@example.com"])
+        self.assertEqual([stage["id"] for stage in pipeline[0]["stages"]], [stage.pk for stage in self.stages])
+        self.assertEqual(
+            pipeline[0]["stages"][0]["response"],
+            {
+                "id": self.response.pk,
+                "status": "Rejected",
+                "final_decisions": [
+                    {"id": self.decision.pk, "author": self.stuff.pk, "status": "Rejected", "description": "Not enough"}
+                ],
+                "points_count": 2,
+                "point_avg": 6.0,
+            },
+        )
+        self.assertIsNone(pipeline[0]["stages"][1]["response"])
+        self.assertEqual([stage["response"] for stage in pipeline[1]["stages"]], [None, None])
+
+    def test_applicant_sees_only_own_progress(self):
+        pipeline = self.get_pipeline(self.other_applicant)
+
+        self.assertEqual([row["applicant"] for row in pipeline], [self.other_applicant.pk])
+
+
+class FullTextSearchTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        self.directions = [
+            Direction.objects.create(title=f"Direction {number}", number_of_stages=1) for number in range(2)
+        ]
+        self.program = self.create_program("Machine Learning Bootcamp", requirements="Python and statistics")
+        self.program.directions.set(self.directions[:1])
+        self.other_program = self.create_program(
+            "Web Development", requirements="Experience with machine learning is a plus"
+        )
+        self.stages = [self.create_stage(f"Stage {number}") for number in range(2)]
+        JoinProgram.objects.create(program=self.program, direction=self.directions[0]).stages_data.set(self.stages)
+
+        descriptions = [
+            "Trained neural networks for image classification with neural network pruning",
+            "Built a neural network in Keras",
+            "Wrote a REST API for a web shop",
+        ]
+        self.responses = [
+            ApplicantResponse.objects.create(
+                applicant=user,
+                stage=self.stages[index % 2],
+                direction=self.directions[index // 2],
+                applicant_response_description=description,
+            )
+            for index, (user, description) in enumerate(zip(self.create_applicant_users(3), descriptions))
+        ]
+        self.stuff = CustomUserModel.objects.create_user(
+            email="stuff@example.com", password="testpass", user_type=CustomUserModel.UserTypes.STUFF_DIRECTION
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleAccessToken.for_user(self.stuff)}")
+        self.responses_url = reverse("acceleration_program:search-responses")
+        self.programs_url = reverse("acceleration_program:search-programs")
+
+    def search(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_search_query_is_required(self):
+        response = self.client.get(self.responses_url, {"q": "  "})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("q", response.data)
+
+    def test_search_is_for_stuff_only(self):
+        applicant = CustomUserModel.objects.create_user(email="standard@example.com", password="testpass")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleAccessToken.for_user(applicant)}")
+
+        response = self.client.get(self.programs_url, {"q": "learning"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search is PostgreSQL only")
+    def test_responses_are_ranked_and_filtered(self):
+        first, second, _ = self.responses
+
+        self.assertEqual(self.search(self.responses_url, q="neural networks"), [first.pk, second.pk])
+        self.assertEqual(self.search(self.responses_url, q="neural -keras"), [first.pk])
+        self.assertEqual(self.search(self.responses_url, q="neural", stage=self.stages[1].pk), [second.pk])
+        self.assertEqual(self.search(self.responses_url, q="neural", program=self.program.pk), [first.pk, second.pk])
+        self.assertEqual(self.search(self.responses_url, q="neural", direction=self.directions[1].pk), [])
+
+        response = self.client.get(self.responses_url, {"q": "keras"})
+        self.assertEqual(response.data["count"], 1)
+        self.assertIn("<b>Keras</b>", response.data["results"][0]["headline"])
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search is PostgreSQL only")
+    def test_programs_rank_name_over_requirements(self):
+        self.assertEqual(self.search(self.programs_url, q="machine learning"), [self.program.pk, self.other_program.pk])
+        self.assertEqual(
+            self.search(self.programs_url, q="machine learning", direction=self.directions[0].pk), [self.program.pk]
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search is PostgreSQL only")
+    def test_search_vector_follows_description(self):
+        response = self.responses[2]
+        ApplicantResponse.objects.filter(pk=response.pk).update(applicant_response_description="Graph databases")
+        ApplicantResponse.objects.bulk_create(
+            [
+                ApplicantResponse(
+                    applicant=response.applicant,
+                    stage=self.stages[1],
+                    direction=self.directions[1],
+                    applicant_response_description="Graph algorithms",
+                )
+            ]
+        )
+        response.refresh_from_db()
+        response.status = ApplicantResponse.Statuses.ACCEPTED
+        response.save(update_fields=["status"])
+
+        self.assertEqual(len(self.search(self.responses_url, q="graph")), 2)
+        self.assertEqual(self.search(self.responses_url, q="shop"), [])
+
+    @skipUnless(connection.vendor == "postgresql", "Query plans are verified against PostgreSQL only")
+    def test_search_uses_gin_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        query = SearchQuery("neural", config=SEARCH_CONFIG)
+
+        self.assertIn("response_search_idx", ApplicantResponse.objects.filter(search_vector=query).explain())
+        self.assertIn("program_search_idx", AccelerationProgram.objects.filter(search_vector=query).explain())
+
+
+class NotificationOutboxTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        self.set_up_program()
+        self.stage = self.create_stage()
+        self.users = self.create_applicant_users(2)
+        self.applicants = [
+            Applicants.objects.create(program_to_join=self.join_program, applicant=user) for user in self.users
+        ]
+        self.applicant_response = ApplicantResponse.objects.create(
+            applicant=self.users[0], stage=self.stage, direction=self.direction
+        )
+        self.stuff = CustomUserModel.objects.create_user(
+            email="stuff@example.com", password="testpass", user_type=CustomUserModel.UserTypes.ADMIN
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.stuff)}")
+
+    def outbox(self):
+        return list(
+            NotificationOutbox.objects.order_by("id").values_list("recipient_id", "event", "object_id", "status")
+        )
+
+    def test_status_changes_are_written_to_outbox(self):
+        applicant_url = reverse("acceleration_program:applicant-detail", args=[self.applicants[0].pk])
+        self.client.patch(applicant_url, {"request_status": Applicants.RequestStatuses.PENDING})
+        self.client.patch(applicant_url, {"request_status": Applicants.RequestStatuses.ACCEPTED})
+        self.client.post(
+            reverse("acceleration_program:stuff_final_response_with_description-list"),
+            {"applicant_response": self.applicant_response.pk, "description": "Well done", "status": "Accepted"},
+        )
+        self.client.post(
+            reverse("acceleration_program:applicant-bulk-status"),
+            {"ids": [applicant.pk for applicant in self.applicants], "request_status": "Accepted"},
+            format="json",
+        )
+
+        first, second = self.users
+        self.assertEqual(
+            self.outbox(),
+            [
+                (first.pk, "request_status", self.applicants[0].pk, "Accepted"),
+                (first.pk, "response_status", self.applicant_response.pk, "Accepted"),
+                (second.pk, "request_status", self.applicants[1].pk, "Accepted"),
+            ],
+        )
+
+    def test_rolled_back_status_change_isnt_written_to_outbox(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.applicants[0].request_status = Applicants.RequestStatuses.REJECTED
+            self.applicants[0].save()
+            Applicants.objects.create(program_to_join=self.join_program, applicant=self.users[1])
+
+        self.assertEqual(self.outbox(), [])
+
+    def test_drain_sends_one_coalesced_digest_per_applicant(self):
+        for request_status in ("Accepted", "Rejected"):
+            self.applicants[0].request_status = request_status
+            self.applicants[0].save()
+        self.applicant_response.status = ApplicantResponse.Statuses.ACCEPTED
+        self.applicant_response.save()
+        self.applicants[1].request_status = "Accepted"
+        self.applicants[1].save()
+
+        self.assertEqual(drain_notification_outbox(), 2)
+
+        self.assertEqual([message.to for message in mail.outbox], [[user.email] for user in self.users])
+        self.assertEqual(
+            mail.outbox[0].body,
+            "Your request to join Test Program (Test Direction) is Rejected\n"
+            "Your response to stage Test Stage is Accepted",
+        )
+        self.assertFalse(NotificationOutbox.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(drain_notification_outbox(), 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_digest_is_retried_with_the_same_message_id(self):
+        self.applicants[0].request_status = "Accepted"
+        self.applicants[0].save()
+
+        with mock.patch("django.core.mail.EmailMessage.send", side_effect=SMTPException("Unavailable")):
+            with self.assertLogs("apps.acceleration_program.notifications", "ERROR"):
+                self.assertEqual(drain_notification_outbox(), 0)
+        event = NotificationOutbox.objects.get()
+        self.assertEqual((event.attempts, event.sent_at), (1, None))
+
+        self.applicants[1].request_status = "Accepted"
+        self.applicants[1].save()
+        self.assertEqual(drain_notification_outbox(), 2)
+
+        self.assertEqual(mail.outbox[0].extra_headers["Message-ID"].split("@")[0], f"<{event.digest_key}")
+        self.assertEqual(mail.outbox[0].to, [self.users[0].email])
+
+    def test_digest_becomes_dead_letter_after_max_attempts(self):
+        self.applicants[0].request_status = "Accepted"
+        self.applicants[0].save()
+
+        with mock.patch("django.core.mail.EmailMessage.send", side_effect=SMTPException("Unavailable")):
+            with self.assertLogs("apps.acceleration_program.notifications", "ERROR") as logs:
+                for _ in range(OUTBOX_MAX_ATTEMPTS + 1):
+                    self.assertEqual(drain_notification_outbox(), 0)
+
+        self.assertEqual(len(logs.records), OUTBOX_MAX_ATTEMPTS + 1)  # FAILURES AND GIVING UP, NO RETRY AFTER IT
+        self.assertIn("gave up after", logs.records[-1].getMessage())
+        event = NotificationOutbox.objects.get()
+        self.assertEqual((event.attempts, event.sent_at), (OUTBOX_MAX_ATTEMPTS, None))
+        self.assertIsNotNone(event.dead_at)
+
+        NotificationOutbox.objects.update(dead_at=timezone.now() - timedelta(days=8))
+        drain_notification_outbox()
+        self.assertTrue(NotificationOutbox.objects.exists())  # DEAD LETTERS ARE KEPT LONGER THAN SENT EVENTS
+
+        NotificationOutbox.objects.update(dead_at=timezone.now() - timedelta(days=31))
+        drain_notification_outbox()
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_sent_events_are_purged_after_retention(self):
+        self.applicants[0].request_status = "Accepted"
+        self.applicants[0].save()
+        drain_notification_outbox()
+
+        NotificationOutbox.objects.update(sent_at=timezone.now() - timedelta(days=8))
+        drain_notification_outbox()
+
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+
+class StuffFinalResponseDescriptionSerializerTestCase(ProgramFixtureMixin, APITestCase):
+    def setUp(self):
+        self.set_up_program()
+        self.stage = self.create_stage()
+        self.applicant_response = ApplicantResponse.objects.create(
+            applicant=self.create_applicant_users(1)[0],
+            stage=self.stage,
+            direction=self.direction,
+            applicant_response_description="Response",
+        )
+        self.stuff = CustomUserModel.objects.create_user(
+            email="stuff@example.com", password="testpass", user_type=CustomUserModel.UserTypes.STUFF_DIRECTION
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.stuff)}")
+        self.url = reverse("acceleration_program:stuff_final_response_with_description-list")
+
+    def evaluate(self, evaluation_status):
+        data = {"applicant_response": self.applicant_response.pk, "description": "Review", "status": evaluation_status}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data)
+        updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+        return response, updates
+
+    def test_evaluation_changes_only_status_column_once(self):
+        response, updates = self.evaluate("Accepted")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('SET "status"', updates[0])
+        self.assertNotIn("applicant_response_description", updates[0])
+        self.applicant_response.refresh_from_db()
+        self.assertEqual(self.applicant_response.status, ApplicantResponse.Statuses.ACCEPTED)
+        self.assertEqual(NotificationOutbox.objects.get().status, "Accepted")
+
+    def test_invalid_evaluation_doesnt_change_status(self):
+        response, updates = self.evaluate("None")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(updates, [])
+        self.applicant_response.refresh_from_db()
+        self.assertEqual(self.applicant_response.status, ApplicantResponse.Statuses.PENDING)
+
+    def test_failed_evaluation_insert_doesnt_change_status(self):
+        # EVALUATION OF THE SAME AUTHOR WHICH WAS INSERTED CONCURRENTLY, AFTER UNIQUENESS VALIDATOR HAS RUN
+        manager = StuffFinalResponseDescription._default_manager  # noqa
+        with mock.patch.object(manager, "create", side_effect=IntegrityError("stuff_final_response_unique")):
+            response, _ = self.evaluate("Rejected")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already evaluated", response.data["detail"])
+        self.applicant_response.refresh_from_db()
+        self.assertEqual(self.applicant_response.status, ApplicantResponse.Statuses.PENDING)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_update_propagates_changed_status_only(self):
+        evaluation_id = self.evaluate("Accepted")[0].data["id"]
+        detail_url = reverse("acceleration_program:stuff_final_response_with_description-detail", args=[evaluation_id])
+        data = {"applicant_response": self.applicant_response.pk, "description": "Changed review"}
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(detail_url, {**data, "status": "Accepted"})
+        self.assertFalse(any('"acceleration_program_applicantresponse" SET' in query["sql"] for query in queries))
+
+        response = self.client.put(detail_url, {**data, "status": "Rejected"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.applicant_response.refresh_from_db()
+        self.assertEqual(self.applicant_response.status, ApplicantResponse.Statuses.REJECTED)
+        self.assertEqual(
+            list(NotificationOutbox.objects.order_by("id").values_list("status", flat=True)), ["Accepted", "Rejected"]
+        )
+
+    def test_update_cant_move_evaluation_to_another_applicant_response(self):
+        evaluation_id = self.evaluate("Accepted")[0].data["id"]
+        detail_url = reverse("acceleration_program:stuff_final_response_with_description-detail", args=[evaluation_id])
+        other_response = ApplicantResponse.objects.create(
+            applicant=CustomUserModel.objects.create_user(email="other@example.com", password="testpass"),
+            stage=self.stage,
+            direction=self.direction,
+        )
+
+        response = self.client.put(
+            detail_url, {"applicant_response": other_response.pk, "description": "Review", "status": "Rejected"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("applicant_response", response.data)
+        self.assertEqual(StuffFinalResponseDescription.objects.get().applicant_response, self.applicant_response)
+        other_response.refresh_from_db()
+        self.assertEqual(other_response.status, ApplicantResponse.Statuses.PENDING)
@@ -9,6 +9,10 @@ from apps.acceleration_program.views import (
     ApplicantResponseModelViewSet,
     StuffFinalResponseDescriptionModelViewSet,
     StuffMembersResponseModelViewSet,
+    ApplicantResponseRankingViewSet,
+    SearchViewSet,
+    AccelerationProgramAsyncView,
+    StageAsyncView,
 )
 
 app_name: str = "acceleration_program"
@@ -29,7 +33,14 @@ router.register(
     StuffMembersResponseModelViewSet,
     basename="stuff_member_response",
 )
+router.register("ranking", ApplicantResponseRankingViewSet, basename="ranking")
+router.register("search", SearchViewSet, basename="search")
 
 urlpatterns = [
     path("", include(router.urls)),
+    # ASYNC READ ENDPOINTS, SEE core.views.AsyncReadOnlyView
+    path("async/program/", AccelerationProgramAsyncView.as_view(), name="acceleration_program-async-list"),
+    path("async/program/<int:id>/", AccelerationProgramAsyncView.as_view(), name="acceleration_program-async-detail"),
+    path("async/stage/", StageAsyncView.as_view(), name="stage-async-list"),
+    path("async/stage/<int:id>/", StageAsyncView.as_view(), name="stage-async-detail"),
 ]
@@ -1,12 +1,21 @@
-from typing import Type, List, Union
+from typing import Type, List, Optional, Union
 
-from drf_spectacular.utils import extend_schema
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import Count, F, Prefetch, Q, QuerySet, Window
+from django.db.models.functions import Rank
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.mixins import ListModelMixin
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
+from apps.acceleration_program.exports import EXPORTS, EXPORT_CHUNK_SIZE, iter_export_rows, stream_csv, stream_ndjson
 from apps.acceleration_program.models import (
     AccelerationProgram,
     Applicants,
@@ -15,27 +24,52 @@ from apps.acceleration_program.models import (
     ApplicantResponse,
     StuffFinalResponseDescription,
     StuffMembersResponse,
+    ApplicantResponseScore,
+    SEARCH_CONFIG,
 )
+from apps.acceleration_program.pagination import ApplicantCursorPagination, RankingPagination, SearchPagination
 from apps.acceleration_program.permissions import (
     IsStuffAccelerationOrAdminUser,
     IsOwnerAdminStuffOrReadOnly,
     IsStuffDirectionOrAdminUser,
     IsOwnerAdminOrReadOnly,
+    IsStuffMemberOrAdminUser,
 )
 from apps.acceleration_program.serializers import (
     AccelerationProgramSerializer,
     RegisteredApplicantsSerializer,
     JoinProgramSerializer,
     ApplicantsRegistrationSerializer,
+    ApplicantsImportSerializer,
+    ApplicantsBulkStatusSerializer,
     StageSerializer,
     ApplicantResponseSerializer,
     StuffFinalResponseDescriptionSerializer,
     StuffMembersResponseSerializer,
+    ApplicantResponseRankingSerializer,
+    ApplicantPipelineSerializer,
+    JoinProgramExpandedSerializer,
+    ProgramSearchResultSerializer,
+    ApplicantResponseSearchResultSerializer,
 )
+from apps.accounts.models import CustomUserModel
+from core.cache import CachedResponseMixin
+from core.views import AsyncReadOnlyView, stream_in_thread
+
+
+def get_id_query_params(request: "Request", *names: str) -> List[Optional[str]]:
+    """Returns values of id query params in the given order and raises 400_BAD_REQUEST if any of them isn't integer"""
+
+    values = [request.query_params.get(name) for name in names]
+    for name, value in zip(names, values):
+        if value and not value.isdigit():
+            raise ValidationError({name: "A valid integer is required."})
+    return values
 
 
 @extend_schema(tags=["Programs"])
-class AccelerationProgramViewSet(ModelViewSet):
+class AccelerationProgramViewSet(CachedResponseMixin, ModelViewSet):
+    cache_namespace = "programs"
     permission_classes = (IsAuthenticated, IsStuffAccelerationOrAdminUser)
     queryset = AccelerationProgram.objects.all()
     serializer_class = AccelerationProgramSerializer
@@ -54,9 +88,11 @@ class AccelerationProgramViewSet(ModelViewSet):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
-        serializer.create_joinprogram_template(instance=instance)
         self.perform_update(serializer)
 
+        if "directions" in serializer.validated_data:  # TEMPLATES DEPEND ONLY ON DIRECTIONS
+            serializer.create_joinprogram_template(instance=instance)
+
         if getattr(instance, "_prefetched_objects_cache", None):
             # IF 'PREFETCH_RELATED' HAS BEEN APPLIED TO A QUERYSET,
             # WE NEED TO FORCIBLY INVALIDATE THE PREFETCH CACHE ON THE INSTANCE
@@ -64,30 +100,221 @@ class AccelerationProgramViewSet(ModelViewSet):
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        parameters=[OpenApiParameter("export_format", enum=["csv", "ndjson"], default="csv")],
+        responses={(200, "text/csv"): OpenApiTypes.STR, (200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path=f"export/(?P<resource>{'|'.join(EXPORTS)})",
+        permission_classes=(IsAuthenticated, IsStuffMemberOrAdminUser),
+    )
+    def export(self, request: "Request", resource: str, *args, **kwargs) -> "StreamingHttpResponse":
+        """
+        Streams all rows of the resource that belong to the program as CSV or NDJSON
+        E.g:
+            /program/1/export/applicants/?export_format=ndjson
+        """
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in ("csv", "ndjson"):
+            raise ValidationError({"export_format": "Export format must be csv or ndjson."})
+
+        program = self.get_object()
+        rows = iter_export_rows(resource, program.id)
+        if export_format == "csv":
+            response = StreamingHttpResponse(stream_csv(EXPORTS[resource].fields, rows), content_type="text/csv")
+        else:
+            response = StreamingHttpResponse(
+                stream_ndjson(EXPORTS[resource].fields, rows), content_type="application/x-ndjson"
+            )
+
+        response["Content-Disposition"] = f'attachment; filename="program-{program.id}-{resource}.{export_format}"'
+        return stream_in_thread(request, response, batch_size=EXPORT_CHUNK_SIZE)
+
+
+class AccelerationProgramAsyncView(AsyncReadOnlyView):
+    cache_namespace = "programs"
+    permission_classes = (IsAuthenticated, IsStuffAccelerationOrAdminUser)
+    queryset = AccelerationProgram.objects.prefetch_related("directions")
+    serializer_class = AccelerationProgramSerializer
+
 
 @extend_schema(tags=["Applicants"])
 class ApplicantModelViewSet(ModelViewSet):
     permission_classes = (IsAuthenticated, IsOwnerAdminStuffOrReadOnly)
     serializer_class = RegisteredApplicantsSerializer
-    queryset = Applicants.objects.all()
+    queryset = Applicants.objects.select_related("program_to_join__program", "program_to_join__direction")
+    pagination_class = ApplicantCursorPagination
     http_method_names = ["get", "post", "put", "patch", "delete"]
 
+    def get_queryset(self):
+        """
+        Filters applicants by query params, every filter is backed by composite index
+        E.g:
+            /applicant/?program=1&direction=2&request_status=Pending
+        """
+        queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+
+        program, direction = get_id_query_params(self.request, "program", "direction")
+        request_status = self.request.query_params.get("request_status")
+
+        if program:
+            queryset = queryset.filter(program_to_join__program_id=program)
+        if direction:
+            queryset = queryset.filter(program_to_join__direction_id=direction)
+        if request_status:
+            queryset = queryset.filter(request_status=request_status)
+
+        return queryset
+
     def get_serializer_class(self):
         if self.action == "create":
             return ApplicantsRegistrationSerializer
+        if self.action == "bulk_registration":
+            return ApplicantsImportSerializer
+        if self.action == "bulk_status":
+            return ApplicantsBulkStatusSerializer
         return self.serializer_class
 
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=(IsAuthenticated, IsStuffAccelerationOrAdminUser),
+    )
+    def bulk_registration(self, request: "Request", *args, **kwargs) -> "Response":
+        """
+        Imports list of applicants in one transaction
+        E.g:
+            [
+                {"applicant": 1, "program_to_join": 1},
+                {"applicant": 2, "program_to_join": 1, "request_status": "Accepted"},
+            ]
+        """
+        serializer = self.get_serializer(data=request.data, many=True, max_length=10000)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=(IsAuthenticated, IsStuffAccelerationOrAdminUser),
+    )
+    def bulk_status(self, request: "Request", *args, **kwargs) -> "Response":
+        """
+        Accepts or rejects applicants in one UPDATE instead of one PATCH per applicant
+        E.g:
+            {"ids": [1, 2, 3], "request_status": "Accepted"}
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = serializer.save()
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
 
 @extend_schema(tags=["Join Program"])
 class JoinProgramModelViewSet(ModelViewSet):
     permission_classes = (IsAuthenticated, IsStuffAccelerationOrAdminUser)
     serializer_class = JoinProgramSerializer
-    queryset = JoinProgram.objects.all()
+    # PREFETCHING ONLY IDS WHICH ARE SERIALIZED, SO MANY TO MANY FIELDS DON'T RUN QUERY PER JOIN PROGRAM
+    queryset = JoinProgram.objects.prefetch_related(
+        Prefetch("applicants", queryset=CustomUserModel.objects.only("id")),
+        Prefetch("stages_data", queryset=Stage.objects.only("id")),
+    )
     http_method_names = ["get", "post", "patch", "delete"]
 
+    def is_expanded(self) -> bool:
+        return self.action in ("list", "retrieve") and self.request.query_params.get("expand") in ("1", "true")
+
+    def get_queryset(self):
+        if self.action == "pipeline":  # APPLICANTS ARE PAGINATED BY THE ACTION ITSELF
+            return JoinProgram.objects.prefetch_related(Prefetch("stages_data", queryset=Stage.objects.order_by("id")))
+
+        if self.is_expanded():
+            # PROGRAM AND DIRECTION ARE JOINED, STAGES ARE ONE PREFETCH AND APPLICANTS ARE ONLY COUNTED
+            return (
+                JoinProgram.objects.select_related("program", "direction")
+                .prefetch_related(Prefetch("stages_data", queryset=Stage.objects.order_by("id")))
+                .annotate(
+                    **{
+                        f"{request_status.lower()}_applicants": Count(
+                            "program_applicant", filter=Q(program_applicant__request_status=request_status)
+                        )
+                        for request_status in Applicants.RequestStatuses.values
+                    }
+                )
+                .order_by("id")
+            )
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.is_expanded():
+            return JoinProgramExpandedSerializer
+        return self.serializer_class
+
+    @extend_schema(parameters=[OpenApiParameter("expand", bool, description="Inline program, direction and stages")])
+    def list(self, request: "Request", *args, **kwargs) -> "Response":
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=[OpenApiParameter("expand", bool, description="Inline program, direction and stages")])
+    def retrieve(self, request: "Request", *args, **kwargs) -> "Response":
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(responses=ApplicantPipelineSerializer(many=True))
+    @action(detail=True, methods=["get"], pagination_class=ApplicantCursorPagination)
+    def pipeline(self, request: "Request", *args, **kwargs) -> "Response":
+        """
+        Progress of every applicant of the join program across all its stages: response status, final decisions
+        of stuff and average point of stuff members. Standard users get only their own progress.
+        Page takes the same number of queries regardless of number of applicants, stages and evaluations
+        E.g:
+            /join_program/1/pipeline/?page_size=100
+        """
+        join_program = self.get_object()
+        stages = list(join_program.stages_data.all())
+
+        applicants = (
+            Applicants.objects.filter(program_to_join=join_program)
+            .select_related("applicant")
+            .only("id", "applicant__id", "applicant__email", "request_status", "join_request_date")
+            .prefetch_related(
+                Prefetch(
+                    "applicant__applicantresponse_set",
+                    queryset=ApplicantResponse.objects.filter(stage__in=stages)
+                    .select_related("score")
+                    .prefetch_related(
+                        Prefetch(
+                            "stufffinalresponsedescription_set",
+                            queryset=StuffFinalResponseDescription.objects.order_by("id"),
+                            to_attr="final_decisions",
+                        )
+                    ),
+                    to_attr="pipeline_responses",
+                )
+            )
+        )
+        if request.user.user_type == CustomUserModel.UserTypes.STANDARD:
+            applicants = applicants.filter(applicant_id=request.user.id)
+
+        page = self.paginate_queryset(applicants)
+        context = {**self.get_serializer_context(), "stages": stages}
+        serializer = ApplicantPipelineSerializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
+
 
 @extend_schema(tags=["Stage"])
-class StageModelViewSet(ModelViewSet):
+class StageModelViewSet(CachedResponseMixin, ModelViewSet):
+    cache_namespace = "stages"
+    permission_classes = (IsAuthenticated, IsStuffAccelerationOrAdminUser)
+    queryset = Stage.objects.all()
+    serializer_class = StageSerializer
+
+
+class StageAsyncView(AsyncReadOnlyView):
+    cache_namespace = "stages"
     permission_classes = (IsAuthenticated, IsStuffAccelerationOrAdminUser)
     queryset = Stage.objects.all()
     serializer_class = StageSerializer
@@ -136,3 +363,117 @@ class StuffFinalResponseDescriptionModelViewSet(ModelViewSet):
 
     def perform_create(self, serializer):
         return serializer.save(author=self.request.user)
+
+
+@extend_schema(
+    tags=["Ranking"],
+    parameters=[OpenApiParameter(name, int) for name in ("program", "direction", "stage")],
+)
+class ApplicantResponseRankingViewSet(ListModelMixin, GenericViewSet):
+    """
+    Leaderboard of applicant responses based on stuff members points, ranked inside each stage and direction.
+    It reads ApplicantResponseScore summary, so its cost doesn't depend on the number of evaluators
+    """
+
+    permission_classes = (IsAuthenticated, IsStuffMemberOrAdminUser)
+    serializer_class = ApplicantResponseRankingSerializer
+    pagination_class = RankingPagination
+
+    def get_queryset(self):
+        program, direction, stage = get_id_query_params(self.request, "program", "direction", "stage")
+        queryset = ApplicantResponseScore.objects.select_related("applicant_response").filter(points_count__gt=0)
+
+        if program:
+            queryset = queryset.filter(
+                applicant_response__stage__joinprogram__program_id=program,
+                applicant_response__stage__joinprogram__direction_id=F("applicant_response__direction_id"),
+            )
+        if direction:
+            queryset = queryset.filter(applicant_response__direction_id=direction)
+        if stage:
+            queryset = queryset.filter(applicant_response__stage_id=stage)
+
+        return queryset.annotate(
+            rank=Window(
+                expression=Rank(),
+                partition_by=[F("applicant_response__stage_id"), F("applicant_response__direction_id")],
+                order_by=F("point_avg").desc(),
+            )
+        ).order_by("applicant_response__stage_id", "applicant_response__direction_id", "rank", "applicant_response_id")
+
+
+@extend_schema(tags=["Search"])
+class SearchViewSet(GenericViewSet):
+    """
+    Ranked full-text search of stuff over programs and applicant responses (PostgreSQL only). Matches are found
+    by GIN indexes of search_vector columns, which database triggers keep up to date, and only the page of them
+    gets headline. Query param q supports web search syntax: "exact phrase", or, -excluded
+    """
+
+    permission_classes = (IsAuthenticated, IsStuffMemberOrAdminUser)
+    pagination_class = SearchPagination
+
+    def get_search_query(self) -> "SearchQuery":
+        text = self.request.query_params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": "This query param is required."})
+        return SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+
+    def get_search_response(self, queryset: "QuerySet", text_field: str, serializer_class) -> "Response":
+        query = self.get_search_query()
+        queryset = (
+            queryset.filter(search_vector=query)
+            .annotate(
+                rank=SearchRank(F("search_vector"), query),
+                headline=SearchHeadline(text_field, query, config=SEARCH_CONFIG, max_fragments=2),
+            )
+            .defer("search_vector", text_field)
+            .order_by("-rank", "id")
+        )
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(serializer_class(page, many=True).data)
+
+    @extend_schema(
+        parameters=[OpenApiParameter("q", str, required=True), OpenApiParameter("direction", int)],
+        responses=ProgramSearchResultSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"])
+    def programs(self, request: "Request", *args, **kwargs) -> "Response":
+        """
+        Programs ranked by matches in name, then in requirements
+        E.g:
+            /search/programs/?q=machine learning&direction=1
+        """
+        (direction,) = get_id_query_params(request, "direction")
+        queryset = AccelerationProgram.objects.all()
+        if direction:
+            queryset = queryset.filter(directions__id=direction)
+        return self.get_search_response(queryset, "requirements", ProgramSearchResultSerializer)
+
+    @extend_schema(
+        parameters=[OpenApiParameter("q", str, required=True)]
+        + [OpenApiParameter(name, int) for name in ("program", "direction", "stage")],
+        responses=ApplicantResponseSearchResultSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"])
+    def responses(self, request: "Request", *args, **kwargs) -> "Response":
+        """
+        Applicant responses ranked by matches in description
+        E.g:
+            /search/responses/?q="neural network" -keras&program=1&stage=2
+        """
+        program, direction, stage = get_id_query_params(request, "program", "direction", "stage")
+        queryset = ApplicantResponse.objects.all()
+
+        if program:  # THE SAME JOIN PROGRAM CONDITION AS RANKING HAS
+            queryset = queryset.filter(
+                stage__joinprogram__program_id=program, stage__joinprogram__direction_id=F("direction_id")
+            )
+        if direction:
+            queryset = queryset.filter(direction_id=direction)
+        if stage:
+            queryset = queryset.filter(stage_id=stage)
+
+        return self.get_search_response(
+            queryset, "applicant_response_description", ApplicantResponseSearchResultSerializer
+        )
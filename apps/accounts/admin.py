@@ -1,5 +1,7 @@
 from django.contrib import admin
 
-from apps.accounts.models import CustomUserModel
+from apps.accounts.models import CustomUserModel, CVUpload, StoredCV
 
 admin.site.register(CustomUserModel)
+admin.site.register(CVUpload)
+admin.site.register(StoredCV)
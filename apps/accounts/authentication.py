@@ -0,0 +1,26 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from apps.accounts.models import CustomUserModel
+from apps.accounts.tokens import USER_CLAIMS
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication which builds user from token claims without database query. User is loaded the same way
+    as from queryset with deferred fields, so other fields (e.g. cv) are fetched lazily only when they are used.
+    Tokens issued before claims were added fall back to loading user from database
+    """
+
+    def get_user(self, validated_token: "Token") -> "CustomUserModel":
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        # DEACTIVATION REVOKES TOKENS, SO USER OF VALID TOKEN IS ACTIVE
+        claims = {api_settings.USER_ID_FIELD: validated_token[api_settings.USER_ID_CLAIM], "is_active": True}
+        claims.update((claim, validated_token[claim]) for claim in USER_CLAIMS)
+
+        # FROM_DB EXPECTS VALUES IN ORDER OF MODEL FIELDS
+        field_names = [field.attname for field in CustomUserModel._meta.concrete_fields if field.attname in claims]
+        return CustomUserModel.from_db(CustomUserModel.objects.db, field_names, [claims[name] for name in field_names])
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class ConfigurableArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 hasher which takes its cost from PASSWORD_HASHER_ARGON2 setting, so cost can be tuned per deployment
+    using benchmark_password_hashers command. When cost is changed, stored hashes are upgraded on the next login
+    E.g:
+        PASSWORD_HASHER_ARGON2 = {"TIME_COST": 2, "MEMORY_COST": 65536, "PARALLELISM": 1}
+    """
+
+    @property
+    def time_cost(self) -> int:
+        return settings.PASSWORD_HASHER_ARGON2["TIME_COST"]
+
+    @property
+    def memory_cost(self) -> int:  # KIBIBYTES
+        return settings.PASSWORD_HASHER_ARGON2["MEMORY_COST"]
+
+    @property
+    def parallelism(self) -> int:
+        return settings.PASSWORD_HASHER_ARGON2["PARALLELISM"]
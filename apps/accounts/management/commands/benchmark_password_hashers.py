@@ -0,0 +1,67 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+def hash_passwords(hasher_path: str, duration: float, argon2_options: dict) -> int:
+    """Hashes passwords in one process until duration is over and returns number of produced hashes"""
+    settings.PASSWORD_HASHER_ARGON2 = {**settings.PASSWORD_HASHER_ARGON2, **argon2_options}
+    hasher = import_string(hasher_path)()
+
+    hashes = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        hasher.encode("benchmark-password", hasher.salt())
+        hashes += 1
+
+    return hashes
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures password hashes per second per core for configured hashers, "
+        "use it to tune PASSWORD_HASHER_ARGON2 and to size API nodes for registration and login peaks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hasher", action="append", dest="hashers", help="Hasher path, default: PASSWORD_HASHERS")
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds to hash in each process")
+        parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Number of cores to load")
+        parser.add_argument("--time-cost", type=int, help="Argon2 time cost to try instead of configured one")
+        parser.add_argument("--memory-cost", type=int, help="Argon2 memory cost (KiB) to try instead of configured one")
+        parser.add_argument("--parallelism", type=int, help="Argon2 parallelism to try instead of configured one")
+
+    def handle(self, *args, **options):
+        argon2_options = {
+            option.upper(): options[option]
+            for option in ("time_cost", "memory_cost", "parallelism")
+            if options[option] is not None
+        }
+        processes = options["processes"]
+
+        self.stdout.write(f"Argon2 options: {dict(settings.PASSWORD_HASHER_ARGON2, **argon2_options)}")
+        self.stdout.write(f"Processes: {processes}, duration: {options['duration']}s")
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=django.setup) as executor:
+            for hasher_path in options["hashers"] or settings.PASSWORD_HASHERS:
+                hashes = sum(
+                    executor.map(
+                        hash_passwords,
+                        [hasher_path] * processes,
+                        [options["duration"]] * processes,
+                        [argon2_options] * processes,
+                    )
+                )
+                per_core = hashes / options["duration"] / processes
+
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{hasher_path}: {per_core:.1f} hashes/s per core, {per_core * processes:.1f} hashes/s total, "
+                        f"{1000 / per_core:.1f} ms per hash"
+                    )
+                )
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18 14:10
+
+import apps.accounts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0004_cvupload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredCV",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("references", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="customusermodel",
+            name="cv",
+            field=models.FileField(null=True, storage=apps.accounts.storage.get_cv_storage, upload_to=""),
+        ),
+    ]
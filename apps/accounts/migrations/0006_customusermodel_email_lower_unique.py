@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 14:40
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0005_storedcv"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="customusermodel",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="user_email_lower_unique",
+            ),
+        ),
+    ]
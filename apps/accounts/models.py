@@ -1,11 +1,24 @@
+import uuid
+from pathlib import Path
+
+from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
+from apps.accounts.revocation import revoke_user_tokens
+from apps.accounts.storage import get_cv_storage
+
 
 class CustomUserManager(BaseUserManager):
+    def get_by_natural_key(self, username: str) -> "CustomUserModel":
+        """Emails are unique regardless of case, lookup by LOWER(email) uses the same index as the constraint"""
+        return self.alias(email_lower=Lower(self.model.USERNAME_FIELD)).get(email_lower=username.lower())
+
     def create_user(self, email, password, **extra_fields) -> "CustomUserModel":
         extra_fields.setdefault("is_staff", False)
         extra_fields.setdefault("is_superuser", False)
@@ -52,11 +65,140 @@ class CustomUserModel(AbstractUser):
         choices=UserTypes.choices,
         default=UserTypes.STANDARD,
     )
-    cv = models.FileField(null=True)
+    cv = models.FileField(null=True, storage=get_cv_storage)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
+    # FIELDS WHICH ARE EMBEDDED IN ACCESS TOKENS, WHEN ONE OF THEM IS CHANGED ISSUED TOKENS ARE REVOKED
+    TOKEN_CLAIM_FIELDS = ("email", "user_type", "is_superuser", "is_staff", "is_active")
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            models.UniqueConstraint(Lower("email"), name="user_email_lower_unique"),
+        ]
+
     def __str__(self):
         return self.email
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # REMEMBERING LOADED CV SO THAT SAVE CAN MOVE REFERENCE WHEN CV IS REPLACED
+        instance._loaded_cv_name = instance.__dict__.get("cv") or None
+        instance._loaded_token_claims = instance._get_token_claims()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        # DEFERRED FIELDS (E.G. OF USER BUILT FROM TOKEN CLAIMS) ARE LOADED THIS WAY
+        super().refresh_from_db(using=using, fields=fields)
+        if "cv" in self.__dict__ and (fields is None or "cv" in fields):
+            self._loaded_cv_name = self.cv.name or None
+        self._loaded_token_claims = {**getattr(self, "_loaded_token_claims", {}), **self._get_token_claims()}
+
+    def _get_token_claims(self) -> dict:
+        return {field: self.__dict__[field] for field in self.TOKEN_CLAIM_FIELDS if field in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        """
+        Keeps reference counters of stored CV files in sync with users which point to them and revokes issued
+        tokens when fields embedded in them are changed
+        """
+
+        loaded_cv_name = getattr(self, "_loaded_cv_name", None)
+        loaded_token_claims = getattr(self, "_loaded_token_claims", None)
+
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+            if "cv" in self.__dict__ and (self.cv.name or None) != loaded_cv_name:
+                StoredCV.add_reference(self.cv.name)
+                StoredCV.remove_reference(loaded_cv_name)
+
+            # FIELD WHICH WASN'T LOADED IS CONSIDERED CHANGED, NEW USERS DON'T HAVE TOKENS YET
+            if loaded_token_claims is not None and any(
+                loaded_token_claims.get(field, models.NOT_PROVIDED) != value
+                for field, value in self._get_token_claims().items()
+            ):
+                transaction.on_commit(lambda: revoke_user_tokens(self.pk))
+
+        if "cv" in self.__dict__:
+            self._loaded_cv_name = self.cv.name or None
+        self._loaded_token_claims = self._get_token_claims()
+
+
+class CVUpload(models.Model):
+    """Resumable upload session of CV, chunks are written to temporary directory and processed by celery task"""
+
+    class Statuses(models.TextChoices):
+        UPLOADING = _("Uploading")
+        PROCESSING = _("Processing")
+        COMPLETED = _("Completed")
+        FAILED = _("Failed")
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(to=CustomUserModel, on_delete=models.CASCADE, related_name="cv_uploads")
+    file_name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=150, default=Statuses.UPLOADING, choices=Statuses.choices)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user} - {self.file_name} - {self.status}"
+
+    @property
+    def temporary_path(self) -> Path:
+        return Path(settings.CV_UPLOAD_TEMPORARY_DIR) / str(self.id)
+
+    def get_chunk_path(self, start: int) -> Path:
+        """Chunk is named by its first byte, zero padding keeps order of names the same as order of chunks"""
+        return self.temporary_path / f"{start:012d}"
+
+
+class StoredCV(models.Model):
+    """
+    Reference counter of content addressed CV file, file is deleted when the last user stops pointing to it.
+    Counter row is the lock of the file: storage writes or reuses the file and deletion removes it only while
+    holding the row lock, so the file isn't deleted under the reference which is being added concurrently
+    """
+
+    name = models.CharField(max_length=255, primary_key=True)
+    references = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} - references={self.references}"
+
+    @classmethod
+    def lock(cls, name: str) -> None:
+        """Locks counter of the file till the end of transaction, counter is created when the file has none"""
+        while not cls.objects.select_for_update().filter(name=name).exists():
+            cls.objects.bulk_create([cls(name=name)], ignore_conflicts=True)
+
+    @classmethod
+    def add_reference(cls, name: str) -> None:
+        if not name:
+            return
+        cls.objects.bulk_create([cls(name=name)], ignore_conflicts=True)
+        cls.objects.filter(name=name).update(references=F("references") + 1)
+
+    @classmethod
+    def remove_reference(cls, name: str) -> None:
+        """Files without counter (stored before content addressing) are left untouched"""
+        if not name:
+            return
+        cls.objects.filter(name=name).update(references=F("references") - 1)
+        if cls.objects.filter(name=name, references=0).exists():
+            transaction.on_commit(lambda: cls._delete_unreferenced_file(name))
+
+    @classmethod
+    def _delete_unreferenced_file(cls, name: str) -> None:
+        """
+        Deletes the file with its counter if it still has no references. DELETE waits for the lock of concurrent
+        upload of the same content and rechecks the counter after it commits, the lock is held while file is deleted
+        """
+        with transaction.atomic():
+            deleted, _ = cls.objects.filter(name=name, references=0).delete()
+            if deleted:
+                get_cv_storage().delete(name)
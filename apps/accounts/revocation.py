@@ -0,0 +1,21 @@
+import time
+from typing import Optional
+
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+
+def _revocation_key(user_id: int) -> str:
+    return f"auth:revoked:{user_id}"
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """
+    Revokes all tokens issued to the user before now (e.g. after role change), so claims are never older than
+    database. Record lives as long as refresh token, after that revoked tokens are expired anyway
+    """
+    cache.set(_revocation_key(user_id), time.time(), timeout=api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+
+def get_tokens_revoked_at(user_id: int) -> Optional[float]:
+    return cache.get(_revocation_key(user_id))
@@ -1,9 +1,12 @@
+from pathlib import Path
 from typing import OrderedDict
 
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
-from apps.accounts.models import CustomUserModel
+from apps.accounts.models import CustomUserModel, CVUpload
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -13,12 +16,11 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CustomUserModel
-        fields = ['email', 'password', 'confirm_password', 'cv']
+        fields = ['email', 'password', 'confirm_password']  # CV IS UPLOADED SEPARATELY USING CVUploadAPIView
 
     def validate(self, data: "OrderedDict") -> "OrderedDict":
         """This method helps us to validate each step during user registration"""
-        if CustomUserModel.objects.filter(email=data.get('email')):
-            raise serializers.ValidationError({"email": _("Account with this email already exists.")})
+        # EMAIL UNIQUENESS IS CHECKED BY DATABASE ON INSERT (SEE create), SO THERE IS NO EXTRA QUERY AND NO RACE
         if data.get('password') != data.get('confirm_password'):
             raise serializers.ValidationError({"confirm_password": _("Passwords Doesn't Match.")})
 
@@ -28,5 +30,33 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data: "OrderedDict") -> "CustomUserModel":
         """Overriding this method because we want to use our custom user model create_user method with its logic"""
-        instance = CustomUserModel.objects.create_user(**validated_data)
+        try:
+            with transaction.atomic():  # SAVEPOINT, SO THAT OUTER TRANSACTION IS USABLE AFTER INTEGRITY ERROR
+                instance = CustomUserModel.objects.create_user(**validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({"email": [_("Account with this email already exists.")]})
         return instance
+
+
+class CVUploadSerializer(serializers.ModelSerializer):
+    ALLOWED_EXTENSIONS = ('.pdf', '.doc', '.docx')
+
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CVUpload
+        fields = ['id', 'file_name', 'size', 'received_bytes', 'status', 'error', 'chunk_size']
+        read_only_fields = ['received_bytes', 'status', 'error']
+
+    def validate_file_name(self, file_name: str) -> str:
+        if Path(file_name).suffix.lower() not in self.ALLOWED_EXTENSIONS:
+            raise serializers.ValidationError(_("CV must be one of: %s") % ", ".join(self.ALLOWED_EXTENSIONS))
+        return Path(file_name).name  # DROPPING CLIENT DIRECTORIES
+
+    def validate_size(self, size: int) -> int:
+        if not 0 < size <= settings.CV_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(_("CV size must be up to %s bytes.") % settings.CV_UPLOAD_MAX_SIZE)
+        return size
+
+    def get_chunk_size(self, instance: "CVUpload") -> int:  # noqa
+        return settings.CV_UPLOAD_CHUNK_SIZE
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.accounts.models import CustomUserModel, StoredCV
+from apps.accounts.revocation import revoke_user_tokens
+
+
+@receiver(post_delete, sender=CustomUserModel)
+def remove_cv_reference(sender, instance: "CustomUserModel", **kwargs) -> None:
+    """Signal receiver that releases CV file of deleted user, the file is deleted if nobody else uses it"""
+    StoredCV.remove_reference(getattr(instance, "_loaded_cv_name", None))
+
+
+@receiver(post_delete, sender=CustomUserModel)
+def revoke_deleted_user_tokens(sender, instance: "CustomUserModel", **kwargs) -> None:
+    """Signal receiver that revokes tokens of deleted user, they would be accepted without database query otherwise"""
+    revoke_user_tokens(instance.pk)
@@ -0,0 +1,84 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from django.http import FileResponse, HttpResponse
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage which names files by SHA-256 of their content, hash is computed while upload is
+    streamed to a temporary file, so identical uploads are stored only once and memory doesn't depend on file size.
+    File is stored or reused under lock of its StoredCV counter, which lasts until the caller's transaction commits,
+    so the caller must add its reference in the same transaction
+    E.g:
+        cv.pdf -> cv/3a/7b/3a7bd3e2360a3d29eea436fcfb7e44c735d117c42d1c1835420b6b9942dd4f1b.pdf
+    """
+
+    def __init__(self, *args, directory: str = "cv", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.directory = directory
+
+    def get_available_name(self, name: str, max_length: int = None) -> str:
+        return name  # NAME IS DEFINED BY CONTENT, SO THE SAME NAME ALWAYS MEANS THE SAME FILE
+
+    def _save(self, name: str, content) -> str:
+        Path(self.path(self.directory)).mkdir(parents=True, exist_ok=True)
+        content_hash = hashlib.sha256()
+
+        with tempfile.NamedTemporaryFile(dir=self.path(self.directory), delete=False) as temporary_file:
+            try:
+                for chunk in content.chunks():
+                    content_hash.update(chunk)
+                    temporary_file.write(chunk)
+            except BaseException:
+                os.unlink(temporary_file.name)
+                raise
+
+        digest = content_hash.hexdigest()
+        name = f"{self.directory}/{digest[:2]}/{digest[2:4]}/{digest}{Path(name).suffix.lower()}"
+
+        with transaction.atomic():
+            # FILE WHICH EXISTS UNDER THE LOCK ISN'T DELETED UNTIL COMMIT, THEN IT ALREADY HAS REFERENCE OF THE CALLER
+            apps.get_model("accounts", "StoredCV").lock(name)  # MODELS IMPORT THIS MODULE
+            if self.exists(name):
+                os.unlink(temporary_file.name)
+            else:
+                Path(self.path(name)).parent.mkdir(parents=True, exist_ok=True)
+                os.chmod(temporary_file.name, self.file_permissions_mode or 0o644)
+                os.replace(temporary_file.name, self.path(name))
+
+        return name
+
+
+cv_storage = ContentAddressedStorage()
+
+
+def get_cv_storage() -> "ContentAddressedStorage":
+    return cv_storage
+
+
+def get_offloaded_file_response(file: "FieldFile") -> "HttpResponse":
+    """
+    Returns response which asks web server to send the file (X-Accel-Redirect for nginx, X-Sendfile for apache),
+    so python worker isn't busy while file is transferred. Without configured header file is streamed by django
+    """
+
+    content_type = mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+    header = settings.CV_SENDFILE_HEADER
+
+    if not header:
+        response = FileResponse(file.open("rb"), content_type=content_type)
+    else:
+        response = HttpResponse(content_type=content_type)
+        response[header] = file.path if header == "X-Sendfile" else f"{settings.CV_SENDFILE_URL_PREFIX}{file.name}"
+
+    response["Content-Disposition"] = f'attachment; filename="{Path(file.name).name}"'
+    return response
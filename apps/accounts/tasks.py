@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounts.models import CVUpload
+from core.celery import app
+
+# LEADING BYTES OF ALLOWED DOCUMENT FORMATS: PDF, DOCX (ZIP CONTAINER) AND DOC (OLE2 CONTAINER)
+CV_SIGNATURES = (b"%PDF-", b"PK\x03\x04", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1")
+
+
+@app.task
+def process_cv_upload(upload_id: str) -> None:
+    """
+    Task that joins received chunks of CV upload, validates the file by its size and content and stores it
+    as user cv. File is copied in blocks, so the task memory doesn't depend on CV size
+    RESULT: CustomUserModel.cv is set, CVUpload.status=Completed or CVUpload.status=Failed with error
+    """
+
+    upload: "CVUpload" = CVUpload.objects.select_related("user").get(id=upload_id)
+    if upload.status != CVUpload.Statuses.PROCESSING:
+        return
+
+    try:
+        with tempfile.TemporaryFile(dir=upload.temporary_path) as temporary_file:
+            for chunk_path in sorted(upload.temporary_path.glob("[0-9]*")):
+                if int(chunk_path.name) != temporary_file.tell():
+                    raise ValueError("Received chunks don't make up continuous file.")
+                with open(chunk_path, "rb") as chunk_file:
+                    shutil.copyfileobj(chunk_file, temporary_file)
+
+            if temporary_file.tell() != upload.size:
+                raise ValueError("Received file size doesn't match declared size.")
+            temporary_file.seek(0)
+            if not temporary_file.read(8).startswith(CV_SIGNATURES):
+                raise ValueError("CV content must be PDF, DOC or DOCX document.")
+
+            temporary_file.seek(0)
+            # STORAGE LOCKS COUNTER OF THE FILE UNTIL COMMIT, SO THE FILE ISN'T DELETED BEFORE REFERENCE IS ADDED
+            with transaction.atomic():
+                upload.user.cv.save(upload.file_name, File(temporary_file), save=False)
+                upload.user.save(update_fields=["cv"])  # SAVE KEEPS REFERENCE COUNTERS OF STORED CV FILES
+    except (OSError, ValueError) as error:
+        upload.status, upload.error = CVUpload.Statuses.FAILED, str(error)
+    else:
+        upload.status = CVUpload.Statuses.COMPLETED
+    finally:
+        shutil.rmtree(upload.temporary_path, ignore_errors=True)
+
+    upload.save(update_fields=["status", "error"])
+
+
+@app.task
+def cleanup_expired_cv_uploads() -> int:
+    """Task that removes uploads which were never finished together with their temporary files"""
+
+    expired = CVUpload.objects.filter(
+        status=CVUpload.Statuses.UPLOADING, created_at__lt=timezone.now() - settings.CV_UPLOAD_EXPIRATION
+    )
+    for upload in expired.iterator():
+        shutil.rmtree(upload.temporary_path, ignore_errors=True)
+
+    deleted, _ = expired.delete()
+    return deleted
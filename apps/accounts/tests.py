@@ -1,3 +1,384 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.authentication import StatelessJWTAuthentication
+from apps.accounts.models import CustomUserModel, CVUpload, StoredCV
+from apps.accounts.serializers import UserRegistrationSerializer
+from apps.accounts.storage import get_cv_storage
+from apps.accounts.tasks import process_cv_upload
+from apps.accounts.views import CVUploadChunkAPIView
+
+
+class RegistrationTestCase(APITestCase):
+    def register(self, email):
+        return self.client.post(
+            reverse("accounts:registration"),
+            {"email": email, "password": "testpass", "confirm_password": "testpass"},
+        )
+
+    def test_email_is_unique_regardless_of_case(self):
+        self.assertEqual(self.register("Applicant@Example.com").status_code, status.HTTP_201_CREATED)
+
+        response = self.register("applicant@example.COM")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["email"], ["Account with this email already exists."])
+        self.assertEqual(CustomUserModel.objects.count(), 1)
+
+    def test_login_is_case_insensitive(self):
+        self.register("Applicant@Example.com")
+
+        response = self.client.post(
+            reverse("accounts:login"), {"email": "applicant@example.com", "password": "testpass"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(PASSWORD_HASHER_ARGON2={"TIME_COST": 1, "MEMORY_COST": 1024, "PARALLELISM": 1})
+class PasswordHashingTestCase(APITestCase):
+    def login(self):
+        response = self.client.post(
+            reverse("accounts:login"), {"email": "applicant@example.com", "password": "testpass"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return CustomUserModel.objects.get().password
+
+    def test_new_password_is_hashed_with_configured_argon2(self):
+        user = CustomUserModel.objects.create_user(email="applicant@example.com", password="testpass")
+
+        self.assertTrue(user.password.startswith("argon2$argon2id$v=19$m=1024,t=1,p=1$"))
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        CustomUserModel.objects.create(
+            email="applicant@example.com", password=make_password("testpass", hasher="pbkdf2_sha256")
+        )
+
+        self.assertTrue(self.login().startswith("argon2$"))
+
+    def test_hash_is_upgraded_when_cost_changes(self):
+        CustomUserModel.objects.create_user(email="applicant@example.com", password="testpass")
+
+        with self.settings(PASSWORD_HASHER_ARGON2={"TIME_COST": 2, "MEMORY_COST": 2048, "PARALLELISM": 1}):
+            self.assertIn("$m=2048,t=2,p=1$", self.login())
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class StatelessAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUserModel.objects.create_user(
+            email="stuff@example.com", password="testpass", user_type=CustomUserModel.UserTypes.STUFF_DIRECTION
+        )
+
+    def login(self):
+        return self.client.post(reverse("accounts:login"), {"email": "stuff@example.com", "password": "testpass"}).data
+
+    def authenticate(self, access_token):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        return StatelessJWTAuthentication().authenticate(request)[0]
+
+    def test_user_is_built_from_token_claims_without_query(self):
+        access_token = self.login()["access"]
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(access_token)
+
+        self.assertEqual(user.id, self.user.id)
+        self.assertEqual(user.user_type, CustomUserModel.UserTypes.STUFF_DIRECTION)
+        self.assertFalse(user.is_superuser)
+        with self.assertNumQueries(1):  # OTHER FIELDS ARE LOADED LAZILY
+            self.assertEqual(user.first_name, self.user.first_name)
+
+    def test_token_without_claims_loads_user_from_database(self):
+        with self.assertNumQueries(1):
+            user = self.authenticate(AccessToken.for_user(self.user))
+
+        self.assertEqual(user.user_type, CustomUserModel.UserTypes.STUFF_DIRECTION)
+
+    def test_role_change_revokes_issued_tokens(self):
+        tokens = self.login()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_type = CustomUserModel.UserTypes.STANDARD
+            self.user.save()
+
+        with self.assertRaises(InvalidToken):
+            self.authenticate(tokens["access"])
+        response = self.client.post(reverse("token_refresh"), {"refresh": tokens["refresh"]})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        user = self.authenticate(self.login()["access"])
+        self.assertEqual(user.user_type, CustomUserModel.UserTypes.STANDARD)
+
+    def test_saving_without_claim_changes_keeps_tokens(self):
+        access_token = self.login()["access"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authenticate(access_token).save(update_fields=["first_name"])
+
+        self.assertEqual(self.authenticate(access_token).id, self.user.id)
+
+
+@skipUnless(connection.vendor == "postgresql", "Concurrent inserts are verified against PostgreSQL only")
+class ConcurrentRegistrationTestCase(TransactionTestCase):
+    THREADS = 16
+
+    def test_concurrent_registrations_create_one_user(self):
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+
+        def register(email):
+            try:
+                serializer = UserRegistrationSerializer(
+                    data={"email": email, "password": "testpass", "confirm_password": "testpass"}
+                )
+                serializer.is_valid(raise_exception=True)
+                barrier.wait()
+                try:
+                    serializer.save()
+                    results.append(True)
+                except ValidationError:
+                    results.append(False)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=register, args=("applicant@example.com" if index % 2 else "APPLICANT@example.com",))
+            for index in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(results.count(False), self.THREADS - 1)
+        self.assertEqual(CustomUserModel.objects.count(), 1)
+
+
+class CVUploadTestCase(APITestCase):
+    CV = b"%PDF-1.4 " + b"x" * 2039
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            CV_UPLOAD_TEMPORARY_DIR=f"{self.media_root}/cv_uploads",
+            CV_UPLOAD_CHUNK_SIZE=1024,
+        )
+        self.settings_override.enable()
+        self.user = CustomUserModel.objects.create_user(email="testuser@example.com", password="testpass")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def start_upload(self, size):
+        response = self.client.post(reverse("accounts:cv_upload"), {"file_name": "cv.pdf", "size": size})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return reverse("accounts:cv_upload_chunk", args=[response.data["id"]])
+
+    def send_chunk(self, url, content, start):
+        return self.client.put(
+            url,
+            content,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(content) - 1}/{len(self.CV)}",
+        )
+
+    @mock.patch("apps.accounts.views.process_cv_upload.delay")
+    def test_chunked_upload(self, process_cv_upload_delay):
+        url = self.start_upload(len(self.CV))
+
+        self.assertEqual(self.send_chunk(url, self.CV[:1024], 0).data["received_bytes"], 1024)
+        self.assertEqual(self.send_chunk(url, self.CV[:1024], 0).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url).data["received_bytes"], 1024)  # CLIENT RESUMES FROM THIS OFFSET
+        response = self.send_chunk(url, self.CV[1024:], 1024)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], CVUpload.Statuses.PROCESSING)
+        process_cv_upload_delay.assert_called_once_with(response.data["id"])
+
+        process_cv_upload(response.data["id"])
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.cv.read(), self.CV)
+        self.assertEqual(CVUpload.objects.get().status, CVUpload.Statuses.COMPLETED)
+
+    @mock.patch("apps.accounts.views.process_cv_upload.delay")
+    def test_losing_concurrent_chunk_doesnt_overwrite_received_one(self, process_cv_upload_delay):
+        url = self.start_upload(len(self.CV))
+        concurrent_upload = CVUpload.objects.get()  # READ BEFORE THE FIRST CHUNK IS RECEIVED
+        self.send_chunk(url, self.CV[:1024], 0)
+
+        with mock.patch.object(CVUploadChunkAPIView, "get_object", return_value=concurrent_upload):
+            response = self.send_chunk(url, b"x" * 1024, 0)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        upload_id = self.send_chunk(url, self.CV[1024:], 1024).data["id"]
+
+        process_cv_upload(upload_id)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.cv.read(), self.CV)
+
+    @mock.patch("apps.accounts.views.process_cv_upload.delay")
+    def test_upload_with_invalid_content_fails(self, process_cv_upload_delay):
+        url = self.start_upload(len(self.CV))
+        self.send_chunk(url, b"x" * 1024, 0)
+        upload_id = self.send_chunk(url, b"x" * 1024, 1024).data["id"]
+
+        process_cv_upload(upload_id)
+
+        upload = CVUpload.objects.get()
+        self.assertEqual(upload.status, CVUpload.Statuses.FAILED)
+        self.assertFalse(upload.temporary_path.exists())
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.cv)
+
+    def test_upload_validation(self):
+        url = reverse("accounts:cv_upload")
+
+        self.assertEqual(
+            self.client.post(url, {"file_name": "cv.exe", "size": 10}).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.post(url, {"file_name": "cv.pdf", "size": 10**9}).status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+
+class StoredCVTestCase(APITestCase):
+    CV = b"%PDF-1.4 same content"
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, CV_SENDFILE_HEADER=None)
+        self.settings_override.enable()
+        self.first_user = CustomUserModel.objects.create_user(email="first@example.com", password="testpass")
+        self.second_user = CustomUserModel.objects.create_user(email="second@example.com", password="testpass")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def save_cv(self, user, content, file_name="cv.pdf"):
+        with self.captureOnCommitCallbacks(execute=True):
+            user.cv.save(file_name, ContentFile(content))
+
+    def test_identical_cvs_are_stored_once(self):
+        self.save_cv(self.first_user, self.CV)
+        self.save_cv(self.second_user, self.CV, file_name="other_name.PDF")
+
+        self.assertEqual(self.first_user.cv.name, self.second_user.cv.name)
+        self.assertTrue(self.first_user.cv.name.startswith("cv/"))
+        self.assertTrue(get_cv_storage().exists(self.first_user.cv.name))
+        self.assertEqual(StoredCV.objects.get().references, 2)
+
+    def test_file_is_deleted_with_last_reference(self):
+        self.save_cv(self.first_user, self.CV)
+        self.save_cv(self.second_user, self.CV)
+        name = self.first_user.cv.name
+
+        self.save_cv(self.first_user, b"%PDF-1.4 another content")
+        self.assertEqual(StoredCV.objects.get(name=name).references, 1)
+        self.assertTrue(get_cv_storage().exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CustomUserModel.objects.get(id=self.second_user.id).delete()
+
+        self.assertFalse(StoredCV.objects.filter(name=name).exists())
+        self.assertFalse(get_cv_storage().exists(name))
+
+    def test_download(self):
+        self.save_cv(self.first_user, self.CV)
+        url = reverse("accounts:cv", args=[self.first_user.id])
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.second_user)}")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.first_user)}")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), self.CV)
+
+        with self.settings(CV_SENDFILE_HEADER="X-Accel-Redirect"):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.first_user.cv.name}")
+        self.assertEqual(response.content, b"")
+
+    async def test_download_is_streamed_through_asgi(self):
+        await sync_to_async(self.save_cv)(self.first_user, self.CV * 10000)
+        url = reverse("accounts:cv", args=[self.first_user.id])
+
+        response = await self.async_client.get(
+            url, headers={"Authorization": f"Bearer {AccessToken.for_user(self.first_user)}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        self.assertEqual(int(response["Content-Length"]), len(self.CV) * 10000)
+        self.assertEqual(b"".join([chunk async for chunk in response.streaming_content]), self.CV * 10000)
+
+
+@skipUnless(connection.vendor == "postgresql", "Row level locks are verified against PostgreSQL only")
+class StoredCVConcurrencyTestCase(TransactionTestCase):
+    CV = b"%PDF-1.4 same content"
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.first_user = CustomUserModel.objects.create_user(email="first@example.com", password="testpass")
+        self.second_user = CustomUserModel.objects.create_user(email="second@example.com", password="testpass")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_file_uploaded_again_before_deletion_is_kept(self):
+        self.first_user.cv.save("cv.pdf", ContentFile(self.CV))
+        name = self.first_user.cv.name
+        uploaded = threading.Event()
+        delete_unreferenced_file = StoredCV._delete_unreferenced_file
+
+        def upload():
+            try:
+                with transaction.atomic():
+                    CustomUserModel.objects.get(id=self.second_user.id).cv.save("cv.pdf", ContentFile(self.CV))
+                    uploaded.set()
+                    time.sleep(0.5)  # DELETION OF THE LAST REFERENCE RUNS BEFORE THE UPLOAD COMMITS
+            finally:
+                connection.close()
+
+        def upload_before_deletion(file_name):
+            # SAME CONTENT IS UPLOADED AFTER THE LAST REFERENCE WAS REMOVED, BUT BEFORE ITS FILE IS DELETED
+            thread = threading.Thread(target=upload)
+            thread.start()
+            uploaded.wait(timeout=10)
+            delete_unreferenced_file(file_name)
+            thread.join()
+
+        with mock.patch.object(StoredCV, "_delete_unreferenced_file", upload_before_deletion):
+            CustomUserModel.objects.get(id=self.first_user.id).delete()
+
+        self.second_user.refresh_from_db()
+        self.assertEqual(self.second_user.cv.name, name)
+        self.assertEqual(StoredCV.objects.get(name=name).references, 1)
+        self.assertTrue(get_cv_storage().exists(name))
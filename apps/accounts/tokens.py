@@ -0,0 +1,51 @@
+import time
+
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.accounts.revocation import get_tokens_revoked_at
+
+# CLAIMS WHICH ARE ENOUGH FOR PERMISSION CLASSES, SO AUTHENTICATION DOESN'T NEED TO LOAD USER FROM DATABASE
+USER_CLAIMS = ("email", "user_type", "is_superuser", "is_staff")
+
+
+class RoleTokenMixin:
+    """Adds user claims and authentication time to the token and rejects tokens issued before revocation"""
+
+    @classmethod
+    def for_user(cls, user: "AbstractBaseUser") -> "RoleTokenMixin":
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token["auth_time"] = time.time()  # COPIED TO ACCESS TOKENS ON REFRESH, SO THEY ARE REVOKED TOGETHER
+        return token
+
+    def verify(self) -> None:
+        super().verify()
+
+        if "auth_time" not in self:  # TOKENS WITHOUT CLAIMS ARE AUTHENTICATED BY LOADING USER FROM DATABASE
+            return
+
+        revoked_at = get_tokens_revoked_at(self[api_settings.USER_ID_CLAIM])
+        if revoked_at is not None and self["auth_time"] <= revoked_at:
+            raise TokenError(_("Token is revoked"))
+
+
+class RoleAccessToken(RoleTokenMixin, AccessToken):
+    pass
+
+
+class RoleRefreshToken(RoleTokenMixin, RefreshToken):
+    access_token_class = RoleAccessToken
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RoleRefreshToken
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RoleRefreshToken
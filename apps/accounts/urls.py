@@ -3,6 +3,9 @@ from django.urls import path
 from apps.accounts.views import (
     RegistrationAPIView,
     LoginAPIView,
+    CVUploadAPIView,
+    CVUploadChunkAPIView,
+    CVDownloadAPIView,
 )
 
 app_name: str = "accounts"
@@ -10,4 +13,7 @@ app_name: str = "accounts"
 urlpatterns = [
     path('register/', RegistrationAPIView.as_view(), name='registration'),
     path('login/', LoginAPIView.as_view(), name='login'),
+    path('cv/upload/', CVUploadAPIView.as_view(), name='cv_upload'),
+    path('cv/upload/<uuid:id>/', CVUploadChunkAPIView.as_view(), name='cv_upload_chunk'),
+    path('cv/<int:id>/', CVDownloadAPIView.as_view(), name='cv'),
 ]
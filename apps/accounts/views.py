@@ -1,12 +1,26 @@
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.generics import GenericAPIView
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from apps.accounts.models import CustomUserModel, CVUpload
 from apps.accounts.serializers import (
     UserRegistrationSerializer,
+    CVUploadSerializer,
 )
+from apps.accounts.storage import get_offloaded_file_response
+from apps.accounts.tasks import process_cv_upload
+from core.views import stream_in_thread
 
 
 class RegistrationAPIView(GenericAPIView):
@@ -22,3 +36,111 @@ class RegistrationAPIView(GenericAPIView):
 
 class LoginAPIView(TokenObtainPairView):
     pass
+
+
+class CVUploadAPIView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = CVUploadSerializer
+
+    def post(self, request: "Request", *args, **kwargs) -> "Response":
+        """
+        Starts resumable CV upload, response contains upload id and size of chunks the client should send
+        E.g:
+            {"file_name": "cv.pdf", "size": 1048576}
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.save(user=request.user)
+
+        upload.temporary_path.mkdir(parents=True, exist_ok=True)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class CVUploadChunkAPIView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = CVUploadSerializer
+    lookup_field = "id"
+
+    CONTENT_RANGE_PATTERN = re.compile(r"^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<size>\d+)$")
+    READ_BLOCK_SIZE = 64 * 1024
+
+    def get_queryset(self):
+        return CVUpload.objects.filter(user_id=self.request.user.id)
+
+    def get(self, request: "Request", *args, **kwargs) -> "Response":
+        """Returns state of the upload, so interrupted client can resume from received_bytes"""
+        return Response(self.get_serializer(self.get_object()).data)
+
+    def put(self, request: "Request", *args, **kwargs) -> "Response":
+        """
+        Appends raw request body to the upload, the chunk is streamed to disk without loading it into memory.
+        Chunk is written to a file of this request and moved into place only when this request has advanced
+        received_bytes, so concurrent request with the same range can't overwrite it.
+        When the last chunk is received CV validation and storing are delegated to celery task
+        E.g:
+            Content-Range: bytes 0-1048575/3145728
+        """
+        match = self.CONTENT_RANGE_PATTERN.match(request.headers.get("Content-Range", ""))
+        if not match:
+            raise ValidationError({"detail": "Content-Range header must be in format 'bytes start-end/size'."})
+        start, end = int(match["start"]), int(match["end"])
+        upload = self.get_object()
+
+        if upload.status != CVUpload.Statuses.UPLOADING:
+            raise ValidationError({"detail": "Upload is already finished."})
+        if int(match["size"]) != upload.size or start != upload.received_bytes or end < start:
+            raise ValidationError({"detail": f"Next chunk must start from byte {upload.received_bytes}."})
+        if end >= upload.size or end - start + 1 > settings.CV_UPLOAD_CHUNK_SIZE:
+            raise ValidationError({"detail": "Chunk is too large."})
+        if int(request.headers.get("Content-Length") or 0) != end - start + 1:
+            raise ValidationError({"detail": "Content-Length doesn't match Content-Range."})
+
+        remaining = end - start + 1
+        with tempfile.NamedTemporaryFile(dir=upload.temporary_path, prefix="part-", delete=False) as chunk_file:
+            try:
+                while remaining:
+                    block = request.stream.read(min(self.READ_BLOCK_SIZE, remaining))
+                    if not block:
+                        raise ValidationError({"detail": "Chunk is shorter than Content-Range."})
+                    chunk_file.write(block)
+                    remaining -= len(block)
+            except BaseException:
+                os.unlink(chunk_file.name)
+                raise
+
+        upload.received_bytes = end + 1
+        if upload.received_bytes == upload.size:
+            upload.status = CVUpload.Statuses.PROCESSING
+
+        # CONDITIONAL UPDATE INSTEAD OF ROW LOCK, SO SLOW CLIENTS DON'T HOLD TRANSACTION WHILE CHUNK IS STREAMED
+        if not CVUpload.objects.filter(id=upload.id, received_bytes=start, status=CVUpload.Statuses.UPLOADING).update(
+            received_bytes=upload.received_bytes, status=upload.status
+        ):
+            os.unlink(chunk_file.name)
+            return Response({"detail": "Chunk was already received."}, status=status.HTTP_409_CONFLICT)
+
+        os.replace(chunk_file.name, upload.get_chunk_path(start))  # ONLY THE REQUEST WHICH WON THE UPDATE GETS HERE
+
+        if upload.status == CVUpload.Statuses.PROCESSING:
+            process_cv_upload.delay(str(upload.id))
+
+        return Response(self.get_serializer(upload).data)
+
+
+class CVDownloadAPIView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request: "Request", id: int, *args, **kwargs) -> "HttpResponse":  # noqa
+        """Returns CV of the user to the owner or stuff members, file itself is sent by web server"""
+        if request.user.id != id and request.user.user_type == CustomUserModel.UserTypes.STANDARD:
+            raise PermissionDenied()
+
+        user = get_object_or_404(CustomUserModel.objects.only("cv"), id=id)
+        if not user.cv:
+            raise NotFound()
+
+        response = get_offloaded_file_response(user.cv)
+        if response.streaming:  # FALLBACK WITHOUT WEB SERVER HEADER, FileResponse READS FILE IN 4 KB BLOCKS
+            return stream_in_thread(request, response, batch_size=16)
+        return response
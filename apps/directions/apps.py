@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DirectionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.directions"
+
+    def ready(self):
+        from apps.directions import signals  # noqa
@@ -0,0 +1,15 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.directions.models import Direction
+from core.cache import invalidate_cache_namespaces
+
+
+@receiver(post_save, sender=Direction)
+@receiver(post_delete, sender=Direction)
+def invalidate_directions_cache(sender, **kwargs) -> None:
+    """Invalidates cached direction responses after the transaction that changed them commits"""
+    transaction.on_commit(partial(invalidate_cache_namespaces, "directions"))
@@ -1,3 +1,48 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from apps.accounts.models import CustomUserModel
+from apps.directions.models import Direction
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class DirectionsCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.direction = Direction.objects.create(title="Test Direction", number_of_stages=3)
+        self.user = CustomUserModel.objects.create_user(email="testuser@example.com", password="testpass")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        self.url = reverse("directions:direction", args=[self.direction.pk])
+
+    def test_cached_response_is_served_without_direction_query(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(1):  # ONLY AUTHENTICATION QUERY
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "Test Direction")
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_cache_is_invalidated_after_direction_update(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.direction.title = "Updated Direction"
+            self.direction.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "Updated Direction")
+        self.assertNotEqual(response["ETag"], etag)
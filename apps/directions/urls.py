@@ -1,7 +1,7 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from apps.directions.views import DirectionsModelViewSet
+from apps.directions.views import DirectionsModelViewSet, DirectionsAsyncView
 
 app_name: str = "directions"
 
@@ -11,4 +11,8 @@ router.register('direction', DirectionsModelViewSet, basename='direction')
 urlpatterns = [
     path('', DirectionsModelViewSet.as_view({'get': 'list'}), name="directions"),
     path('<int:id>/', DirectionsModelViewSet.as_view({'get': 'retrieve'}), name="direction"),
+
+    # ASYNC READ ENDPOINTS, SEE core.views.AsyncReadOnlyView
+    path('async/', DirectionsAsyncView.as_view(), name="directions-async"),
+    path('async/<int:id>/', DirectionsAsyncView.as_view(), name="direction-async"),
 ]
@@ -4,11 +4,20 @@ from rest_framework.viewsets import ReadOnlyModelViewSet
 
 from apps.directions.models import Direction
 from apps.directions.serializers import DirectionsSerializer
+from core.cache import CachedResponseMixin
+from core.views import AsyncReadOnlyView
 
 
 @extend_schema(tags=["Directions"])
-class DirectionsModelViewSet(ReadOnlyModelViewSet):
+class DirectionsModelViewSet(CachedResponseMixin, ReadOnlyModelViewSet):
+    cache_namespace = "directions"
     permission_classes = (IsAuthenticated,)
     serializer_class = DirectionsSerializer
     lookup_field = 'id'
     queryset = Direction.objects.all()
+
+
+class DirectionsAsyncView(AsyncReadOnlyView):
+    cache_namespace = 'directions'
+    serializer_class = DirectionsSerializer
+    queryset = Direction.objects.all()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+def _version_key(namespace: str) -> str:
+    return f"response-cache:{namespace}:version"
+
+
+def get_cache_namespace_version(namespace: str) -> int:
+    """
+    Returns current version of the namespace, when version key is missing (e.g. evicted) it is seeded with
+    current time so entries which were cached with previous version can never be served again
+    """
+    return cache.get_or_set(_version_key(namespace), time.time_ns, timeout=None)
+
+
+async def aget_cache_namespace_version(namespace: str) -> int:
+    """Async version of get_cache_namespace_version"""
+    return await cache.aget_or_set(_version_key(namespace), time.time_ns, timeout=None)
+
+
+def get_response_cache_key(namespace: str, version: int, request: "HttpRequest") -> str:
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"response-cache:{namespace}:{version}:{path_hash}"
+
+
+def get_response_etag(data) -> str:
+    return f'"{hashlib.md5(json.dumps(data, cls=DjangoJSONEncoder).encode()).hexdigest()}"'
+
+
+def is_etag_matched(request: "HttpRequest", etag: str) -> bool:
+    return etag in (tag.strip() for tag in request.headers.get("If-None-Match", "").split(","))
+
+
+def invalidate_cache_namespaces(*namespaces: str) -> None:
+    """Bumps version of every namespace, so all responses cached with the previous version become unreachable"""
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:  # VERSION KEY DOESN'T EXIST, SO THERE IS NOTHING TO INVALIDATE
+            pass
+
+
+class CachedResponseMixin:
+    """
+    ViewSet mixin that caches list and retrieve responses in a versioned namespace and supports
+    conditional requests, so clients which send If-None-Match with the current ETag get 304 without body
+    E.g:
+        class DirectionsModelViewSet(CachedResponseMixin, ReadOnlyModelViewSet):
+            cache_namespace = "directions"
+    """
+
+    cache_namespace: str = None
+
+    def list(self, request: "Request", *args, **kwargs) -> "Response":
+        return self._get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request: "Request", *args, **kwargs) -> "Response":
+        return self._get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    def _get_cached_response(self, handler: Callable, request: "Request", *args, **kwargs) -> "Response":
+        version = get_cache_namespace_version(self.cache_namespace)
+        cache_key = get_response_cache_key(self.cache_namespace, version, request)
+        cached = cache.get(cache_key)
+
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            etag = get_response_etag(response.data)
+            cache.set(cache_key, (etag, response.data), timeout=settings.RESPONSE_CACHE_TIMEOUT)
+        else:
+            etag, data = cached
+            response = Response(data)
+
+        response["ETag"] = etag
+        if is_etag_matched(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        return response
@@ -0,0 +1,84 @@
+import hmac
+import ipaddress
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+LABELS = ("view", "method")
+
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "Wall time of request processing", (*LABELS, "status"))
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Number of SQL queries per request",
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, float("inf")),
+)
+REQUEST_DB_DURATION = Histogram("http_request_db_duration_seconds", "Time spent in SQL queries per request", LABELS)
+REQUEST_SERIALIZER_DURATION = Histogram(
+    "http_request_serializer_duration_seconds", "Time spent in serializers validation and representation", LABELS
+)
+
+# SERIALIZER TIME OF THE CURRENT REQUEST, NONE WHEN CODE RUNS OUTSIDE OF INSTRUMENTED REQUEST
+serializer_duration: ContextVar[Optional[float]] = ContextVar("serializer_duration", default=None)
+_serializer_depth: ContextVar[int] = ContextVar("serializer_depth", default=0)
+
+
+def _timed(method):
+    """Adds time of the outermost serializer call to serializer_duration of the current request"""
+
+    def wrapper(*args, **kwargs):
+        if serializer_duration.get() is None or _serializer_depth.get():
+            return method(*args, **kwargs)
+
+        depth_token = _serializer_depth.set(1)
+        started_at = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            serializer_duration.set(serializer_duration.get() + time.perf_counter() - started_at)
+            _serializer_depth.reset(depth_token)
+
+    wrapper.__wrapped__ = method
+    return wrapper
+
+
+def instrument_serializers() -> None:
+    """Wraps entry points of every DRF serializer (validation and data), so their time is measured per request"""
+    if hasattr(BaseSerializer.is_valid, "__wrapped__"):
+        return
+
+    BaseSerializer.is_valid = _timed(BaseSerializer.is_valid)
+    ListSerializer.is_valid = _timed(ListSerializer.is_valid)
+    BaseSerializer.data = property(_timed(BaseSerializer.data.fget))
+
+
+def is_metrics_request_allowed(request: "HttpRequest") -> bool:
+    """Scraper is allowed by METRICS_TOKEN bearer token or by its address in METRICS_ALLOWED_NETWORKS"""
+    authorization = request.headers.get("Authorization", "")
+    if settings.METRICS_TOKEN and hmac.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+        return True
+
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWED_NETWORKS)
+
+
+def metrics_view(request: "HttpRequest") -> "HttpResponse":
+    """Prometheus endpoint, with PROMETHEUS_MULTIPROC_DIR metrics of all worker processes are combined"""
+    if not is_metrics_request_allowed(request):
+        return HttpResponseForbidden()
+
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,164 @@
+import logging
+import time
+from contextvars import ContextVar, Token
+from typing import Callable, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+
+from core.metrics import (
+    REQUEST_DB_DURATION,
+    REQUEST_DB_QUERIES,
+    REQUEST_DURATION,
+    REQUEST_SERIALIZER_DURATION,
+    instrument_serializers,
+    serializer_duration,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCollector:
+    """Database execute wrapper which records SQL and duration of every query executed during request"""
+
+    def __init__(self):
+        self.queries: List[Tuple[float, str]] = []
+
+    def __call__(self, execute: Callable, sql: str, params, many: bool, context: dict):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((time.perf_counter() - started_at, sql))
+
+    @property
+    def duration(self) -> float:
+        return sum(duration for duration, _ in self.queries)
+
+
+# COLLECTOR OF THE CURRENT REQUEST, CONTEXT IS COPIED INTO THREADS OF sync_to_async,
+# SO QUERIES WHICH ASYNC VIEWS RUN THROUGH ASYNC ORM ARE RECORDED AS WELL
+request_queries: ContextVar[Optional["QueryCollector"]] = ContextVar("request_queries", default=None)
+
+
+def _record_query(execute: Callable, sql: str, params, many: bool, context: dict):
+    queries = request_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    return queries(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection: "BaseDatabaseWrapper", **kwargs) -> None:
+    """Adds request query recorder to execute wrappers of the connection (connections are per thread)"""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records wall time, number and time of SQL queries and serializer time of every request per view and method.
+    Values are exported to Prometheus (see core.metrics.metrics_view), optionally added as Server-Timing header
+    and requests slower than SLOW_REQUEST_THRESHOLD are logged together with their slowest SQL queries
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+        instrument_serializers()
+        connection_created.connect(install_query_recorder, dispatch_uid="request_metrics_query_recorder")
+        for connection in connections.all():
+            install_query_recorder(connection)
+
+    def __call__(self, request: "HttpRequest") -> "HttpResponse":
+        if self.is_async:
+            return self.__acall__(request)
+
+        queries, tokens, started_at = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            serializers_time = self.stop(tokens)
+
+        return self.record(request, response, queries, time.perf_counter() - started_at, serializers_time)
+
+    async def __acall__(self, request: "HttpRequest") -> "HttpResponse":
+        queries, tokens, started_at = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            serializers_time = self.stop(tokens)
+
+        return self.record(request, response, queries, time.perf_counter() - started_at, serializers_time)
+
+    @staticmethod
+    def start() -> Tuple["QueryCollector", Tuple[Token, Token], float]:
+        queries = QueryCollector()
+        tokens = request_queries.set(queries), serializer_duration.set(0.0)
+        return queries, tokens, time.perf_counter()
+
+    @staticmethod
+    def stop(tokens: Tuple[Token, Token]) -> float:
+        """Detaches request from collectors and returns serializer time of the request"""
+        queries_token, serializer_token = tokens
+        serializers_time = serializer_duration.get()
+        request_queries.reset(queries_token)
+        serializer_duration.reset(serializer_token)
+        return serializers_time
+
+    def record(
+        self,
+        request: "HttpRequest",
+        response: "HttpResponse",
+        queries: "QueryCollector",
+        duration: float,
+        serializers_time: float,
+    ) -> "HttpResponse":
+        # VIEW NAME IS USED INSTEAD OF PATH, SO NUMBER OF LABEL VALUES DOESN'T GROW WITH OBJECT IDS
+        view = request.resolver_match.view_name if request.resolver_match else "unmatched"
+        labels = {"view": view, "method": request.method}
+
+        REQUEST_DURATION.labels(**labels, status=response.status_code).observe(duration)
+        REQUEST_DB_QUERIES.labels(**labels).observe(len(queries.queries))
+        REQUEST_DB_DURATION.labels(**labels).observe(queries.duration)
+        REQUEST_SERIALIZER_DURATION.labels(**labels).observe(serializers_time)
+
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response["Server-Timing"] = (
+                f'total;dur={duration * 1000:.1f}, db;dur={queries.duration * 1000:.1f};desc="{len(queries.queries)} '
+                f'queries", serializer;dur={serializers_time * 1000:.1f}'
+            )
+
+        if settings.SLOW_REQUEST_THRESHOLD is not None and duration >= settings.SLOW_REQUEST_THRESHOLD:
+            self.log_slow_request(request, view, duration, queries, serializers_time)
+
+        return response
+
+    @staticmethod
+    def log_slow_request(
+        request: "HttpRequest", view: str, duration: float, queries: "QueryCollector", serializers_time: float
+    ) -> None:
+        slowest_queries = sorted(queries.queries, key=lambda query: query[0], reverse=True)
+        logger.warning(
+            "Slow request %s %s (%s): %.1f ms, %s queries in %.1f ms, serializers %.1f ms, slowest queries:%s",
+            request.method,
+            request.get_full_path(),
+            view,
+            duration * 1000,
+            len(queries.queries),
+            queries.duration * 1000,
+            serializers_time * 1000,
+            "".join(
+                f"\n  {query_duration * 1000:.1f} ms: {sql}"
+                for query_duration, sql in slowest_queries[: settings.SLOW_REQUEST_LOGGED_QUERIES]
+            ),
+        )
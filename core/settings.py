@@ -2,6 +2,8 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -12,9 +14,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-mcopgyhbn)yvo(306dxs+2#*$%8tc_#ip_^wo2)o^7r^h%unhs'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = (os.environ.get('DEBUG') or 'True') == 'True'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host]
 
 # Application definition
 
@@ -45,6 +47,7 @@ INSTALLED_APPS = [
                  ] + THIRD_PARTY_APPS + PROJECT_APPS
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',  # FIRST, SO THAT TIME OF OTHER MIDDLEWARES IS MEASURED AS WELL
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,9 +88,19 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('POSTGRES_HOST'),
         'PORT': os.environ.get('POSTGRES_PORT'),
+        # PERSISTENT CONNECTIONS PAY OFF IN WSGI MODE, IN ASGI MODE IT MUST STAY 0 SINCE ASYNC VIEWS QUERY FROM THREADS
+        'CONN_MAX_AGE': int(os.environ.get('POSTGRES_CONN_MAX_AGE') or 0),
     }
 }
 
+# REQUEST METRICS (SEE core.middleware.RequestMetricsMiddleware), PROMETHEUS SCRAPES THEM FROM /metrics
+REQUEST_METRICS_SERVER_TIMING = os.environ.get('REQUEST_METRICS_SERVER_TIMING', 'False') == 'True'
+SLOW_REQUEST_THRESHOLD = float(os.environ.get('SLOW_REQUEST_THRESHOLD') or 1.0)  # SECONDS
+SLOW_REQUEST_LOGGED_QUERIES = 5
+# /metrics IS SERVED TO REQUESTS WITH "Authorization: Bearer <METRICS_TOKEN>" OR FROM METRICS_ALLOWED_NETWORKS
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or ''
+METRICS_ALLOWED_NETWORKS = (os.environ.get('METRICS_ALLOWED_NETWORKS') or '127.0.0.1/32,::1/128').split(',')
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -106,6 +119,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+# FIRST HASHER IS USED FOR NEW PASSWORDS, OTHERS ONLY VERIFY OLD HASHES WHICH ARE UPGRADED ON SUCCESSFUL LOGIN
+
+PASSWORD_HASHERS = [
+    'apps.accounts.hashers.ConfigurableArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+# COST IS TUNED WITH `python manage.py benchmark_password_hashers`
+PASSWORD_HASHER_ARGON2 = {
+    'TIME_COST': int(os.environ.get('PASSWORD_HASHER_ARGON2_TIME_COST') or 2),
+    'MEMORY_COST': int(os.environ.get('PASSWORD_HASHER_ARGON2_MEMORY_COST') or 64 * 1024),  # KIBIBYTES
+    'PARALLELISM': int(os.environ.get('PASSWORD_HASHER_ARGON2_PARALLELISM') or 1),
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -121,6 +151,7 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # COLLECTED FOR REVERSE PROXY IN PRODUCTION SERVING MODE
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -131,7 +162,7 @@ AUTH_USER_MODEL = "accounts.CustomUserModel"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -144,6 +175,11 @@ SPECTACULAR_SETTINGS = {
     'SWAGGER_UI_DIST': 'SIDECAR',
     'SWAGGER_UI_FAVICON_HREF': 'SIDECAR',
     'REDOC_DIST': 'SIDECAR',
+    # APPLICANT REQUEST AND RESPONSE SHARE THE SAME CHOICES, FINAL DECISION HAS ITS OWN
+    'ENUM_NAME_OVERRIDES': {
+        'ProgressStatusEnum': 'apps.acceleration_program.models.ApplicantResponse.Statuses',
+        'FinalDecisionStatusEnum': 'apps.acceleration_program.models.StuffFinalResponseDescription.Statuses',
+    },
 }
 
 FIXTURE_DIRS = ["fixtures"]
@@ -151,11 +187,56 @@ FIXTURE_DIRS = ["fixtures"]
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+CV_UPLOAD_TEMPORARY_DIR = os.path.join(MEDIA_ROOT, 'cv_uploads')
+CV_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+CV_UPLOAD_CHUNK_SIZE = 1024 * 1024
+CV_UPLOAD_EXPIRATION = timedelta(days=1)  # UNFINISHED UPLOADS ARE REMOVED AFTER THIS PERIOD
+# 'X-Accel-Redirect' (NGINX INTERNAL LOCATION AT CV_SENDFILE_URL_PREFIX) OR 'X-Sendfile', EMPTY - DJANGO SENDS FILE
+CV_SENDFILE_HEADER = os.environ.get('CV_SENDFILE_HEADER')
+CV_SENDFILE_URL_PREFIX = '/protected-media/'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(weeks=1),
+    # TOKENS CARRY USER CLAIMS, SO REQUESTS ARE AUTHENTICATED WITHOUT DATABASE QUERY (SEE apps.accounts.tokens)
+    'AUTH_TOKEN_CLASSES': ('apps.accounts.tokens.RoleAccessToken',),
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.accounts.tokens.RoleTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.tokens.RoleTokenRefreshSerializer',
 }
 
 
+REDIS_URL = f"redis://{os.environ.get('REDIS_HOST')}:{os.environ.get('REDIS_PORT')}"
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"{REDIS_URL}/{os.environ.get('REDIS_DB', 0)}",
+    }
+}
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24  # REFERENCE DATA IS INVALIDATED BY SIGNALS, TIMEOUT ONLY BOUNDS MEMORY
+
 CELERY_BROKER_URL = f"redis://{os.environ.get('REDIS_HOST')}:{os.environ.get('REDIS_PORT')}"
 CELERY_RESULT_BACKEND = f"redis://{os.environ.get('REDIS_HOST')}:{os.environ.get('REDIS_PORT')}"
+CELERY_BEAT_SCHEDULE = {
+    'deactivate-expired-acceleration-programs': {
+        'task': 'apps.acceleration_program.tasks.deactivate_expired_acceleration_programs',
+        'schedule': crontab(minute=0),
+    },
+    'cleanup-expired-cv-uploads': {
+        'task': 'apps.accounts.tasks.cleanup_expired_cv_uploads',
+        'schedule': crontab(minute=30, hour=3),
+    },
+    'drain-notification-outbox': {
+        'task': 'apps.acceleration_program.tasks.drain_notification_outbox',
+        'schedule': crontab(),  # EVERY MINUTE, STATUS CHANGES OF THE MINUTE ARE COALESCED INTO ONE DIGEST
+    },
+}
+
+# NOTIFICATION DIGESTS ARE SENT BY drain_notification_outbox TASK, CONSOLE BACKEND ONLY PRINTS THEM
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND') or 'django.core.mail.backends.console.EmailBackend'
+EMAIL_HOST = os.environ.get('EMAIL_HOST') or 'localhost'
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT') or 25)
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER') or ''
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD') or ''
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS') == 'True'
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL') or 'webmaster@localhost'
@@ -0,0 +1,96 @@
+from datetime import date
+from typing import Callable, Iterable, List
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.response import Response
+
+from apps.acceleration_program.models import AccelerationProgram, Assignment, AssignmentType, JoinProgram, Stage
+from apps.accounts.models import CustomUserModel
+from apps.directions.models import Direction
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin which fails when number of queries of an API call grows together with amount of data (N+1).
+    Data is seeded in steps up to each size and the same call is measured after every step
+    E.g:
+        self.assertConstantQueries(
+            seed=lambda count: [create_program() for _ in range(count)],
+            call=lambda: self.client.get(reverse("acceleration_program:acceleration_program-list")),
+        )
+    """
+
+    QUERY_BUDGET_SIZES = (1, 5, 20)
+
+    def assertConstantQueries(  # noqa
+        self, seed: Callable[[int], object], call: Callable[[], "Response"], sizes: Iterable[int] = None
+    ) -> int:
+        """Seeds and calls for every size, returns number of queries of the call which is the same for all sizes"""
+        queries_by_size = {}
+        seeded = 0
+
+        for size in sizes or self.QUERY_BUDGET_SIZES:
+            seed(size - seeded)
+            seeded = size
+
+            with CaptureQueriesContext(connection) as queries:
+                response = call()
+
+            self.assertLess(response.status_code, 400, getattr(response, "data", response))  # noqa
+            queries_by_size[size] = queries
+
+        counts = {size: len(queries) for size, queries in queries_by_size.items()}
+        if len(set(counts.values())) > 1:
+            largest = max(queries_by_size)
+            self.fail(  # noqa
+                f"Number of queries depends on amount of data {counts}, queries for {largest}:\n"
+                + "\n".join(query["sql"] for query in queries_by_size[largest].captured_queries)
+            )
+
+        return counts[max(counts)]
+
+
+class ProgramFixtureMixin:
+    """
+    TestCase mixin which creates data acceleration program tests start from: "Test Direction", "Test Program"
+    with registration in 2022 and program in 2023, join program of them, "Test Stage" and applicant users
+    E.g:
+        def setUp(self):
+            self.set_up_program(is_active=True)
+            self.join_program.stages_data.add(self.create_stage())
+            self.users = self.create_applicant_users(2)
+    """
+
+    def set_up_program(self, is_active: bool = False) -> None:
+        """Sets direction, program and join_program of them"""
+        self.direction = Direction.objects.create(title="Test Direction", number_of_stages=3)
+        self.program = self.create_program(is_active=is_active)
+        self.join_program = JoinProgram.objects.create(program=self.program, direction=self.direction)
+
+    @staticmethod
+    def create_program(name: str = "Test Program", **fields) -> "AccelerationProgram":
+        program = {
+            "requirements": "Test Requirements",
+            "program_start_date": date(2023, 1, 1),
+            "program_end_date": date(2023, 12, 31),
+            "registration_start_date": date(2022, 1, 1),
+            "registration_end_date": date(2022, 12, 31),
+        }
+        program.update(fields)
+        return AccelerationProgram.objects.create(name=name, **program)
+
+    @staticmethod
+    def create_stage(name: str = "Test Stage") -> "Stage":
+        assignment = Assignment.objects.create(
+            type=AssignmentType.objects.create(type="Test Type"), description="Test Description"
+        )
+        return Stage.objects.create(assignment=assignment, name=name)
+
+    @staticmethod
+    def create_applicant_users(count: int, **fields) -> List["CustomUserModel"]:
+        """Users applicant0@example.com, applicant1@example.com, ... with password testpass"""
+        return [
+            CustomUserModel.objects.create_user(email=f"applicant{index}@example.com", password="testpass", **fields)
+            for index in range(count)
+        ]
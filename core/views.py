@@ -0,0 +1,122 @@
+import itertools
+from typing import AsyncIterator, Iterator, Type
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, NotFound, PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.serializers import BaseSerializer
+from rest_framework.settings import api_settings
+
+from core.cache import aget_cache_namespace_version, get_response_cache_key, get_response_etag, is_etag_matched
+
+
+def is_asgi_request(request: "HttpRequest") -> bool:
+    return isinstance(getattr(request, "_request", request), ASGIRequest)  # DRF REQUEST WRAPS DJANGO REQUEST
+
+
+async def iterate_in_thread(iterator: Iterator, batch_size: int) -> AsyncIterator:
+    """
+    Pulls batches of sync iterator in thread of the request (it may query database) and yields every batch
+    joined into one chunk, so only one batch is kept in memory
+    """
+    iterator = iter(iterator)
+    next_batch = sync_to_async(lambda: list(itertools.islice(iterator, batch_size)))
+    while batch := await next_batch():
+        yield batch[0][:0].join(batch)  # EMPTY str OR bytes OF THE ITERATOR JOINS THE BATCH
+
+
+def stream_in_thread(
+    request: "HttpRequest", response: "StreamingHttpResponse", batch_size: int = 100
+) -> "StreamingHttpResponse":
+    """
+    Django under ASGI reads sync streaming content into memory in full before sending the first byte,
+    so when the project is served by ASGI the content is replaced by async iterator over the same content.
+    Under WSGI the response is returned as it is
+    """
+    if is_asgi_request(request) and not response.is_async:
+        response.streaming_content = iterate_in_thread(response.streaming_content, batch_size)
+    return response
+
+
+class AsyncReadOnlyView(View):
+    """
+    Read-only list and retrieve endpoint which runs on the event loop when project is served by ASGI.
+    Database and cache are accessed through Django async API, so while request waits for them (or for slow client)
+    the worker serves other requests. Responses, ETags and response cache namespace are the same as of
+    CachedResponseMixin ViewSet with the same serializer
+    E.g:
+        class DirectionsAsyncView(AsyncReadOnlyView):
+            cache_namespace = "directions"
+            queryset = Direction.objects.all()
+            serializer_class = DirectionsSerializer
+    """
+
+    http_method_names = ["get"]
+    queryset: "QuerySet" = None
+    serializer_class: Type["BaseSerializer"] = None
+    cache_namespace: str = None
+    lookup_field = "id"
+    permission_classes = (IsAuthenticated,)
+
+    async def get(self, request: "HttpRequest", **kwargs) -> "HttpResponse":
+        api_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        try:
+            await self.check_permissions(api_request)
+            etag, data = await self.get_cached_data(request, kwargs.get(self.lookup_field))
+        except APIException as error:
+            return self.get_error_response(api_request, error)
+
+        if is_etag_matched(request, etag):
+            return HttpResponseNotModified(headers={"ETag": etag})
+        return JsonResponse(data, safe=False, headers={"ETag": etag})
+
+    async def check_permissions(self, request: "Request") -> None:
+        # AUTHENTICATION BY TOKEN CLAIMS DOESN'T QUERY DATABASE, BUT ITS FALLBACK DOES, SO IT RUNS OUTSIDE OF EVENT LOOP
+        await sync_to_async(lambda: request.user)()
+
+        for permission in (permission_class() for permission_class in self.permission_classes):
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise NotAuthenticated()
+                raise PermissionDenied(getattr(permission, "message", None))
+
+    async def get_cached_data(self, request: "HttpRequest", lookup) -> tuple:
+        version = await aget_cache_namespace_version(self.cache_namespace)
+        cache_key = get_response_cache_key(self.cache_namespace, version, request)
+
+        cached = await cache.aget(cache_key)
+        if cached is None:
+            data = await self.get_data(lookup)
+            cached = get_response_etag(data), data
+            await cache.aset(cache_key, cached, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+
+        return cached
+
+    async def get_data(self, lookup):
+        """Serialized list when lookup is None, otherwise serialized object, serializers get already loaded objects"""
+        if lookup is None:
+            return self.serializer_class([instance async for instance in self.queryset.all()], many=True).data
+
+        try:
+            instance = await self.queryset.aget(**{self.lookup_field: lookup})
+        except ObjectDoesNotExist:
+            raise NotFound()
+        return self.serializer_class(instance).data
+
+    @staticmethod
+    def get_error_response(request: "Request", error: "APIException") -> "JsonResponse":
+        """Same body and headers as DRF exception handler returns"""
+        data = error.detail if isinstance(error.detail, (list, dict)) else {"detail": error.detail}
+        response = JsonResponse(data, safe=False, status=error.status_code)
+
+        if isinstance(error, (NotAuthenticated, AuthenticationFailed)):
+            response["WWW-Authenticate"] = request.authenticators[0].authenticate_header(request)
+        return response
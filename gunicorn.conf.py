@@ -0,0 +1,47 @@
+"""
+Gunicorn settings of production serving mode (scripts/docker-entrypoint-prod.sh), gunicorn reads this file from
+working directory by default. SERVER_MODE chooses application and workers:
+    asgi - core.asgi on uvicorn workers, one event loop per CPU serves async views and slow clients without threads
+    wsgi - core.wsgi on threaded workers, (2 x CPU + 1) processes with GUNICORN_THREADS threads each
+E.g:
+    SERVER_MODE=wsgi GUNICORN_WORKERS=8 gunicorn
+"""
+
+import multiprocessing
+import os
+
+SERVER_MODE = os.environ.get("SERVER_MODE") or "asgi"
+CPU_COUNT = multiprocessing.cpu_count()
+
+bind = os.environ.get("GUNICORN_BIND") or "0.0.0.0:8000"
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "core.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+    workers = int(os.environ.get("GUNICORN_WORKERS") or CPU_COUNT)
+elif SERVER_MODE == "wsgi":
+    wsgi_app = "core.wsgi:application"
+    worker_class = "gthread"
+    workers = int(os.environ.get("GUNICORN_WORKERS") or CPU_COUNT * 2 + 1)
+    threads = int(os.environ.get("GUNICORN_THREADS") or 4)
+else:
+    raise ValueError(f"SERVER_MODE must be asgi or wsgi, not {SERVER_MODE!r}")
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT") or 30)
+graceful_timeout = 30
+keepalive = 5
+
+# WORKERS ARE REPLACED FROM TIME TO TIME, SO SLOW MEMORY LEAKS DON'T ACCUMULATE, JITTER AVOIDS RESTARTING ALL AT ONCE
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS") or 2000)
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def child_exit(server, worker):
+    """Metrics of exited worker are removed from PROMETHEUS_MULTIPROC_DIR (see core.metrics.metrics_view)"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
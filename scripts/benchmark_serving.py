@@ -0,0 +1,144 @@
+"""
+Compares serving modes: starts the project with runserver, gunicorn in WSGI mode and gunicorn in ASGI mode in turn
+and measures latency percentiles and throughput of sync and async read endpoints. With --slow-clients the requests
+are measured while slow clients hold connections open by sending their requests byte by byte.
+Server processes get environment of this script (database, cache, gunicorn.conf.py variables), credentials come
+from manifest of seed_load_data command
+E.g:
+    python manage.py seed_load_data --applicants 1000 --manifest load_test_manifest.json
+    python scripts/benchmark_serving.py --manifest load_test_manifest.json --slow-clients 200 --output serving.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from load_test import Client, Results, print_report  # SCRIPTS DIRECTORY IS ON sys.path WHEN SCRIPT IS RUN
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+MODES = ("runserver", "wsgi", "asgi")
+
+ENDPOINTS: Dict[str, str] = {
+    "directions": "/api/directions/",
+    "directions async": "/api/directions/async/",
+    "programs": "/api/acceleration_program/program/",
+    "programs async": "/api/acceleration_program/async/program/",
+    "stages": "/api/acceleration_program/stage/",
+    "stages async": "/api/acceleration_program/async/stage/",
+}
+
+
+def start_server(mode: str, port: int, workers: int = None) -> "subprocess.Popen":
+    env = dict(os.environ, SERVER_MODE=mode, GUNICORN_BIND=f"127.0.0.1:{port}")
+    if workers:
+        env["GUNICORN_WORKERS"] = str(workers)
+
+    if mode == "runserver":
+        command = [sys.executable, "manage.py", "runserver", "--noreload", f"127.0.0.1:{port}"]
+    else:
+        command = [sys.executable, "-m", "gunicorn"]
+    return subprocess.Popen(command, cwd=PROJECT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(port: int, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Server didn't start listening on port {port} in {timeout} seconds")
+
+
+def slow_client(port: int, interval: float, stop: "threading.Event") -> None:
+    """Sends requests one byte per interval and reads their responses until stopped"""
+    request = b"GET /api/directions/ HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+    while not stop.is_set():
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=60) as connection:
+                for byte in request:
+                    connection.sendall(bytes([byte]))
+                    if stop.wait(interval):
+                        return
+                while connection.recv(65536):
+                    pass
+        except OSError:  # SERVER MAY DROP CONNECTION WHICH IS TOO SLOW
+            pass
+
+
+def benchmark_mode(mode: str, manifest: dict, args: "argparse.Namespace") -> List[dict]:
+    server = start_server(mode, args.port, args.workers)
+    stop = threading.Event()
+    slow_clients = [
+        threading.Thread(target=slow_client, args=(args.port, args.slow_interval, stop), daemon=True)
+        for _ in range(args.slow_clients)
+    ]
+
+    try:
+        wait_until_ready(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+        login = Client(base_url, Results())
+        if not login.login(manifest["submissions"][0]["email"], manifest["password"]):
+            raise RuntimeError(f"Login failed in {mode} mode")
+
+        for thread in slow_clients:
+            thread.start()
+
+        rows = []
+        for endpoint in args.endpoint or ENDPOINTS:
+            login.get(endpoint, ENDPOINTS[endpoint])  # WARMS UP RESPONSE CACHE, SO ALL MODES MEASURE THE SAME WORK
+            results = Results()
+            client = Client(base_url, results)
+            client.access_token = login.access_token
+
+            started_at = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                for _ in executor.map(lambda _: client.get(endpoint, ENDPOINTS[endpoint]), range(args.requests)):
+                    pass
+            rows.extend(results.report(mode, time.perf_counter() - started_at))
+        return rows
+    finally:
+        stop.set()
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", default="load_test_manifest.json")
+    parser.add_argument("--mode", choices=MODES, action="append", help="Default: all modes")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, action="append", help="Default: all endpoints")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--workers", type=int, help="Gunicorn workers, default: gunicorn.conf.py")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--slow-clients", type=int, default=0, help="Clients which send requests byte by byte")
+    parser.add_argument("--slow-interval", type=float, default=0.02, help="Seconds between bytes of slow clients")
+    parser.add_argument("--output", help="File to save report as JSON")
+    args = parser.parse_args()
+
+    with open(args.manifest) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    rows = []
+    for mode in args.mode or MODES:
+        rows.extend(benchmark_mode(mode, manifest, args))
+
+    print_report(rows)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(rows, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
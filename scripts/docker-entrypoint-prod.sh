@@ -0,0 +1,19 @@
+#!/bin/bash
+set -e
+
+# SETTINGS DEFAULT TO DEBUG FOR DEVELOPMENT, PRODUCTION MODE TURNS IT OFF UNLESS IT'S SET EXPLICITLY
+export DEBUG=${DEBUG:-False}
+
+echo "Running migrations"
+python manage.py migrate --noinput
+
+echo "Collecting static files"
+python manage.py collectstatic --noinput
+
+# EVERY WORKER WRITES ITS METRICS HERE, FILES OF THE PREVIOUS RUN WOULD BE SUMMED WITH THE NEW ONES
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+echo "Running gunicorn in ${SERVER_MODE:-asgi} mode"
+exec gunicorn
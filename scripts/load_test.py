@@ -0,0 +1,190 @@
+"""
+Load scenarios against running API server, data and credentials come from manifest of seed_load_data command.
+Every scenario runs user flows concurrently and reports latency percentiles and throughput per endpoint
+E.g:
+    python manage.py seed_load_data --applicants 20000 --manifest load_test_manifest.json
+    python scripts/load_test.py --base-url http://localhost:8000 --manifest load_test_manifest.json --concurrency 50
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+SCENARIOS = ("registration", "submission", "grading")
+
+
+class Client:
+    """Sends JSON requests and records latency of every request by endpoint name"""
+
+    def __init__(self, base_url: str, results: "Results"):
+        self.base_url = base_url.rstrip("/")
+        self.results = results
+        self.access_token: Optional[str] = None
+
+    def request(self, endpoint: str, method: str, path: str, data: Optional[dict] = None) -> Optional[dict]:
+        headers = {"Content-Type": "application/json"}
+        if self.access_token:
+            headers["Authorization"] = f"Bearer {self.access_token}"
+        body = None if data is None else json.dumps(data).encode()
+        request = urllib.request.Request(f"{self.base_url}{path}", data=body, headers=headers, method=method)
+
+        started_at = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                body = json.loads(response.read() or b"null")
+            self.results.add(endpoint, time.perf_counter() - started_at, ok=True)
+            return body
+        except (urllib.error.URLError, TimeoutError, ConnectionError):
+            self.results.add(endpoint, time.perf_counter() - started_at, ok=False)
+            return None
+
+    def get(self, endpoint: str, path: str) -> Optional[dict]:
+        return self.request(endpoint, "GET", path)
+
+    def post(self, endpoint: str, path: str, data: dict) -> Optional[dict]:
+        return self.request(endpoint, "POST", path, data)
+
+    def login(self, email: str, password: str) -> bool:
+        tokens = self.post("login", "/api/auth/login/", {"email": email, "password": password})
+        self.access_token = tokens and tokens["access"]
+        return bool(self.access_token)
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, endpoint: str, latency: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies[endpoint].append(latency)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def report(self, scenario: str, duration: float) -> List[dict]:
+        rows = []
+        for endpoint, latencies in self.latencies.items():
+            latencies = sorted(latencies)
+            rows.append(
+                {
+                    "scenario": scenario,
+                    "endpoint": endpoint,
+                    "requests": len(latencies),
+                    "errors": self.errors[endpoint],
+                    "throughput": len(latencies) / duration,
+                    **{f"p{q}": percentile(latencies, q) * 1000 for q in (50, 95, 99)},
+                }
+            )
+        return rows
+
+
+def percentile(sorted_values: List[float], q: int) -> float:
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def registration_flow(client: "Client", manifest: dict, number: int) -> None:
+    """New user registers account, logs in and applies to a join program"""
+    email = f"{manifest['registration_email_prefix']}{number}-{random.getrandbits(32)}@example.com"
+    password = manifest["password"]
+    data = {"email": email, "password": password, "confirm_password": password}
+
+    if client.post("register", "/api/auth/register/", data) is not None and client.login(email, password):
+        client.post(
+            "applicant registration",
+            "/api/acceleration_program/applicant/",
+            {"program_to_join": random.choice(manifest["join_programs"])},
+        )
+
+
+def submission_flow(client: "Client", manifest: dict, number: int) -> None:
+    """Accepted applicant sends response to the last stage of the program"""
+    submission = manifest["submissions"][number]
+    if client.login(submission["email"], manifest["password"]):
+        client.post(
+            "applicant response",
+            "/api/acceleration_program/applicant_response/",
+            {"stage": submission["stage"], "direction": submission["direction"]},
+        )
+
+
+def grading_flow(client: "Client", manifest: dict, number: int) -> None:
+    """Stuff member grades response which they haven't evaluated yet"""
+    grading = manifest["gradings"][number]
+    if client.login(grading["email"], manifest["password"]):
+        client.post(
+            "stuff member response",
+            "/api/acceleration_program/stuff_member_response/",
+            {"applicant_response": grading["applicant_response"], "point": random.randint(1, 10)},
+        )
+
+
+FLOWS: Dict[str, Callable[["Client", dict, int], None]] = {
+    "registration": registration_flow,
+    "submission": submission_flow,
+    "grading": grading_flow,
+}
+
+
+def run_scenario(scenario: str, manifest: dict, base_url: str, users: int, concurrency: int) -> List[dict]:
+    if scenario == "submission":
+        users = min(users, len(manifest["submissions"]))
+    if scenario == "grading":
+        users = min(users, len(manifest["gradings"]))
+
+    results = Results()
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        flows = executor.map(lambda number: FLOWS[scenario](Client(base_url, results), manifest, number), range(users))
+        for _ in flows:  # RE-RAISES UNEXPECTED ERRORS OF FLOWS
+            pass
+
+    return results.report(scenario, time.perf_counter() - started_at)
+
+
+def print_report(rows: List[dict]) -> None:
+    header = f"{'scenario':<14}{'endpoint':<24}{'requests':>9}{'errors':>8}{'req/s':>9}"
+    header += "".join(f"{f'p{q} ms':>9}" for q in (50, 95, 99))
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['scenario']:<14}{row['endpoint']:<24}{row['requests']:>9}{row['errors']:>8}{row['throughput']:>9.1f}"
+            f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--manifest", default="load_test_manifest.json")
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="Default: all scenarios")
+    parser.add_argument("--users", type=int, default=500, help="User flows of every scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--output", help="File to save report as JSON, e.g. to compare with performance baseline")
+    args = parser.parse_args()
+
+    with open(args.manifest) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    rows = []
+    for scenario in args.scenario or SCENARIOS:
+        rows.extend(run_scenario(scenario, manifest, args.base_url, args.users, args.concurrency))
+
+    print_report(rows)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(rows, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()